@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+导出与恢复 - 把全部文章（头信息和正文）与 books.yml 流式导出为 JSON Lines 或 tar 归档，
+并从归档重建 _posts 和 books.yml。文章逐篇读写，正文不会同时载入内存，常驻的只有书籍目录和文章路径列表
+
+JSON Lines 每行一条记录:
+    {"type": "header", "format": "blogmanage-archive", "version": 1, ...}
+    {"type": "book", "book": {...}}                                       books.yml 中的一本书
+    {"type": "post", "path": ..., "front_matter": ..., "body": ..., "meta": {...}}
+    {"type": "end", "books": 书籍数, "posts": 文章数}
+front_matter 为包含 --- 分隔行的原始头信息，front_matter + body 即原文件内容；meta 为解析后的头信息。
+tar 归档包含 _data/books.yml 和 _posts/ 下的文章文件。文件名以 .gz/.tgz 结尾时压缩
+
+导出每隔 --checkpoint 篇写入检查点：压缩数据分段结束并落盘，游标（输出偏移和最后一篇文章路径）
+保存在 <输出文件>.cursor，中断后用 --resume 从游标处继续；导出完成后删除游标文件
+
+用法:
+    python archive.py export backup.jsonl.gz
+    python archive.py export backup.tar.gz --resume
+    python archive.py export - | ssh mirror "python archive.py restore - --root /srv/blog"
+    python archive.py restore backup.jsonl.gz --root 新站点目录
+    python blog_manager.py archive export backup.jsonl.gz
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import gzip
+import zlib
+import shutil
+import tarfile
+import argparse
+import tempfile
+import posixpath
+
+import yamlio
+from post_index import scan_posts
+from posts import read_front_matter
+
+ARCHIVE_FORMAT = 'blogmanage-archive'
+ARCHIVE_VERSION = 1
+CURSOR_VERSION = 1
+BOOKS_MEMBER = '_data/books.yml'
+POSTS_PREFIX = '_posts/'
+TAR_SUFFIXES = ('.tar', '.tar.gz', '.tgz')
+GZIP_SUFFIXES = ('.gz', '.tgz')
+
+
+class ArchiveError(Exception):
+    """归档格式错误、内容不完整或与已有文章冲突"""
+
+
+def archive_kind(path, kind=None):
+    """按文件名判断归档类型，返回 (jsonl 或 tar, 是否压缩)"""
+    if kind is None:
+        if path == '-':
+            raise ArchiveError('使用标准输入输出时需要用 --format 指定格式')
+        kind = 'tar' if path.endswith(TAR_SUFFIXES) else 'jsonl'
+    return kind, path.endswith(GZIP_SUFFIXES)
+
+
+def safe_post_path(path):
+    """归档中的文章路径，必须是 _posts 内的相对路径"""
+    normalized = posixpath.normpath(path)
+    if (not path or path.startswith('/') or '\\' in path or normalized.startswith('..')
+            or normalized != path or not path.endswith(('.md', '.markdown'))):
+        raise ArchiveError(f"不安全的文章路径：{path}")
+    return path
+
+
+class ArchiveWriter:
+    """输出流：压缩时每个检查点结束一个 gzip 分段（多段 gzip 可连续解压），
+    检查点处的文件偏移可以直接截断后续写"""
+
+    def __init__(self, path, compress, offset=None, position=0):
+        self.compress = compress
+        # 已写入的未压缩字节数，tarfile 用它计算块对齐
+        self.position = position
+        self._compressor = None
+        if path == '-':
+            self.file = sys.stdout.buffer
+        elif offset is None:
+            self.file = open(path, 'wb')
+        else:
+            self.file = open(path, 'r+b')
+            self.file.truncate(offset)
+            self.file.seek(offset)
+
+    def write(self, data):
+        if self.compress:
+            if self._compressor is None:
+                # wbits=31 输出带头尾的完整 gzip 分段
+                self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+            self.file.write(self._compressor.compress(data))
+        else:
+            self.file.write(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def checkpoint(self):
+        """结束当前压缩分段并落盘，返回输出文件偏移"""
+        if self._compressor is not None:
+            self.file.write(self._compressor.flush())
+            self._compressor = None
+        self.file.flush()
+        if self.file is sys.stdout.buffer:
+            return None
+        os.fsync(self.file.fileno())
+        return self.file.tell()
+
+    def close(self):
+        self.checkpoint()
+        if self.file is not sys.stdout.buffer:
+            self.file.close()
+
+
+def iter_posts(posts_dir, after=None):
+    """按路径顺序逐篇产出 (相对路径, 原始头信息, 正文, 头信息)，after 之前（含）的文章跳过"""
+    for path in sorted(scan_posts(posts_dir)):
+        if after is not None and path <= after:
+            continue
+        filepath = os.path.join(posts_dir, path)
+        with open(filepath, 'rb') as f:
+            raw = f.read()
+        try:
+            meta, offset = read_front_matter(filepath)
+        except Exception:
+            # 头信息格式错误时整篇作为正文导出，内容仍然完整
+            meta, offset = {}, 0
+        yield path, raw[:offset].decode('utf-8'), raw[offset:].decode('utf-8'), meta
+
+
+def json_line(record):
+    return (json.dumps(record, ensure_ascii=False, default=str) + '\n').encode('utf-8')
+
+
+def books_yaml_chunks(books):
+    """books.yml 内容分块产出，与 BooksCatalog.save 的输出相同"""
+    yield 'books:\n' if books else 'books: []\n'
+    for book in books:
+        yield yamlio.dump([book])
+
+
+class Exporter:
+    """流式导出，定期保存游标以便续传"""
+
+    def __init__(self, project, output, kind=None, checkpoint_every=500):
+        self.project = project
+        self.output = output
+        self.kind, self.compress = archive_kind(output, kind)
+        self.checkpoint_every = checkpoint_every
+        self.cursor_file = None if output == '-' else output + '.cursor'
+
+    def _read_cursor(self):
+        try:
+            with open(self.cursor_file, 'r', encoding='utf-8') as f:
+                cursor = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if cursor.get('version') != CURSOR_VERSION or cursor.get('kind') != self.kind:
+            return None
+        if not os.path.exists(self.output) or os.path.getsize(self.output) < cursor['offset']:
+            return None
+        return cursor
+
+    def _save_cursor(self, writer, after, books, posts):
+        offset = writer.checkpoint()
+        if self.cursor_file is None:
+            return
+        cursor = {'version': CURSOR_VERSION, 'kind': self.kind, 'offset': offset,
+                  'position': writer.position, 'after': after, 'books': books, 'posts': posts}
+        tmp_path = self.cursor_file + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(cursor, f, ensure_ascii=False)
+        os.replace(tmp_path, self.cursor_file)
+
+    def run(self, resume=False):
+        """执行导出，返回 (书籍数, 文章数, 是否从游标续传)"""
+        cursor = self._read_cursor() if resume and self.cursor_file else None
+        if cursor is None:
+            writer = ArchiveWriter(self.output, self.compress)
+            after, book_count, post_count = None, 0, 0
+        else:
+            writer = ArchiveWriter(self.output, self.compress, cursor['offset'], cursor['position'])
+            after, book_count, post_count = cursor['after'], cursor['books'], cursor['posts']
+
+        try:
+            if self.kind == 'tar':
+                book_count, post_count = self._write_tar(writer, cursor, after, book_count, post_count)
+            else:
+                book_count, post_count = self._write_jsonl(writer, cursor, after, book_count, post_count)
+        finally:
+            writer.close()
+        if self.cursor_file and os.path.exists(self.cursor_file):
+            os.remove(self.cursor_file)
+        return book_count, post_count, cursor is not None
+
+    def _write_jsonl(self, writer, cursor, after, book_count, post_count):
+        if cursor is None:
+            writer.write(json_line({'type': 'header', 'format': ARCHIVE_FORMAT, 'version': ARCHIVE_VERSION,
+                                    'created': time.strftime('%Y-%m-%dT%H:%M:%S')}))
+            # 使用加载后的目录，包括尚未压缩的变更日志
+            for book in self.project.catalog.books():
+                writer.write(json_line({'type': 'book', 'book': book}))
+                book_count += 1
+            self._save_cursor(writer, None, book_count, post_count)
+
+        for path, front_matter, body, meta in iter_posts(self.project.posts_dir, after):
+            writer.write(json_line({'type': 'post', 'path': path, 'front_matter': front_matter,
+                                    'body': body, 'meta': meta}))
+            post_count += 1
+            if post_count % self.checkpoint_every == 0:
+                self._save_cursor(writer, path, book_count, post_count)
+        writer.write(json_line({'type': 'end', 'books': book_count, 'posts': post_count}))
+        return book_count, post_count
+
+    def _write_tar(self, writer, cursor, after, book_count, post_count):
+        # 非流模式的 TarFile 直接写入底层文件对象，两篇文章之间的输出总是块对齐的
+        tar = tarfile.TarFile(fileobj=writer, mode='w', format=tarfile.PAX_FORMAT)
+        mtime = time.time()
+        if cursor is None:
+            books = self.project.catalog.books()
+            data = ''.join(books_yaml_chunks(books)).encode('utf-8')
+            self._add_member(tar, BOOKS_MEMBER, data, mtime)
+            book_count = len(books)
+            self._save_cursor(writer, None, book_count, post_count)
+
+        for path, front_matter, body, _ in iter_posts(self.project.posts_dir, after):
+            self._add_member(tar, POSTS_PREFIX + path, (front_matter + body).encode('utf-8'), mtime)
+            post_count += 1
+            if post_count % self.checkpoint_every == 0:
+                self._save_cursor(writer, path, book_count, post_count)
+        tar.close()
+        return book_count, post_count
+
+    @staticmethod
+    def _add_member(tar, name, data, mtime):
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = mtime
+        info.mode = 0o644
+        tar.addfile(info, io.BytesIO(data))
+
+
+def read_jsonl(stream):
+    """逐行解析 JSON Lines 归档，产出 (类型, 内容)"""
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            raise ArchiveError(f"第 {line_number} 行不是有效的JSON（归档可能被截断）")
+        kind = record.get('type')
+        if kind == 'header':
+            if record.get('format') != ARCHIVE_FORMAT or record.get('version') != ARCHIVE_VERSION:
+                raise ArchiveError(f"不支持的归档格式：{record.get('format')} {record.get('version')}")
+            yield 'header', record
+        elif kind == 'book':
+            yield 'book', record['book']
+        elif kind == 'post':
+            yield 'post', (record['path'], (record['front_matter'] + record['body']).encode('utf-8'))
+        elif kind == 'end':
+            yield 'end', record
+        else:
+            raise ArchiveError(f"第 {line_number} 行的记录类型未知：{kind}")
+
+
+def read_tar(fileobj):
+    """流式读取 tar 归档，books.yml 以文件对象产出，原样复制"""
+    with tarfile.open(fileobj=fileobj, mode='r|') as tar:
+        yield 'header', {}
+        for member in tar:
+            if not member.isfile():
+                continue
+            name = member.name
+            if name == BOOKS_MEMBER:
+                yield 'books_file', tar.extractfile(member)
+            elif name.startswith(POSTS_PREFIX):
+                yield 'post', (name[len(POSTS_PREFIX):], tar.extractfile(member).read())
+            else:
+                raise ArchiveError(f"归档中有未知文件：{name}")
+        yield 'end', None
+
+
+def open_records(source, kind=None):
+    """打开归档，返回记录生成器"""
+    kind, compressed = archive_kind(source, kind)
+    raw = sys.stdin.buffer if source == '-' else open(source, 'rb')
+    # 导出的压缩归档由多个 gzip 分段组成，tarfile 自带的解压只读第一段，统一用 GzipFile 解压
+    stream = gzip.GzipFile(fileobj=raw) if compressed else raw
+    if kind == 'tar':
+        return read_tar(stream)
+    return read_jsonl(stream)
+
+
+class Restorer:
+    """从归档记录重建 _posts 和 books.yml
+
+    文章逐篇写入，内容相同的文件跳过，中断后重新运行即可继续；
+    books.yml 先写到临时文件，读到归档结尾才替换
+    """
+
+    def __init__(self, project, overwrite=False):
+        self.project = project
+        self.overwrite = overwrite
+        self.written = 0
+        self.unchanged = 0
+        self.books = 0
+
+    def write_post(self, path, data):
+        filepath = os.path.join(self.project.posts_dir, *safe_post_path(path).split('/'))
+        try:
+            if os.path.getsize(filepath) == len(data):
+                with open(filepath, 'rb') as f:
+                    if f.read() == data:
+                        self.unchanged += 1
+                        return
+            if not self.overwrite:
+                raise ArchiveError(f"文章 {path} 已存在且内容不同（使用 --overwrite 覆盖）")
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        with open(filepath, 'wb') as f:
+            f.write(data)
+        self.written += 1
+
+    def run(self, records):
+        """消费记录流，返回 (书籍数, 写入篇数, 未变化篇数)"""
+        books_file = self.project.books_file
+        books_dir = os.path.dirname(books_file)
+        os.makedirs(books_dir, exist_ok=True)
+        os.makedirs(self.project.posts_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix='.books-', suffix='.tmp', dir=books_dir)
+        complete = False
+        try:
+            with os.fdopen(fd, 'wb') as books_out:
+                for kind, value in records:
+                    if kind == 'book':
+                        if self.books == 0:
+                            books_out.write(b'books:\n')
+                        books_out.write(yamlio.dump([value]).encode('utf-8'))
+                        self.books += 1
+                    elif kind == 'books_file':
+                        shutil.copyfileobj(value, books_out)
+                        # 原样复制，书籍数在最后重新加载目录后统计
+                        self.books = None
+                    elif kind == 'post':
+                        self.write_post(*value)
+                    elif kind == 'end':
+                        if value is not None and value.get('books') != self.books:
+                            raise ArchiveError(f"书籍数不符：归档记录 {value.get('books')} 本，读到 {self.books} 本")
+                        complete = True
+                if self.books == 0:
+                    books_out.write(b'books: []\n')
+            if not complete:
+                raise ArchiveError('归档不完整，books.yml 未替换；已写入的文章会在重新运行时跳过')
+            if os.path.exists(books_file):
+                shutil.copymode(books_file, tmp_path)
+            else:
+                os.chmod(tmp_path, 0o644)
+            # 与其他进程的写回互斥；归档中的目录已包含导出时的变更日志，旧日志不能再重放
+            with self.project.catalog.locked():
+                os.replace(tmp_path, books_file)
+                if os.path.exists(self.project.catalog.journal_file):
+                    os.remove(self.project.catalog.journal_file)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        self.books = len(self.project.reload().books())
+        self.project.update_book_nav()
+        return self.books, self.written, self.unchanged
+
+
+def main(argv=None):
+    from core import BlogProject
+
+    parser = argparse.ArgumentParser(description='流式导出或恢复全部文章和 books.yml')
+    parser.add_argument('action', choices=['export', 'restore'], help='export 导出，restore 从归档恢复')
+    parser.add_argument('path', help='归档文件（.jsonl、.jsonl.gz、.tar、.tar.gz），- 为标准输入输出')
+    parser.add_argument('--root', default=None, help='博客根目录（默认为BlogManage的上级目录）')
+    parser.add_argument('--format', choices=['jsonl', 'tar'], default=None, help='归档格式（默认按文件名判断）')
+    parser.add_argument('--resume', action='store_true', help='从上次中断的游标处继续导出')
+    parser.add_argument('--checkpoint', type=int, default=500, help='导出时每隔多少篇保存一次游标')
+    parser.add_argument('--overwrite', action='store_true', help='恢复时覆盖内容不同的已有文章')
+    args = parser.parse_args(argv)
+
+    project = BlogProject(args.root)
+    # 标准输出用于传输归档时，提示信息写到标准错误
+    log = sys.stderr if args.path == '-' else sys.stdout
+    start = time.perf_counter()
+    try:
+        if args.action == 'export':
+            project.load()
+            books, posts, resumed = Exporter(project, args.path, args.format, args.checkpoint).run(args.resume)
+            print(f"{'从游标续传，' if resumed else ''}导出书籍 {books} 本、文章 {posts} 篇，"
+                  f"用时 {time.perf_counter() - start:.1f} 秒", file=log)
+        else:
+            books, written, unchanged = Restorer(project, args.overwrite).run(open_records(args.path, args.format))
+            print(f"恢复书籍 {books} 本，写入文章 {written} 篇，内容相同跳过 {unchanged} 篇，"
+                  f"用时 {time.perf_counter() - start:.1f} 秒", file=log)
+    except (ArchiveError, tarfile.TarError, EOFError, OSError) as e:
+        print(f"{'导出' if args.action == 'export' else '恢复'}失败：{e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量导入工具 - 无界面批量创建文章
+读取草稿目录或清单（CSV/YAML），在进程池中生成文章文件，
+最后将全部 books.yml 变更合并为一次写入
+
+用法:
+    python batch_import.py 草稿目录
+    python batch_import.py manifest.csv --workers 8
+    python blog_manager.py import 草稿目录
+"""
+
+import os
+import sys
+import csv
+import time
+import argparse
+from datetime import date, datetime
+from concurrent.futures import ProcessPoolExecutor
+
+import yamlio
+from core import DEFAULT_PROJECT_ROOT, BlogProject, section_name
+from posts import build_article_data, post_filename, read_body, read_front_matter, render_post
+
+REQUIRED_FIELDS = ('book', 'chapter', 'section', 'title')
+
+
+class DraftError(Exception):
+    """草稿数据错误或slug冲突"""
+
+
+def parse_date(value):
+    """将头信息或清单中的日期转换为datetime"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    return datetime.strptime(str(value).strip()[:10], '%Y-%m-%d')
+
+
+def normalize_tags(value):
+    """标签统一为逗号分隔字符串"""
+    if not value:
+        return ''
+    if isinstance(value, (list, tuple)):
+        return ', '.join(str(tag) for tag in value)
+    return str(value)
+
+
+def read_draft_front_matter(path):
+    """读取草稿头信息；文件无法读取或YAML格式错误时抛出 DraftError"""
+    # PyYAML 只在真正读写时导入
+    import yaml
+    try:
+        return read_front_matter(path)
+    except (OSError, UnicodeDecodeError, yaml.YAMLError) as e:
+        raise DraftError(f"{path}: 无法读取头信息：{e}") from e
+
+
+def load_directory(source):
+    """读取目录中的Markdown草稿，头信息中需包含书籍、章节、小节和标题"""
+    drafts = []
+    for name in sorted(os.listdir(source)):
+        if not name.endswith('.md'):
+            continue
+        path = os.path.join(source, name)
+        meta, offset = read_draft_front_matter(path)
+        meta['body_file'] = path
+        meta['body_offset'] = offset
+        drafts.append(meta)
+    return drafts
+
+
+def load_manifest(source):
+    """读取CSV或YAML清单，file 列为相对清单的正文文件路径"""
+    import yaml
+    base_dir = os.path.dirname(os.path.abspath(source))
+    try:
+        if source.endswith('.csv'):
+            with open(source, 'r', encoding='utf-8-sig', newline='') as f:
+                rows = list(csv.DictReader(f))
+        else:
+            with open(source, 'r', encoding='utf-8') as f:
+                rows = yamlio.safe_load(f) or []
+            if isinstance(rows, dict):
+                rows = rows.get('posts') or []
+    except (OSError, UnicodeDecodeError, csv.Error, yaml.YAMLError) as e:
+        raise DraftError(f"{source}: 无法读取清单：{e}") from e
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        raise DraftError(f"{source}: 清单应为文章列表，每条文章为一组字段")
+
+    drafts = []
+    for row in rows:
+        row = dict(row)
+        if row.get('file'):
+            row['body_file'] = os.path.join(base_dir, row.pop('file'))
+            row['body_offset'] = read_draft_front_matter(row['body_file'])[1]
+        drafts.append(row)
+    return drafts
+
+
+def load_drafts(source):
+    """按来源类型读取草稿"""
+    if os.path.isdir(source):
+        return load_directory(source)
+    return load_manifest(source)
+
+
+def prepare_jobs(drafts, posts_dir, overwrite=False, permalinks=None, catalog=None):
+    """生成文章数据并检查slug冲突，发现冲突立即失败
+
+    传入 permalinks 时同时检查与已有文章、小节的文件名和URL冲突，
+    即使 overwrite 也不会覆盖属于其他小节的文章
+    """
+    jobs = []
+    filenames = {}
+    sections = {}
+    for index, draft in enumerate(drafts, 1):
+        label = draft.get('body_file') or f"第{index}条"
+        missing = [field for field in REQUIRED_FIELDS if not draft.get(field)]
+        if missing:
+            raise DraftError(f"{label}: 缺少字段 {', '.join(missing)}")
+
+        try:
+            draft_date = parse_date(draft.get('date'))
+        except ValueError:
+            raise DraftError(f"{label}: 日期 {draft.get('date')!r} 格式错误（应为 YYYY-MM-DD）") from None
+
+        article_data = build_article_data(
+            str(draft['book']), str(draft['chapter']), str(draft['section']), str(draft['title']),
+            tags=normalize_tags(draft.get('tags')),
+            description=str(draft.get('description') or ''),
+            content=str(draft.get('content') or ''),
+            subtitle=str(draft.get('subtitle') or ''),
+            date=draft_date,
+            template=str(draft.get('template') or ''))
+
+        filename = post_filename(article_data)
+        if filename in filenames:
+            raise DraftError(f"{label}: 文件名 {filename} 与 {filenames[filename]} 冲突")
+        if not overwrite and os.path.exists(os.path.join(posts_dir, filename)):
+            raise DraftError(f"{label}: 文件 {filename} 已存在（使用 --overwrite 覆盖）")
+        filenames[filename] = label
+        if permalinks is not None:
+            problems = permalinks.conflicts(article_data, catalog)
+            if problems:
+                raise DraftError(f"{label}: {filename} " + '；'.join(problems))
+
+        key = (article_data['book'], article_data['chapter'], section_name(article_data))
+        if key in sections:
+            raise DraftError(f"{label}: 小节 {key[2]} 与 {sections[key]} 重复")
+        sections[key] = label
+
+        jobs.append((posts_dir, article_data, draft.get('body_file'), draft.get('body_offset', 0)))
+    return jobs
+
+
+def write_job(job):
+    """进程池任务：读取正文、渲染并写入文章文件"""
+    posts_dir, article_data, body_file, body_offset = job
+    if body_file:
+        article_data['content'] = read_body(body_file, body_offset).lstrip('\r\n')
+    filepath = os.path.join(posts_dir, post_filename(article_data))
+    with open(filepath, 'w', encoding='utf-8') as f:
+        f.write(render_post(article_data))
+    return filepath
+
+
+def run_import(source, project_root, workers=None, overwrite=False):
+    """执行批量导入，返回 (导入篇数, 用时秒数)"""
+    project = BlogProject(project_root)
+
+    start = time.perf_counter()
+    project.load()
+    jobs = prepare_jobs(load_drafts(source), project.posts_dir, overwrite,
+                        project.permalinks, project.catalog)
+    if not jobs:
+        return 0, time.perf_counter() - start
+
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for _ in executor.map(write_job, jobs, chunksize=chunksize):
+            pass
+
+    # 所有小节变更合并为一次books.yml写入
+    for _, article_data, _, _ in jobs:
+        project.update_catalog(article_data, journal=False)
+    project.catalog.save()
+
+    return len(jobs), time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='批量导入Markdown草稿')
+    parser.add_argument('source', help='草稿目录，或CSV/YAML清单文件')
+    parser.add_argument('--root', default=DEFAULT_PROJECT_ROOT,
+                        help='博客根目录（默认为BlogManage的上级目录）')
+    parser.add_argument('--workers', type=int, default=None, help='进程数（默认为CPU核数）')
+    parser.add_argument('--overwrite', action='store_true', help='覆盖已存在的文章文件')
+    args = parser.parse_args(argv)
+
+    try:
+        count, elapsed = run_import(args.source, args.root, args.workers, args.overwrite)
+    except DraftError as e:
+        print(f"导入失败：{e}", file=sys.stderr)
+        return 1
+
+    rate = count / elapsed if elapsed else 0
+    print(f"导入 {count} 篇文章，用时 {elapsed:.2f} 秒（{rate:.1f} 篇/秒）")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
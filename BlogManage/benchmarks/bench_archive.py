@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+导出与恢复基准 - 在合成站点上往返导出、恢复全部文章，测量耗时和子进程峰值内存
+峰值内存只随书籍目录和路径列表增长，不随正文总量增长；
+--verify 逐字节核对恢复结果，并模拟导出中途被杀死后用 --resume 续传
+
+用法:
+    python benchmarks/bench_archive.py --sizes 5000 50000 --verify
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+from synthetic import BLOG_MANAGE_DIR, make_site
+
+from post_index import scan_posts  # noqa: E402
+
+ARCHIVE_SCRIPT = os.path.join(BLOG_MANAGE_DIR, 'archive.py')
+FORMATS = ['jsonl.gz', 'tar.gz']
+# 在子进程中运行脚本，退出时把峰值常驻内存（KB）写到标准错误最后一行
+MEASURE = (
+    "import sys, runpy\n"
+    "sys.argv = sys.argv[1:]\n"
+    "try:\n"
+    "    runpy.run_path(sys.argv[0], run_name='__main__')\n"
+    "finally:\n"
+    "    with open('/proc/self/status') as f:\n"
+    "        print(f.read().split('VmHWM:')[1].split()[0], file=sys.stderr)\n"
+)
+
+
+def run(args):
+    """运行 archive.py，返回 (秒数, 峰值内存MB, 输出)
+
+    峰值内存取子进程自己的 VmHWM（Linux）：ru_maxrss 会继承 fork 时父进程的占用，不能用于比较
+    """
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', MEASURE, ARCHIVE_SCRIPT] + args, cwd=BLOG_MANAGE_DIR,
+                            capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    lines = result.stderr.strip().splitlines()
+    if result.returncode != 0:
+        raise RuntimeError('\n'.join([result.stdout.strip()] + lines[:-1]))
+    return elapsed, int(lines[-1]) / 1024, result.stdout.strip()
+
+
+def same_tree(source, target):
+    """逐篇比较两个站点的文章和 books.yml，返回不一致的文件列表"""
+    different = []
+    for root in (source, target):
+        if not os.path.exists(os.path.join(root, '_data', 'books.yml')):
+            return ['_data/books.yml']
+    pairs = [('_data/books.yml', os.path.join(source, '_data', 'books.yml'),
+              os.path.join(target, '_data', 'books.yml'))]
+    source_posts = scan_posts(os.path.join(source, '_posts'))
+    target_posts = scan_posts(os.path.join(target, '_posts'))
+    different.extend(sorted(set(source_posts) ^ set(target_posts)))
+    pairs.extend((path, os.path.join(source, '_posts', path), os.path.join(target, '_posts', path))
+                 for path in sorted(set(source_posts) & set(target_posts)))
+    for name, left, right in pairs:
+        with open(left, 'rb') as a, open(right, 'rb') as b:
+            if a.read() != b.read():
+                different.append(name)
+    return different
+
+
+def interrupted_export(root, output, posts):
+    """导出到一半时杀死进程，再用 --resume 续传，返回续传的输出"""
+    process = subprocess.Popen([sys.executable, ARCHIVE_SCRIPT, 'export', output, '--root', root,
+                                '--checkpoint', '200'], cwd=BLOG_MANAGE_DIR,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    cursor_file = output + '.cursor'
+    while process.poll() is None:
+        try:
+            with open(cursor_file, 'r', encoding='utf-8') as f:
+                if json.load(f)['posts'] >= posts // 2:
+                    break
+        except (OSError, ValueError):
+            pass
+        time.sleep(0.01)
+    process.send_signal(signal.SIGKILL)
+    process.wait()
+    return run(['export', output, '--root', root, '--resume'])[2]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='导出与恢复往返基准')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[5000, 50000], help='合成文章数，可指定多个')
+    parser.add_argument('--formats', nargs='+', choices=FORMATS, default=FORMATS, help='归档格式')
+    parser.add_argument('--verify', action='store_true', help='核对恢复结果并测试中断续传')
+    args = parser.parse_args(argv)
+
+    ok = True
+    for posts in args.sizes:
+        root = tempfile.mkdtemp(prefix='blog-bench-')
+        try:
+            start = time.perf_counter()
+            make_site(os.path.join(root, 'site'), posts)
+            site = os.path.join(root, 'site')
+            print(f"\n== {posts} 篇文章（生成站点 {time.perf_counter() - start:.1f} s）")
+            for fmt in args.formats:
+                archive = os.path.join(root, f'backup.{fmt}')
+                target = os.path.join(root, f'restored-{fmt}')
+                export_s, export_mb, _ = run(['export', archive, '--root', site])
+                restore_s, restore_mb, _ = run(['restore', archive, '--root', target])
+                size_mb = os.path.getsize(archive) / 1024 / 1024
+                print(f"{fmt:<9} 导出 {export_s:6.1f} s / 峰值 {export_mb:5.0f} MB   "
+                      f"恢复 {restore_s:6.1f} s / 峰值 {restore_mb:5.0f} MB   归档 {size_mb:.1f} MB")
+
+                if args.verify:
+                    different = same_tree(site, target)
+                    print(f"          恢复结果{'一致' if not different else f'不一致：{different[:5]}'}")
+                    resumed = os.path.join(root, f'resumed.{fmt}')
+                    message = interrupted_export(site, resumed, posts)
+                    resumed_target = os.path.join(root, f'resumed-{fmt}')
+                    run(['restore', resumed, '--root', resumed_target])
+                    resumed_different = same_tree(site, resumed_target)
+                    print(f"          中断续传：{message}；恢复结果"
+                          f"{'一致' if not resumed_different else f'不一致：{resumed_different[:5]}'}")
+                    ok = ok and not different and not resumed_different and '续传' in message
+                shutil.rmtree(target, ignore_errors=True)
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
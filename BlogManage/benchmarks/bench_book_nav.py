@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+书籍导航基准 - 在合成站点上对比 _layouts/book.html 两种侧栏目录的 jekyll build 耗时
+liquid：没有 _data/book_nav.yml，每篇文章都遍历 books.yml 渲染所属书籍的目录；
+include：插入 BlogManage 预先生成的 _includes/book_nav/<编号>.html。
+同时测量导航文件的全量生成和只改动一本书后的增量生成耗时，--verify 核对两种方式输出的目录链接相同
+
+用法:
+    python benchmarks/bench_book_nav.py --posts 5000
+    python benchmarks/bench_book_nav.py --posts 5000 --jekyll "bundle exec jekyll" --profile --verify
+"""
+
+import os
+import re
+import sys
+import html
+import time
+import shlex
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+from synthetic import BLOG_MANAGE_DIR, make_site
+
+from book_nav import NAV_DATA, NAV_DIR, BookNav  # noqa: E402
+
+SITE_ROOT = os.path.dirname(BLOG_MANAGE_DIR)
+CONFIG = """permalink: pretty
+future: true
+timezone: Asia/Shanghai
+exclude: [".cache"]
+"""
+TOC_RE = re.compile(r'<nav class="book-toc"[^>]*>(.*?)</nav>', re.S)
+LINK_RE = re.compile(r'<a href="([^"]*)">\s*(.*?)\s*</a>', re.S)
+
+
+def prepare_site(root, posts):
+    """生成合成文章和 books.yml，并放入站点的 book 布局和最简 default 布局"""
+    project = make_site(root, posts)
+    os.makedirs(os.path.join(root, '_layouts'), exist_ok=True)
+    shutil.copy(os.path.join(SITE_ROOT, '_layouts', 'book.html'), os.path.join(root, '_layouts'))
+    with open(os.path.join(root, '_layouts', 'default.html'), 'w', encoding='utf-8') as f:
+        f.write('<!DOCTYPE html>\n<html><body>\n{{ content }}\n</body></html>\n')
+    with open(os.path.join(root, '_config.yml'), 'w', encoding='utf-8') as f:
+        f.write(CONFIG)
+    return project
+
+
+def time_generation(project):
+    """返回 (全量生成秒数, 改动一本书后增量生成秒数)"""
+    shutil.rmtree(os.path.join(project.project_root, NAV_DIR), ignore_errors=True)
+    start = time.perf_counter()
+    BookNav(project.project_root).update(project.catalog)
+    full = time.perf_counter() - start
+
+    # 与保存文章时相同：写回 books.yml 后由 on_save 只重新生成改动的书籍
+    catalog = project.catalog
+    book = catalog.books()[0]
+    chapter = book['chapters'][0]
+    section = chapter['sections'][0]
+    catalog.upsert_section(book['name'], chapter['name'], section['name'] + '（修订）',
+                           section['slug'], section['url'])
+    catalog.on_save = None
+    catalog.save()
+    catalog.on_save = project.update_book_nav
+    start = time.perf_counter()
+    written, _ = project.update_book_nav()
+    incremental = time.perf_counter() - start
+    return full, incremental, len(written)
+
+
+def jekyll_build(command, root, destination, profile):
+    args = shlex.split(command) + ['build', '--source', root, '--destination', destination]
+    if profile:
+        args.append('--profile')
+    start = time.perf_counter()
+    result = subprocess.run(args, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError((result.stderr or result.stdout).strip())
+    return elapsed, result.stdout
+
+
+def toc_links(path):
+    """页面侧栏目录中的 (链接, 名称) 列表"""
+    with open(path, 'r', encoding='utf-8') as f:
+        match = TOC_RE.search(f.read())
+    if not match:
+        return None
+    return [(html.unescape(href), html.unescape(text)) for href, text in LINK_RE.findall(match.group(1))]
+
+
+def sample_pages(destination, count=20):
+    pages = []
+    for directory, _, files in os.walk(destination):
+        if 'index.html' in files and directory != destination:
+            pages.append(os.path.relpath(os.path.join(directory, 'index.html'), destination))
+    pages.sort()
+    step = max(1, len(pages) // count)
+    return pages[::step]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='书籍导航 jekyll build 耗时对比')
+    parser.add_argument('--posts', type=int, default=5000, help='合成文章数')
+    parser.add_argument('--jekyll', default='jekyll', help='Jekyll 命令，例如 "bundle exec jekyll"')
+    parser.add_argument('--repeat', type=int, default=1, help='每种方式构建次数，取最快一次')
+    parser.add_argument('--profile', action='store_true', help='打印 jekyll --profile 的模板耗时表')
+    parser.add_argument('--verify', action='store_true', help='核对两种方式输出的目录链接相同')
+    parser.add_argument('--keep', action='store_true', help='保留合成站点目录')
+    args = parser.parse_args(argv)
+
+    root = tempfile.mkdtemp(prefix='blog-nav-')
+    try:
+        start = time.perf_counter()
+        project = prepare_site(root, args.posts)
+        print(f"合成站点：{args.posts} 篇文章，{len(project.catalog.books())} 本书"
+              f"（生成 {time.perf_counter() - start:.1f} s）")
+
+        full, incremental, written = time_generation(project)
+        print(f"导航生成：全量 {full * 1000:.1f} ms，改动一本书后增量 {incremental * 1000:.1f} ms"
+              f"（写入 {written} 个文件）")
+
+        if shutil.which(shlex.split(args.jekyll)[0]) is None:
+            print(f"找不到 {args.jekyll}，跳过 jekyll build 对比（安装 Jekyll 或用 --jekyll 指定命令）")
+            return 1
+
+        data_file = os.path.join(root, NAV_DATA)
+        hidden = data_file + '.off'
+        results = {}
+        outputs = {}
+        for mode in ('liquid', 'include'):
+            # liquid 方式移走名称映射，布局退回遍历 books.yml
+            if mode == 'liquid':
+                os.replace(data_file, hidden)
+            elif os.path.exists(hidden):
+                os.replace(hidden, data_file)
+            destination = os.path.join(root, f'_site-{mode}')
+            timings = []
+            for _ in range(args.repeat):
+                elapsed, stdout = jekyll_build(args.jekyll, root, destination, args.profile)
+                timings.append(elapsed)
+            results[mode] = min(timings)
+            outputs[mode] = destination
+            print(f"{mode:<8} jekyll build 最快 {results[mode]:.1f} s")
+            if args.profile:
+                print(stdout)
+        print(f"预生成导航后构建耗时为原来的 {results['include'] / results['liquid'] * 100:.0f}%")
+
+        if args.verify:
+            pages = sample_pages(outputs['include'])
+            different = [page for page in pages
+                         if toc_links(os.path.join(outputs['liquid'], page))
+                         != toc_links(os.path.join(outputs['include'], page))]
+            for page in different:
+                print(f"不一致！{page}")
+            print(f"核对 {len(pages)} 个页面，{len(different)} 个不一致")
+            return 1 if different else 0
+    finally:
+        if args.keep:
+            print(f"合成站点保留在 {root}")
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+并发写入压力测试 - 多个写入进程同时修改同一个 books.yml，核对没有丢失的小节并测量吞吐
+每个进程交替使用两种写法：界面的逐篇追加变更日志（record_section，达到阈值自动压缩）和
+批量导入的内存修改后一次写回（upsert_section + save）；各进程写入同一批书籍，写回时需要三方合并，
+并反复改写同一组共享小节制造冲突。结束后重新加载目录，逐一核对每个进程写入的小节
+
+用法:
+    python benchmarks/bench_concurrent_catalog.py --writers 8 --batches 20 --batch-size 50
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import multiprocessing
+
+from synthetic import make_site
+
+from core import BlogProject  # noqa: E402
+
+SHARED_BOOK = '共享书籍'
+SHARED_CHAPTER = '共享章节'
+SHARED_SECTIONS = 5
+# 每批第 0、10、20……个小节之后改写一个共享小节
+SHARED_EVERY = 10
+
+
+def section_key(writer, batch, item, books):
+    """写入进程的第 batch 批第 item 个小节：(书籍, 章节, 小节名称)；相邻进程写入同一本书"""
+    return f"合成书籍{(writer + batch) % books + 1}", f"并发章节{writer}", f"w{writer}-b{batch}-i{item}"
+
+
+def writer(root, index, batches, batch_size, books, results):
+    """一个写入进程：偶数批一次写回，奇数批逐篇追加变更日志"""
+    project = BlogProject(root).load()
+    catalog = project.catalog
+    conflicts = 0
+    saves = 0
+    start = time.perf_counter()
+    for batch in range(batches):
+        for item in range(batch_size):
+            book, chapter, name = section_key(index, batch, item, books)
+            update = catalog.record_section if batch % 2 else catalog.upsert_section
+            update(book, chapter, name, f"{name}-slug", f"/{name}/")
+            if item % SHARED_EVERY == 0:
+                shared = f"共享小节{item // SHARED_EVERY % SHARED_SECTIONS}"
+                update(SHARED_BOOK, SHARED_CHAPTER, shared, f"w{index}", f"/shared/w{index}-{batch}/")
+            if batch % 2 and catalog.pending == 0:
+                # 变更日志达到阈值时 record_section 已自动压缩写回
+                saves += 1
+                conflicts += len(catalog.conflicts)
+        if batch % 2 == 0:
+            catalog.save()
+            saves += 1
+            conflicts += len(catalog.conflicts)
+    if catalog.pending:
+        catalog.save()
+        saves += 1
+        conflicts += len(catalog.conflicts)
+    results.put((index, time.perf_counter() - start, saves, conflicts))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='多进程并发修改 books.yml 的压力测试')
+    parser.add_argument('--writers', type=int, default=8, help='并发写入进程数')
+    parser.add_argument('--batches', type=int, default=20, help='每个进程的批次数')
+    parser.add_argument('--batch-size', type=int, default=50, help='每批写入的小节数')
+    parser.add_argument('--sections', type=int, default=20000, help='初始目录的小节数')
+    args = parser.parse_args(argv)
+
+    root = tempfile.mkdtemp(prefix='blog-stress-')
+    try:
+        project = make_site(root, args.sections, with_posts=False)
+        books = len(project.catalog.books())
+        print(f"初始目录：{args.sections} 个小节，{books} 本书；"
+              f"{args.writers} 个进程 × {args.batches} 批 × {args.batch_size} 个小节")
+
+        context = multiprocessing.get_context('spawn')
+        results = context.Queue()
+        processes = [context.Process(target=writer, args=(root, index, args.batches, args.batch_size, books, results))
+                     for index in range(args.writers)]
+        start = time.perf_counter()
+        for process in processes:
+            process.start()
+        reports = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - start
+
+        failed = [process.exitcode for process in processes if process.exitcode]
+        total = args.writers * args.batches * args.batch_size
+        saves = sum(report[2] for report in reports)
+        conflicts = sum(report[3] for report in reports)
+        print(f"写入 {total} 个小节，写回 {saves} 次，用时 {elapsed:.1f} s："
+              f"{total / elapsed:.0f} 小节/s，{saves / elapsed:.1f} 次写回/s，合并冲突 {conflicts} 个")
+
+        catalog = BlogProject(root).load().catalog
+        expected = (section_key(index, batch, item, books) for index in range(args.writers)
+                    for batch in range(args.batches) for item in range(args.batch_size))
+        missing = [key for key in expected if catalog.get_section(*key) is None]
+        shared = catalog.get_chapter(SHARED_BOOK, SHARED_CHAPTER)
+        shared_count = len(shared['sections']) if shared else 0
+        shared_expected = min(SHARED_SECTIONS, -(-args.batch_size // SHARED_EVERY)) if args.batches else 0
+        journal_left = os.path.exists(catalog.journal_file)
+        print(f"丢失小节 {len(missing)} 个{('：' + str(missing[:5])) if missing else ''}；"
+              f"共享小节 {shared_count}/{shared_expected}；"
+              f"目录共 {sum(catalog.book_counts(name)[1] for name in catalog.book_names())} 个小节；"
+              f"残留变更日志：{'有' if journal_left else '无'}")
+        ok = not failed and not missing and shared_count == shared_expected and not journal_left
+        return 0 if ok else 1
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+全文搜索基准 - 在合成站点上测量 FTS5 索引的全量建立、增量更新和查询耗时
+合成文章正文相同，常用词命中全部文章，是排序开销最大的情况；
+任一查询最慢一次超过 --limit-ms 时返回非零退出码
+
+用法:
+    python benchmarks/bench_post_search.py --posts 10000
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+
+from synthetic import make_site, synthetic_articles
+
+from post_search import PostSearch  # noqa: E402
+
+QUERIES = ['GPIO', '寄存器', 'NVIC 优先级', '中断线映射', 'RCC_APB2PeriphClockCmd', '合成文章 1234',
+           '时', 'gpi', 'STM32 基准', '不存在的词']
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='全文搜索基准')
+    parser.add_argument('--posts', type=int, default=10000, help='合成文章数')
+    parser.add_argument('--repeat', type=int, default=20, help='每个查询的重复次数')
+    parser.add_argument('--limit-ms', type=float, default=50, help='单次查询耗时上限（毫秒）')
+    args = parser.parse_args(argv)
+
+    root = tempfile.mkdtemp(prefix='blog-bench-')
+    try:
+        project = make_site(root, args.posts)
+        cache_file = os.path.join(project.cache_dir, 'search.sqlite')
+
+        search = PostSearch(project.posts_dir, cache_file)
+        start = time.perf_counter()
+        search.refresh()
+        print(f"全量建立索引：{args.posts} 篇，{time.perf_counter() - start:.2f} s，"
+              f"{os.path.getsize(cache_file) / 1024 / 1024:.1f} MB")
+        search.close()
+
+        search = project.post_search
+        start = time.perf_counter()
+        search.refresh()
+        print(f"打开并检查变化：{(time.perf_counter() - start) * 1000:.1f} ms")
+
+        # 与界面保存时相同：写入文章后只重新索引这一篇
+        article = list(synthetic_articles(1))[0]
+        article['content'] += '\n新增的段落：DMA 双缓冲模式\n'
+        start = time.perf_counter()
+        project.write_article(article)
+        print(f"保存一篇文章并更新索引：{(time.perf_counter() - start) * 1000:.1f} ms")
+        assert search.search('双缓冲'), '保存后的文章没有进入索引'
+
+        slowest = 0
+        print(f"\n{'查询':<24}{'结果':>6}{'中位数 ms':>12}{'最慢 ms':>10}")
+        for query in QUERIES:
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                results = search.search(query)
+                timings.append((time.perf_counter() - start) * 1000)
+            slowest = max(slowest, max(timings))
+            print(f"{query:<24}{len(results):>6}{statistics.median(timings):>12.2f}{max(timings):>10.2f}")
+        search.close()
+
+        print(f"\n最慢查询 {slowest:.1f} ms（上限 {args.limit_ms:.0f} ms）")
+        return 0 if slowest <= args.limit_ms else 1
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
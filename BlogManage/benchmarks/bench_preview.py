@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+实时预览基准 - 在约50 KB的文章上测量每次按键和每次预览刷新的耗时
+用 _posts 中最长的文章重复拼接出指定大小的正文，逐字输入并在每次输入后刷新预览，
+与整篇重新渲染、setHtml 的耗时对比；--verify 在随机编辑后核对增量结果与从头构建的结果一致
+
+用法:
+    python benchmarks/bench_preview.py --kb 50 --keys 200 --verify
+"""
+
+import os
+import sys
+import random
+import argparse
+import statistics
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from synthetic import BLOG_MANAGE_DIR  # noqa: E402
+
+from PyQt5.QtWidgets import QApplication, QTextEdit  # noqa: E402
+from PyQt5.QtGui import QTextCursor  # noqa: E402
+
+from gui import LivePreview  # noqa: E402
+from preview import MarkdownPreview  # noqa: E402
+
+POSTS_DIR = os.path.join(os.path.dirname(BLOG_MANAGE_DIR), '_posts')
+
+
+def sample_body():
+    """_posts 中最长文章的正文（去掉头信息）"""
+    longest = ''
+    for current, _, files in os.walk(POSTS_DIR):
+        for name in files:
+            if name.endswith('.md'):
+                with open(os.path.join(current, name), 'r', encoding='utf-8') as f:
+                    text = f.read()
+                if len(text) > len(longest):
+                    longest = text
+    if longest.startswith('---'):
+        longest = longest.split('\n---', 1)[-1].split('\n', 1)[-1]
+    return longest
+
+
+def make_body(kb):
+    """重复拼接样本正文直到达到 kb 千字节"""
+    sample = sample_body()
+    parts = []
+    size = 0
+    while size < kb * 1024:
+        parts.append(sample)
+        size += len(sample.encode('utf-8'))
+    return '\n\n'.join(parts)
+
+
+def timings(values):
+    values = sorted(values)
+    return (f"中位数 {statistics.median(values) * 1000:.2f} ms，"
+            f"p95 {values[int(len(values) * 0.95)] * 1000:.2f} ms，最大 {values[-1] * 1000:.2f} ms")
+
+
+def full_render(text):
+    """不使用缓存，整篇渲染并 setHtml"""
+    browser = LivePreview(QTextEdit())
+    start = time.perf_counter()
+    browser.setHtml(MarkdownPreview().html(text))
+    return time.perf_counter() - start
+
+
+def verify(app, body, edits, seed=0):
+    """随机插入、删除文本后，增量更新的文档应与整篇渲染的文档一致"""
+    rng = random.Random(seed)
+    editor = QTextEdit()
+    preview = LivePreview(editor)
+    editor.setPlainText(body)
+    preview.refresh()
+    for _ in range(edits):
+        text = editor.toPlainText()
+        cursor = editor.textCursor()
+        cursor.setPosition(rng.randrange(len(text)))
+        choice = rng.random()
+        if choice < 0.5:
+            cursor.insertText(rng.choice(['x', '\n', '\n\n', '**粗体**', '\n```\n', '- 列表项\n', '# 标题\n']))
+        else:
+            cursor.setPosition(min(len(text), cursor.position() + rng.randint(1, 200)), QTextCursor.KeepAnchor)
+            cursor.removeSelectedText()
+        preview.refresh()
+    source = QTextEdit()
+    source.setPlainText(editor.toPlainText())
+    expected = LivePreview(source)
+    expected.refresh()
+    return preview.toHtml() == expected.toHtml()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='实时预览延迟基准')
+    parser.add_argument('--kb', type=int, default=50, help='正文大小（KB）')
+    parser.add_argument('--keys', type=int, default=200, help='模拟输入的字符数')
+    parser.add_argument('--verify', action='store_true', help='随机编辑后核对增量结果')
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    body = make_body(args.kb)
+    print(f"正文 {len(body.encode('utf-8')) / 1024:.0f} KB，{len(MarkdownPreview().update(body))} 个块")
+
+    editor = QTextEdit()
+    preview = LivePreview(editor)
+    editor.setPlainText(body)
+    start = time.perf_counter()
+    preview.refresh()
+    print(f"首次渲染：{(time.perf_counter() - start) * 1000:.1f} ms")
+
+    # 在正文中间逐字输入：按键本身只重启定时器，刷新只重新渲染当前块
+    cursor = editor.textCursor()
+    cursor.setPosition(len(body) // 2)
+    keys, refreshes = [], []
+    for i in range(args.keys):
+        start = time.perf_counter()
+        cursor.insertText('测' if i % 2 else 'a')
+        keys.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        preview.refresh()
+        refreshes.append(time.perf_counter() - start)
+    print(f"按键处理：{timings(keys)}")
+    print(f"增量刷新：{timings(refreshes)}（最后一次重新渲染 {preview.renderer.rendered} 个块）")
+    print(f"整篇渲染并 setHtml：{full_render(editor.toPlainText()) * 1000:.1f} ms")
+
+    if args.verify:
+        ok = verify(app, body, 300)
+        print("增量结果与从头构建一致" if ok else "增量结果与从头构建不一致！")
+        return 0 if ok else 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+渲染吞吐基准 - 用合成文章数据测量 render_post 的速度
+首轮包含头信息字段缓存的建立，之后各轮为稳定速度；
+可选把渲染结果重新解析，确认头信息与文章数据一致
+
+用法:
+    python benchmarks/bench_render.py --posts 10000 --rounds 3 --verify
+"""
+
+import sys
+import time
+import argparse
+
+from synthetic import synthetic_articles
+
+import yaml
+
+import rendering
+from rendering import render_post, split_tags
+
+
+def verify(articles):
+    """重新解析头信息，并确认双引号快速路径与YAML序列化器输出一致，返回不一致的篇数"""
+    dump = rendering._dumper()
+    errors = 0
+    for article in articles:
+        fields = rendering.front_matter(article)
+        if any(rendering._quote(key, value) != dump(key, value)
+               for key, value in fields.items() if key in rendering.QUOTED_KEYS):
+            errors += 1
+            continue
+        meta = yaml.safe_load(render_post(article).split('---\n', 2)[1])
+        expected = (article['title'], article['book'], article['chapter'], article['section'],
+                    split_tags(article['tags']))
+        if (meta['title'], meta['book'], meta['chapter'], meta['section'], meta['tags']) != expected:
+            errors += 1
+    return errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='文章渲染吞吐基准')
+    parser.add_argument('--posts', type=int, default=10000, help='文章篇数')
+    parser.add_argument('--rounds', type=int, default=3, help='渲染轮数')
+    parser.add_argument('--template', default='', help='正文使用的模板名称（留空则使用合成正文）')
+    parser.add_argument('--verify', action='store_true', help='解析渲染结果并与文章数据比对')
+    args = parser.parse_args(argv)
+
+    articles = list(synthetic_articles(args.posts))
+    if args.template:
+        for article in articles:
+            article['content'] = ''
+            article['template'] = args.template
+
+    for round_no in range(1, args.rounds + 1):
+        start = time.perf_counter()
+        size = sum(len(render_post(article)) for article in articles)
+        elapsed = time.perf_counter() - start
+        print(f"第{round_no}轮 {len(articles)} 篇，用时 {elapsed * 1000:.0f} ms，"
+              f"{len(articles) / elapsed:.0f} 篇/秒，输出 {size / 1024 / 1024:.1f} MB")
+
+    if args.verify:
+        errors = verify(articles)
+        print(f"校验 {len(articles)} 篇，头信息不一致 {errors} 篇")
+        return 1 if errors else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+增量构建基准 - 在使用站点真实布局和 include 的合成站点上，测量几类典型改动后
+依赖分析的耗时和受影响的页面数；指定可用的 Jekyll 时同时对比全量和增量 jekyll build 的耗时。
+受影响页面数应只随改动范围变化：改一篇文章只影响它本身和首页、feed 等汇总页
+
+用法:
+    python benchmarks/bench_site_build.py --posts 5000
+    python benchmarks/bench_site_build.py --posts 5000 --jekyll "bundle exec jekyll"
+"""
+
+import os
+import sys
+import time
+import shlex
+import shutil
+import argparse
+import tempfile
+
+from synthetic import BLOG_MANAGE_DIR, make_site, synthetic_articles
+
+from book_nav import NAV_DIR  # noqa: E402
+from site_build import METADATA_FILE, BuildError, SiteBuild  # noqa: E402
+
+SITE_ROOT = os.path.dirname(BLOG_MANAGE_DIR)
+PAGES = ['index.html', 'archive.html', 'books.html', 'feed.xml', 'about.html', '404.html']
+CONFIG = """title: 基准站点
+permalink: pretty
+future: true
+timezone: Asia/Shanghai
+featured-tags: true
+featured-condition-size: 1
+exclude: [".cache", "BlogManage"]
+"""
+
+
+def prepare_site(root, posts):
+    """生成合成文章和 books.yml，复制站点的布局、include 和汇总页面"""
+    project = make_site(root, posts)
+    shutil.copytree(os.path.join(SITE_ROOT, '_layouts'), os.path.join(root, '_layouts'))
+    # 书籍导航已在写回 books.yml 时按合成书籍生成，不复制站点自己的
+    shutil.copytree(os.path.join(SITE_ROOT, '_includes'), os.path.join(root, '_includes'), dirs_exist_ok=True,
+                    ignore=lambda directory, names: ['book_nav'] if directory.endswith('_includes') else [])
+    for name in PAGES:
+        shutil.copy(os.path.join(SITE_ROOT, name), root)
+    with open(os.path.join(root, '_config.yml'), 'w', encoding='utf-8') as f:
+        f.write(CONFIG)
+    return project
+
+
+def edit_post(project):
+    """修改一篇文章的正文"""
+    name = sorted(os.listdir(project.posts_dir))[len(os.listdir(project.posts_dir)) // 2]
+    with open(os.path.join(project.posts_dir, name), 'a', encoding='utf-8') as f:
+        f.write('\n补充说明：修改后重新保存。\n')
+
+
+def edit_book(project):
+    """在界面中修改一个小节名称：写回 books.yml，导航随之更新"""
+    book = project.catalog.books()[0]
+    chapter = book['chapters'][0]
+    section = chapter['sections'][0]
+    project.catalog.upsert_section(book['name'], chapter['name'], section['name'] + '（修订）',
+                                   section['slug'], section['url'])
+    project.catalog.save()
+
+
+def add_post(project):
+    """新增一篇文章并登记到目录"""
+    article = list(synthetic_articles(1))[0]
+    article.update(title='新增的合成文章', slug='new-synthetic-post', section='1.99')
+    article['url'] = article['url'].rsplit('/', 2)[0] + '/new-synthetic-post/'
+    project.update_catalog(article)
+    project.write_article(article)
+
+
+def edit_include(project):
+    """修改所有页面共用的页脚"""
+    with open(os.path.join(project.project_root, '_includes', 'footer.html'), 'a', encoding='utf-8') as f:
+        f.write('\n<!-- footer -->\n')
+
+
+SCENARIOS = [
+    ('无改动', lambda project: None),
+    ('修改一篇文章正文', edit_post),
+    ('修改一本书的目录', edit_book),
+    ('新增一篇文章', add_post),
+    ('修改共用 include', edit_include),
+]
+
+
+def run_build(site, plan, jekyll):
+    """有 Jekyll 时实际构建并返回秒数；否则只写回依赖记录，返回 None"""
+    if jekyll is None:
+        site.commit(plan)
+        return None
+    start = time.perf_counter()
+    site.build(plan, jekyll, ['--quiet'])
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='增量构建的依赖分析和 jekyll build 耗时')
+    parser.add_argument('--posts', type=int, default=5000, help='合成文章数')
+    parser.add_argument('--jekyll', default=None, help='Jekyll 命令，例如 "bundle exec jekyll"；不指定时只测量依赖分析')
+    parser.add_argument('--keep', action='store_true', help='保留合成站点目录')
+    args = parser.parse_args(argv)
+
+    if args.jekyll and shutil.which(shlex.split(args.jekyll)[0]) is None:
+        print(f"找不到 {args.jekyll}")
+        return 1
+
+    root = tempfile.mkdtemp(prefix='blog-build-')
+    try:
+        start = time.perf_counter()
+        project = prepare_site(root, args.posts)
+        print(f"合成站点：{args.posts} 篇文章，{len(os.listdir(os.path.join(root, NAV_DIR)))} 本书"
+              f"（生成 {time.perf_counter() - start:.1f} s）")
+
+        site = SiteBuild(project)
+        start = time.perf_counter()
+        plan = site.plan()
+        analysis = time.perf_counter() - start
+        if args.jekyll is None:
+            # 没有 Jekyll 时放一个空的构建目录和元数据占位，之后的计划按增量计算
+            os.makedirs(site.destination, exist_ok=True)
+            open(os.path.join(root, METADATA_FILE), 'w').close()
+        try:
+            elapsed = run_build(site, plan, args.jekyll)
+        except BuildError as e:
+            print(e)
+            return 1
+        print(f"\n{'改动':<16}{'受影响页面':>10}{'依赖分析 ms':>14}{'jekyll build s':>16}")
+        print(f"{'首次（全量）':<16}{len(plan.affected):>10}{analysis * 1000:>14.0f}"
+              f"{'-' if elapsed is None else f'{elapsed:.1f}':>16}")
+
+        for name, change in SCENARIOS:
+            change(project)
+            start = time.perf_counter()
+            plan = site.plan()
+            analysis = time.perf_counter() - start
+            elapsed = run_build(site, plan, args.jekyll)
+            print(f"{name:<16}{len(plan.affected):>10}{analysis * 1000:>14.0f}"
+                  f"{'-' if elapsed is None else f'{elapsed:.1f}':>16}")
+            reasons = plan.summary().split('（', 1)[1:]
+            if reasons:
+                print(f"{'':<16}（{reasons[0]}")
+    finally:
+        if args.keep:
+            print(f"合成站点保留在 {root}")
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+启动耗时基准 - 对比导入核心模块与启动图形界面的耗时
+每个场景在独立的解释器中运行，扣除空解释器的启动时间后取中位数
+
+用法:
+    python benchmarks/bench_startup.py --runs 10
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+BLOG_MANAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    '空解释器': 'pass',
+    '导入 core': 'import core',
+    '启动界面': (
+        'import sys\n'
+        'from PyQt5.QtWidgets import QApplication\n'
+        'import gui\n'
+        'app = QApplication(sys.argv)\n'
+        'manager = gui.BlogManager()\n'
+        'manager.show()\n'
+        'app.processEvents()\n'
+    ),
+}
+
+
+def time_scenario(code, runs):
+    """在新进程中运行代码 runs 次，返回每次的毫秒耗时"""
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get('QT_QPA_PLATFORM', 'offscreen'))
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, '-c', code], cwd=BLOG_MANAGE_DIR, env=env,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        elapsed = (time.perf_counter() - start) * 1000
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.decode('utf-8', 'replace').strip().splitlines()[-1])
+        timings.append(elapsed)
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='启动耗时基准')
+    parser.add_argument('--runs', type=int, default=10, help='每个场景的运行次数')
+    args = parser.parse_args(argv)
+
+    baseline = None
+    for name, code in SCENARIOS.items():
+        try:
+            median = statistics.median(time_scenario(code, args.runs))
+        except RuntimeError as e:
+            print(f"{name:<10} 跳过（{e}）")
+            continue
+        if baseline is None:
+            baseline = median
+            print(f"{name:<10} {median:8.1f} ms")
+        else:
+            print(f"{name:<10} {median:8.1f} ms（扣除解释器启动后 {median - baseline:.1f} ms）")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+热点路径基准套件 - 在不同规模的合成站点上测量常用操作，结果写入JSON
+测量项：update_books_data_exact、generate_slug、头信息渲染、books.yml 加载与写回、
+display_books_overview（界面以 offscreen 方式运行）。
+用 --compare 与之前提交的结果对比，--profile 输出各测量项的热点分布
+
+用法:
+    python benchmarks/bench_suite.py --sizes 100 1000 10000 --output bench.json
+    python benchmarks/bench_suite.py --sizes 100000 --no-posts --cases load dump
+    python benchmarks/bench_suite.py --compare old.json --threshold 20
+    python benchmarks/bench_suite.py --sizes 10000 --profile cprofile --profile-dir prof/
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import pstats
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from synthetic import BLOG_MANAGE_DIR, make_site, synthetic_articles  # noqa: E402
+
+from catalog import BooksCatalog  # noqa: E402
+from posts import generate_slug  # noqa: E402
+from rendering import render_front_matter  # noqa: E402
+
+
+class Context:
+    """一个规模下各测量项共用的合成站点和界面"""
+
+    def __init__(self, root, sections, updates):
+        self.root = root
+        self.sections = sections
+        self.updates = updates
+        self.project = None
+        self._manager = None
+        self._articles = None
+
+    @property
+    def articles(self):
+        if self._articles is None:
+            self._articles = list(synthetic_articles(self.sections))
+        return self._articles
+
+    @property
+    def manager(self):
+        """按需创建的界面窗口，后台任务改为在主线程执行，计时才准确"""
+        if self._manager is None:
+            from PyQt5.QtWidgets import QApplication
+            import gui
+            self.app = QApplication.instance() or QApplication(sys.argv[:1])
+            self._manager = gui.BlogManager(project_root=self.root, background_io=False)
+            self._manager.compact_timer.stop()
+            self._manager.watcher.stop()
+        return self._manager
+
+    def close(self):
+        if self._manager is not None:
+            self._manager.compact_timer.stop()
+            self._manager.watcher.stop()
+            self._manager.tasks.drain()
+            self._manager.deleteLater()
+            self.app.processEvents()
+            self._manager = None
+
+
+def case_update(ctx):
+    """界面保存时的目录更新：追加变更日志，按阈值压缩写回"""
+    manager = ctx.manager
+    extra = list(synthetic_articles(ctx.sections + ctx.updates))[ctx.sections:]
+
+    def run():
+        for article in extra:
+            manager.update_books_data_exact(article)
+        manager.project.catalog.save()
+    return run, len(extra)
+
+
+def case_slug(ctx):
+    titles = [article['title'] for article in ctx.articles]
+
+    def run():
+        for title in titles:
+            generate_slug(title)
+    return run, len(titles)
+
+
+def case_front_matter(ctx):
+    articles = ctx.articles
+
+    def run():
+        for article in articles:
+            render_front_matter(article)
+    return run, len(articles)
+
+
+def case_load(ctx):
+    books_file = ctx.project.books_file
+    return lambda: BooksCatalog(books_file).load(), ctx.sections
+
+
+def case_load_cached(ctx):
+    """books.yml 未变化时的冷启动，直接读取解析结果缓存"""
+    project = ctx.project
+    BooksCatalog(project.books_file, project.catalog_cache).load()
+    return lambda: BooksCatalog(project.books_file, project.catalog_cache).load(), ctx.sections
+
+
+def case_reload(ctx):
+    """复用上次解析结果的增量加载（界面自动同步的路径），文件未变化时的下限"""
+    books_file = ctx.project.books_file
+    previous = BooksCatalog(books_file).load()
+    return lambda: BooksCatalog(books_file).load(previous=previous), ctx.sections
+
+
+def case_dump(ctx):
+    catalog = BooksCatalog(ctx.project.books_file).load()
+    return catalog.save, ctx.sections
+
+
+def case_overview(ctx):
+    manager = ctx.manager
+    return manager.display_books_overview, ctx.sections
+
+
+# 名称 -> (说明, 准备函数)；准备函数返回 (被测函数, 单次调用处理的条目数)
+CASES = {
+    'update': ('update_books_data_exact', case_update),
+    'slug': ('generate_slug', case_slug),
+    'front_matter': ('render_front_matter', case_front_matter),
+    'load': ('books.yml 全量加载', case_load),
+    'load_cached': ('books.yml 缓存加载', case_load_cached),
+    'reload': ('books.yml 增量加载', case_reload),
+    'dump': ('books.yml 写回', case_dump),
+    'overview': ('display_books_overview', case_overview),
+}
+
+
+def measure(fn, repeat):
+    """运行 repeat 次，返回每次的秒数"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def profile(fn, kind, path):
+    """对一次调用做性能剖析并写入文件，cProfile 时返回累计耗时最高的函数"""
+    if kind == 'pyinstrument':
+        from pyinstrument import Profiler
+        profiler = Profiler()
+        profiler.start()
+        fn()
+        profiler.stop()
+        with open(path + '.html', 'w', encoding='utf-8') as f:
+            f.write(profiler.output_html())
+        return None
+
+    import cProfile
+    import io
+    profiler = cProfile.Profile()
+    profiler.runcall(fn)
+    profiler.dump_stats(path + '.prof')
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(12)
+    return out.getvalue()
+
+
+def run_size(sections, args):
+    """在一个规模的合成站点上运行所选测量项"""
+    root = tempfile.mkdtemp(prefix='blog-bench-')
+    ctx = Context(root, sections, args.updates)
+    results = {}
+    try:
+        start = time.perf_counter()
+        ctx.project = make_site(root, sections, with_posts=not args.no_posts)
+        print(f"\n== {sections} 个小节（生成站点 {time.perf_counter() - start:.1f} s）")
+        for name in args.cases:
+            label, prepare = CASES[name]
+            fn, items = prepare(ctx)
+            fn()  # 预热：导入模块、填充缓存
+            timings = measure(fn, args.repeat)
+            best = min(timings)
+            results[name] = {
+                'label': label,
+                'items': items,
+                'min_s': best,
+                'median_s': statistics.median(timings),
+                'per_item_us': best / max(items, 1) * 1e6,
+                'runs': timings,
+            }
+            print(f"{label:<28} 最快 {best * 1000:9.2f} ms  中位数 {statistics.median(timings) * 1000:9.2f} ms"
+                  f"  每项 {results[name]['per_item_us']:8.2f} µs")
+            if args.profile:
+                os.makedirs(args.profile_dir, exist_ok=True)
+                report = profile(fn, args.profile, os.path.join(args.profile_dir, f"{name}-{sections}"))
+                if report and args.verbose:
+                    print(report)
+    finally:
+        ctx.close()
+        shutil.rmtree(root, ignore_errors=True)
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BLOG_MANAGE_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline, current, threshold):
+    """与基线结果对比，返回变慢超过 threshold% 的测量项"""
+    regressions = []
+    print(f"\n与 {baseline.get('commit') or '基线'} 对比：")
+    for size, cases in current['results'].items():
+        for name, result in cases.items():
+            old = baseline.get('results', {}).get(size, {}).get(name)
+            if old is None:
+                continue
+            change = (result['min_s'] / old['min_s'] - 1) * 100
+            flag = '  <-- 变慢' if change > threshold else ''
+            print(f"{size:>7} {result['label']:<28} {old['min_s'] * 1000:9.2f} -> "
+                  f"{result['min_s'] * 1000:9.2f} ms ({change:+.0f}%){flag}")
+            if flag:
+                regressions.append((size, name, change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='BlogManage 热点路径基准套件')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000],
+                        help='合成目录的小节数，可指定多个（100 到 100000）')
+    parser.add_argument('--cases', nargs='+', choices=list(CASES), default=list(CASES),
+                        help='要运行的测量项（默认全部）')
+    parser.add_argument('--repeat', type=int, default=5, help='每项重复次数，取最快一次')
+    parser.add_argument('--updates', type=int, default=100, help='update 测量项每轮登记的文章数')
+    parser.add_argument('--no-posts', action='store_true', help='只生成 books.yml，不写文章文件')
+    parser.add_argument('--output', help='把结果写入JSON文件')
+    parser.add_argument('--compare', help='与之前保存的JSON结果对比')
+    parser.add_argument('--threshold', type=float, default=20, help='变慢超过该百分比时返回非零退出码')
+    parser.add_argument('--profile', choices=['cprofile', 'pyinstrument'], help='额外剖析一次并保存结果')
+    parser.add_argument('--profile-dir', default='profiles', help='剖析结果目录')
+    parser.add_argument('-v', '--verbose', action='store_true', help='打印 cProfile 的热点函数')
+    args = parser.parse_args(argv)
+
+    if args.profile == 'pyinstrument':
+        try:
+            import pyinstrument  # noqa: F401
+        except ImportError:
+            print("需要安装 pyinstrument：pip install pyinstrument", file=sys.stderr)
+            return 1
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'results': {},
+    }
+    for sections in args.sizes:
+        report['results'][str(sections)] = run_size(sections, args)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=1)
+        print(f"\n结果已写入 {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare(baseline, report, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+界面卡顿基准 - 对比主线程读写与后台线程读写时的事件循环卡顿
+在合成站点上执行刷新和连续保存，用 EventLoopMonitor 记录主线程卡顿
+
+用法:
+    python benchmarks/bench_ui_stall.py --sections 20000 --saves 5
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from synthetic import make_site  # noqa: E402
+
+from PyQt5.QtWidgets import QApplication, QMessageBox  # noqa: E402
+
+import gui  # noqa: E402
+from workers import EventLoopMonitor  # noqa: E402
+
+
+def wait_idle(app, manager, timeout=600):
+    """处理事件直到后台任务全部完成"""
+    deadline = time.perf_counter() + timeout
+    while manager.tasks.is_busy() and time.perf_counter() < deadline:
+        app.processEvents()
+        time.sleep(0.001)
+    app.processEvents()
+
+
+def run_scenario(app, root, background, saves):
+    """执行一轮刷新加连续保存，返回卡顿统计"""
+    manager = gui.BlogManager(project_root=root, background_io=background)
+    wait_idle(app, manager)
+
+    monitor = EventLoopMonitor(interval_ms=10)
+    monitor.start()
+    start = time.perf_counter()
+
+    manager.refresh_data()
+    manager.book_combo.setEditText("合成书籍1")
+    manager.chapter_input.setText("第1章：合成章节")
+    manager.section_input.setText("1.1")
+    manager.title_input.setText("卡顿测试")
+    manager.content_text.setPlainText("正文")
+    for _ in range(saves):
+        manager.save_article()
+        app.processEvents()
+    wait_idle(app, manager)
+
+    elapsed = time.perf_counter() - start
+    monitor.stop()
+    manager.compact_timer.stop()
+    manager.tasks.drain()
+    manager.deleteLater()
+    return elapsed, monitor.summary()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='界面卡顿基准')
+    parser.add_argument('--sections', type=int, default=20000, help='合成目录的小节数')
+    parser.add_argument('--saves', type=int, default=5, help='连续点击保存的次数')
+    args = parser.parse_args(argv)
+
+    app = QApplication(sys.argv[:1])
+    # 基准中不弹出模态对话框
+    QMessageBox.information = staticmethod(lambda *args, **kwargs: None)
+
+    root = tempfile.mkdtemp(prefix='blog-bench-')
+    try:
+        make_site(root, args.sections)
+        for background, label in ((False, '主线程读写'), (True, '后台线程读写')):
+            elapsed, stats = run_scenario(app, root, background, args.saves)
+            print(f"{label}: 用时 {elapsed:.2f} s，最大卡顿 {stats['max']:.1f} ms，"
+                  f"P95 {stats['p95']:.1f} ms，超过50ms {stats['over_50ms']} 次")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
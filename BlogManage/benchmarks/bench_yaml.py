@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+YAML 读写基准 - 对比纯Python实现、libyaml 和解析结果缓存加载 books.yml 的耗时
+--verify 核对C序列化器的输出与纯Python实现逐字节一致（合成目录、真实 books.yml
+以及随机生成的特殊文本），并核对两种加载器的解析结果相同
+
+用法:
+    python benchmarks/bench_yaml.py --sections 20000 --verify
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+
+from synthetic import BLOG_MANAGE_DIR, make_site
+
+import yaml  # noqa: E402
+
+import yamlio  # noqa: E402
+from catalog import BooksCatalog  # noqa: E402
+
+REAL_BOOKS_FILE = os.path.join(os.path.dirname(BLOG_MANAGE_DIR), '_data', 'books.yml')
+# 随机文本的字符表，包含需要转义、折行和加引号的各种情况
+FUZZ_ALPHABET = (list("abc XYZ:#-'\"{}[]&*!|>%@`,?\\\té中文… \u3000\ufeff\U0001F600\x85\x07\n ")
+                 + ['yes', 'null', '1.0', '0x1f', '2025-01-01', '~', '  '])
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def pure_dump(data):
+    return yaml.dump(data, Dumper=yaml.SafeDumper, **yamlio.DUMP_OPTIONS)
+
+
+def fuzz(count, seed=0):
+    """随机文本经 yamlio.dump 与纯Python实现输出不一致的次数"""
+    rng = random.Random(seed)
+    mismatches = 0
+    for _ in range(count):
+        text = ''.join(rng.choice(FUZZ_ALPHABET) for _ in range(rng.randint(0, 150)))
+        data = {'books': [{'name': text, 'chapters': [
+            {'name': text[::-1], 'sections': [{'name': text, 'slug': text, 'url': '/x/' + text}]}]}]}
+        if yamlio.dump(data) != pure_dump(data):
+            mismatches += 1
+    return mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='books.yml 读写基准')
+    parser.add_argument('--sections', type=int, default=20000, help='合成目录的小节数')
+    parser.add_argument('--verify', action='store_true', help='核对输出逐字节一致')
+    args = parser.parse_args(argv)
+
+    if not yamlio.has_libyaml():
+        print("PyYAML 没有编译 libyaml 支持，只能使用纯Python实现")
+
+    root = tempfile.mkdtemp(prefix='blog-bench-')
+    try:
+        project = make_site(root, args.sections, with_posts=False)
+        with open(project.books_file, 'rb') as f:
+            raw = f.read()
+        print(f"books.yml：{args.sections} 个小节，{len(raw) / 1024:.0f} KB")
+
+        data, pure_load = timed(lambda: yaml.load(raw, Loader=yaml.SafeLoader))
+        c_data, c_load = timed(lambda: yamlio.safe_load(raw))
+        text, pure_dump_time = timed(lambda: pure_dump(data))
+        c_text, c_dump_time = timed(lambda: yamlio.dump(data))
+        print(f"加载：纯Python {pure_load:.2f} s，yamlio {c_load:.2f} s")
+        print(f"写回：纯Python {pure_dump_time:.2f} s，yamlio {c_dump_time:.2f} s")
+
+        # make_site 保存时已经写入缓存，先删除以测量冷启动
+        cache_file = project.catalog_cache
+        os.remove(cache_file)
+        _, cold = timed(lambda: BooksCatalog(project.books_file, cache_file).load())
+        _, warm = timed(lambda: BooksCatalog(project.books_file, cache_file).load())
+        print(f"BooksCatalog.load：无缓存 {cold:.2f} s，命中缓存 {warm:.3f} s")
+
+        if args.verify:
+            ok = True
+            checks = [('合成目录写回', c_text == text and c_text.encode('utf-8') == raw),
+                      ('加载结果', c_data == data)]
+            with open(REAL_BOOKS_FILE, 'rb') as f:
+                real = f.read()
+            real_data = yamlio.safe_load(real)
+            checks.append(('真实 books.yml 写回', yamlio.dump(real_data).encode('utf-8') == real
+                           and real_data == yaml.load(real, Loader=yaml.SafeLoader)))
+            checks.append(('缓存内容', BooksCatalog(project.books_file, cache_file).load().data == data))
+            mismatches = fuzz(5000)
+            checks.append((f'随机文本（5000组，{mismatches} 组不一致）', mismatches == 0))
+            for label, passed in checks:
+                print(f"{'一致' if passed else '不一致！'} {label}")
+                ok = ok and passed
+            return 0 if ok else 1
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
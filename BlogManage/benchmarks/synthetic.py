@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+合成数据 - 为基准测试生成指定规模的 books.yml 和 _posts
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+BLOG_MANAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BLOG_MANAGE_DIR not in sys.path:
+    sys.path.insert(0, BLOG_MANAGE_DIR)
+
+from core import BlogProject  # noqa: E402
+from posts import build_article_data  # noqa: E402
+
+SECTIONS_PER_CHAPTER = 20
+CHAPTERS_PER_BOOK = 25
+
+BODY = """## 寄存器配置
+
+配置 GPIOA 的 CRL 寄存器，将 PA0 设置为上拉输入模式，再使能 AFIO 时钟。
+
+```c
+RCC_APB2PeriphClockCmd(RCC_APB2Periph_GPIOA, ENABLE);
+GPIO_Init(GPIOA, &GPIO_InitStructure);
+```
+
+中断线映射完成后，在 NVIC 中设置优先级并使能对应的 EXTI 通道。
+"""
+
+
+def synthetic_articles(sections):
+    """生成 sections 篇文章数据，按书、章、节均匀分布，每天50篇"""
+    start = datetime(2000, 1, 1)
+    for i in range(sections):
+        book = i // (SECTIONS_PER_CHAPTER * CHAPTERS_PER_BOOK)
+        chapter = i // SECTIONS_PER_CHAPTER % CHAPTERS_PER_BOOK + 1
+        section = i % SECTIONS_PER_CHAPTER + 1
+        yield build_article_data(
+            f"合成书籍{book + 1}", f"第{chapter}章：合成章节", f"{chapter}.{section}",
+            f"合成文章 {i} GPIO配置",
+            tags='STM32, 基准', content=BODY,
+            date=start + timedelta(days=i // 50))
+
+
+def make_site(root, sections, with_posts=True):
+    """在 root 下生成合成站点，返回 BlogProject"""
+    project = BlogProject(root)
+    os.makedirs(os.path.dirname(project.books_file), exist_ok=True)
+    os.makedirs(project.posts_dir, exist_ok=True)
+    for article in synthetic_articles(sections):
+        project.update_catalog(article, journal=False)
+        if with_posts:
+            project.write_article(article)
+    project.catalog.save()
+    return project
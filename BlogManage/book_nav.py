@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+书籍导航 - 为每本书预先生成侧栏目录，替代 _layouts/book.html 中遍历整个 books.yml 的 Liquid 循环
+books.yml 每次写回后只重新生成内容变化的书籍；Jekyll 渲染文章时只插入所属书籍的小文件，
+当前小节和上一篇/下一篇由页面脚本按URL标出
+
+输出:
+    _includes/book_nav/<编号>.html    一本书的章节目录
+    _data/book_nav.yml               书籍名称 -> 编号
+
+用法:
+    python book_nav.py              # 重新生成全部书籍导航
+    python book_nav.py --check      # 只检查是否与 books.yml 一致（CI使用）
+    python blog_manager.py nav
+"""
+
+import os
+import re
+import sys
+import html
+import shutil
+import hashlib
+import argparse
+import tempfile
+
+import yamlio
+
+NAV_DIR = os.path.join('_includes', 'book_nav')
+NAV_DATA = os.path.join('_data', 'book_nav.yml')
+# 生成的文件名，清理时只删除符合该格式的文件
+NAV_FILE_RE = re.compile(r'^b[0-9a-f]{10}\.html$')
+
+
+def book_id(name):
+    """书籍名称对应的导航编号，只含ASCII字符，可用作 include 文件名"""
+    return 'b' + hashlib.blake2b(str(name).encode('utf-8'), digest_size=5).hexdigest()
+
+
+def escape(text):
+    """HTML转义，并转义花括号，避免名称被 Liquid 当作标签"""
+    return html.escape(str(text)).replace('{', '&#123;').replace('}', '&#125;')
+
+
+def render_nav(book):
+    """一本书的章节目录HTML，结构与 book.html 原来的 Liquid 循环相同"""
+    lines = []
+    for chapter in book.get('chapters') or []:
+        lines.append('<div class="chapter">')
+        lines.append(f'<h3 class="chapter-title">{escape(chapter.get("name"))}</h3>')
+        lines.append('<ul class="chapter-sections">')
+        for section in chapter.get('sections') or []:
+            url = escape(section.get('url') or '')
+            lines.append(f'<li class="section" data-url="{url}"><a href="{url}">'
+                         f'{escape(section.get("name"))}</a></li>')
+        lines.append('</ul>')
+        lines.append('</div>')
+    return '\n'.join(lines) + '\n'
+
+
+def read_text(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def write_text(path, text):
+    """原子写入，jekyll serve 不会读到写了一半的文件"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix='.nav-', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='\n') as f:
+            f.write(text)
+        if os.path.exists(path):
+            shutil.copymode(path, tmp_path)
+        else:
+            # mkstemp 创建的文件只有所有者可读，改为普通文件权限
+            os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class BookNav:
+    """书籍导航文件的生成器，记住已写出书籍的片段摘要，books.yml 写回后只处理变化的书籍"""
+
+    def __init__(self, project_root):
+        self.nav_dir = os.path.join(project_root, NAV_DIR)
+        self.data_file = os.path.join(project_root, NAV_DATA)
+        # 书籍名称 -> 生成导航时 books.yml 中该书的片段摘要
+        self._digests = {}
+
+    def nav_file(self, name):
+        return os.path.join(self.nav_dir, book_id(name) + '.html')
+
+    def plan(self, catalog):
+        """计算需要的改动：(待写入 {路径: 内容}, 待删除路径列表, 名称映射)"""
+        mapping = {}
+        writes = {}
+        for book in catalog.books():
+            name = book.get('name')
+            mapping[name] = book_id(name)
+            digest = catalog.book_digest(name)
+            if digest is not None and self._digests.get(name) == digest:
+                continue
+            path = self.nav_file(name)
+            text = render_nav(book)
+            if read_text(path) != text:
+                writes[path] = text
+
+        data_text = yamlio.dump(mapping) if mapping else ''
+        if read_text(self.data_file) != data_text:
+            writes[self.data_file] = data_text
+
+        keep = {value + '.html' for value in mapping.values()}
+        try:
+            names = os.listdir(self.nav_dir)
+        except FileNotFoundError:
+            names = []
+        removes = [os.path.join(self.nav_dir, name) for name in sorted(names)
+                   if NAV_FILE_RE.match(name) and name not in keep]
+        return writes, removes, mapping
+
+    def update(self, catalog):
+        """按目录更新导航文件，返回 (写入的文件, 删除的文件)"""
+        writes, removes, mapping = self.plan(catalog)
+        # 先写导航文件再写名称映射，Jekyll 不会引用尚不存在的文件
+        for path in sorted(writes, key=lambda path: path == self.data_file):
+            write_text(path, writes[path])
+        for path in removes:
+            os.remove(path)
+        self._digests = {name: catalog.book_digest(name) for name in mapping}
+        return sorted(writes), removes
+
+
+def main(argv=None):
+    from core import BlogProject
+
+    parser = argparse.ArgumentParser(description='为每本书生成侧栏导航')
+    parser.add_argument('--root', default=None, help='博客根目录（默认为BlogManage的上级目录）')
+    parser.add_argument('--check', action='store_true', help='只检查，导航过期时返回非零退出码')
+    args = parser.parse_args(argv)
+
+    project = BlogProject(args.root).load()
+    if args.check:
+        writes, removes, _ = project.book_nav.plan(project.catalog)
+        for path in list(writes) + removes:
+            print(f"[过期] {os.path.relpath(path, project.project_root)}")
+        print(f"书籍导航需要更新 {len(writes) + len(removes)} 个文件")
+        return 1 if writes or removes else 0
+
+    written, removed = project.update_book_nav()
+    print(f"书籍 {len(project.catalog.books())} 本，写入 {len(written)} 个文件，删除 {len(removed)} 个文件")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
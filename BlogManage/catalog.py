@@ -0,0 +1,778 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+书籍目录 - books.yml 的内存索引
+加载一次后通过字典索引查找书籍、章节和小节；
+单篇保存只追加到变更日志，批量压缩时再原子写回 books.yml
+
+多个进程（界面、批量导入、检查修复）可以同时修改同一个 books.yml：读取、追加日志和写回
+都在 _data/.books.yml.lock 的咨询锁内进行；写回前发现磁盘上的版本已被其他进程更新时，
+以磁盘版本为准三方合并本进程改过的书籍，不会丢失其他进程的小节
+"""
+
+import gc
+import os
+import re
+import copy
+import json
+import shutil
+import marshal
+import hashlib
+import tempfile
+import threading
+from contextlib import contextmanager, nullcontext
+
+import yamlio
+
+try:
+    import fcntl
+except ImportError:
+    # Windows 没有 fcntl，改用 msvcrt 锁住锁文件的第一个字节
+    fcntl = None
+    import msvcrt
+
+# books.yml 顶层列表中每本书的起始行
+BOOK_START_RE = re.compile(rb'^- ', re.M)
+# 书籍片段之外不应出现的顶格内容（其他键、注释等），出现时整体解析
+UNEXPECTED_LINE_RE = re.compile(rb'^(?![- ]|$)', re.M)
+# 由 reindex() 重建的索引属性
+INDEX_ATTRS = ('_books', '_chapters', '_sections', '_slugs', '_slug_owners', '_url_owners', '_section_counts')
+
+
+def file_stat(path):
+    """文件的 (mtime_ns, 大小)，不存在时返回 None"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def file_version(path):
+    """文件的 (mtime_ns, 大小, inode)，不存在时返回 None；原子替换后 inode 一定变化"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+@contextmanager
+def lock_file(path):
+    """进程间互斥的咨询锁，阻塞直到取得；POSIX 使用 flock，Windows 使用 msvcrt.locking
+
+    flock 锁属于打开的文件，同一进程内分别打开也会互斥
+    """
+    try:
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    except FileNotFoundError:
+        # _data 目录还不存在，没有需要保护的文件
+        yield
+        return
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        else:
+            while True:
+                try:
+                    # LK_LOCK 重试10秒后仍失败会抛出异常，继续等待
+                    msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    finally:
+        os.close(fd)
+
+
+def split_books(raw):
+    """把 books.yml 按顶层书籍切分为YAML片段列表；不是 save() 写出的格式时返回 None"""
+    if not raw.startswith(b'books:\n'):
+        return None
+    body = raw[len(b'books:\n'):]
+    if UNEXPECTED_LINE_RE.search(body):
+        return None
+    starts = [m.start() for m in BOOK_START_RE.finditer(body)]
+    if not starts or starts[0] != 0:
+        return None
+    return [body[start:end] for start, end in zip(starts, starts[1:] + [len(body)])]
+
+
+def block_digest(block):
+    return hashlib.blake2b(block, digest_size=16).digest()
+
+
+def book_fingerprint(book):
+    """书籍当前内容的摘要，用于发现绕过目录方法的原地修改；有 marshal 不支持的类型时返回 None
+
+    marshal 版本 2 不写对象引用，输出只取决于内容
+    """
+    try:
+        return hashlib.blake2b(marshal.dumps(book, 2), digest_size=16).digest()
+    except ValueError:
+        return None
+
+
+def merge_fields(base, ours, theirs, skip):
+    """字典的键级三方合并（不含 skip 键）：本方相对 base 改过的键取本方，其余取对方"""
+    merged = {key: value for key, value in theirs.items() if key != skip}
+    for key in list(ours) + [key for key in base if key not in ours]:
+        if key == skip or ours.get(key, merge_fields) == base.get(key, merge_fields):
+            continue
+        if key in ours:
+            merged[key] = ours[key]
+        else:
+            merged.pop(key, None)
+    return merged
+
+
+def chapter_index(book):
+    """{章节名称: (章节, {小节名称: 小节})}"""
+    return {chapter['name']: (chapter, {section['name']: section for section in chapter.get('sections') or []})
+            for chapter in (book or {}).get('chapters') or []}
+
+
+def merge_book(base, ours, theirs, conflicts):
+    """三方合并一本书：以磁盘上的版本 theirs 为准，应用本进程相对 base 的修改
+
+    以小节为单位合并。双方改了同一小节时本进程的修改生效；本进程删除而对方改过的小节保留对方的版本。
+    两种情况都把 (书籍, 章节, 小节名称) 记入 conflicts
+    """
+    if ours == base or theirs == ours:
+        return theirs
+    if theirs == base:
+        return ours
+    base_chapters, our_chapters, their_chapters = chapter_index(base), chapter_index(ours), chapter_index(theirs)
+    merged = merge_fields(base or {}, ours, theirs, 'chapters')
+    merged['chapters'] = []
+    names = list(their_chapters) + [name for name in our_chapters if name not in their_chapters]
+    for name in names:
+        base_chapter, base_sections = base_chapters.get(name, (None, {}))
+        our_chapter, our_sections = our_chapters.get(name, (None, {}))
+        their_chapter, their_sections = their_chapters.get(name, (None, {}))
+        if our_chapter is None:
+            merged['chapters'].append(their_chapter)
+            continue
+        if their_chapter is None:
+            if our_chapter == base_chapter:
+                # 对方删除了整章，本进程没有改动
+                continue
+            their_chapter = {'name': name, 'sections': []}
+        chapter = merge_fields(base_chapter or {}, our_chapter, their_chapter, 'sections')
+        sections = dict(their_sections)
+        for section_name in list(our_sections) + [key for key in base_sections if key not in our_sections]:
+            base_section = base_sections.get(section_name)
+            our_section = our_sections.get(section_name)
+            their_section = their_sections.get(section_name)
+            if our_section == base_section or our_section == their_section:
+                continue
+            if their_section != base_section:
+                conflicts.append((merged.get('name'), name, section_name))
+                if our_section is None:
+                    continue
+            if our_section is None:
+                sections.pop(section_name, None)
+            else:
+                sections[section_name] = our_section
+        chapter['sections'] = list(sections.values())
+        merged['chapters'].append(chapter)
+    return merged
+
+
+class BooksCatalog:
+    """books.yml 的内存目录，维护书籍/章节/小节的字典索引"""
+
+    # 日志累计到该条数时自动压缩
+    compact_threshold = 50
+    # 解析结果缓存的格式版本，格式变化时旧缓存自动失效
+    cache_format = 1
+
+    def __init__(self, books_file, cache_file=None, on_save=None):
+        self.books_file = books_file
+        # books.yml 解析结果的 marshal 缓存，按文件内容哈希校验
+        self.cache_file = cache_file
+        # 每次写回 books.yml 后调用 on_save(catalog)，用于更新由目录生成的文件
+        self.on_save = on_save
+        books_dir, books_name = os.path.split(books_file)
+        self.journal_file = os.path.join(books_dir, f".{books_name}.journal")
+        self.lock_path = os.path.join(books_dir, f".{books_name}.lock")
+        # 同一进程内的线程先用 RLock 排队，最外层再取进程间的文件锁
+        self._lock = threading.RLock()
+        self._lock_depth = 0
+        self.pending = 0
+        self.data = {'books': []}
+        self._books = {}
+        self._chapters = {}
+        self._sections = {}
+        self._slugs = {}
+        self._slug_owners = {}
+        self._url_owners = {}
+        self._section_counts = {}
+        # 书籍片段摘要 -> 解析结果，及书籍名称 -> 摘要；内存中改过的书籍不再复用
+        self._parsed_books = {}
+        self._book_digests = {}
+        # 摘要 -> books.yml 中该书的原文片段，写回时未改动的书籍直接沿用
+        self._raw_blocks = {}
+        # 摘要 -> 读入时解析结果的内容摘要；内容仍一致才沿用原文片段或复用解析结果
+        self._fingerprints = {}
+        # 书籍名称 -> 本进程首次修改前的内容（新建的书籍为 None），写回时据此三方合并
+        self._base_books = {}
+        # 最近一次加载或写入后 (books.yml, 变更日志) 的版本，写回时据此判断是否被其他进程修改
+        self.file_stat = None
+        # 最近一次加载中重新解析的书籍名称
+        self.reparsed = []
+        # 最近一次写回时合并冲突的小节 [(书籍, 章节, 小节名称)]
+        self.conflicts = []
+
+    @contextmanager
+    def locked(self):
+        """持有 books.yml 的写锁；同一目录对象内可以嵌套"""
+        with self._lock:
+            with lock_file(self.lock_path) if self._lock_depth == 0 else nullcontext():
+                self._lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth -= 1
+
+    def load(self, previous=None):
+        """从 books.yml 加载数据并重建索引
+
+        传入上一次加载的目录时，文本没有变化的书籍直接复用其解析结果，
+        只重新解析改动过的书籍
+        """
+        # 在锁内读取 books.yml 和变更日志，不会读到其他进程压缩到一半的状态；解析在锁外进行
+        with self.locked():
+            disk = self._read_disk()
+        self._apply_disk(disk, previous)
+        return self
+
+    def _read_disk(self):
+        """读取 (版本, books.yml 原文, 变更日志条目)，调用方持有锁"""
+        stat = self._disk_stat()
+        try:
+            with open(self.books_file, 'rb') as f:
+                raw = f.read()
+        except FileNotFoundError:
+            raw = b''
+        return stat, raw, self._read_journal()
+
+    def _apply_disk(self, disk, previous=None):
+        """用读到的磁盘内容替换内存中的目录"""
+        stat, raw, entries = disk
+        # 解析大文件会创建大量小对象，暂停分代回收，避免长时间的全量回收停顿
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            digest = hashlib.blake2b(raw, digest_size=16).digest()
+            data = self._read_cache(digest, raw)
+            if data is None:
+                data = self._parse(raw, previous)
+                self._write_cache(digest, data, list(self._parsed_books))
+            self.data = data
+        finally:
+            if gc_enabled:
+                gc.enable()
+        self.data.setdefault('books', [])
+        if previous is not None:
+            self._reindex_from(previous)
+        else:
+            self.reindex()
+        self.pending = self._replay_journal(entries)
+        # 磁盘上的内容（含日志）就是之后三方合并的基准
+        self._base_books = {}
+        self.file_stat = stat
+
+    def _parse(self, raw, previous):
+        """解析 books.yml 内容，能按书籍切分时逐本解析并复用未变化的书籍"""
+        # PyYAML 只在真正读写时导入，保持本模块导入开销最小
+        import yaml
+        blocks = split_books(raw)
+        if blocks is not None:
+            reusable = dict(previous._parsed_books) if previous is not None else {}
+            books = []
+            parsed_books = {}
+            raw_blocks = {}
+            fingerprints = {}
+            reparsed = []
+            try:
+                for block in blocks:
+                    digest = block_digest(block)
+                    book = reusable.pop(digest, None)
+                    fingerprint = book_fingerprint(book) if book is not None else None
+                    if fingerprint is None or fingerprint != previous._fingerprints.get(digest):
+                        # 上次的解析结果在内存中被原地改过，不再与片段一致
+                        book = None
+                    if book is None:
+                        items = yamlio.safe_load(block)
+                        if not (isinstance(items, list) and len(items) == 1
+                                and isinstance(items[0], dict)):
+                            raise ValueError('books.yml 片段不是单本书籍')
+                        book = items[0]
+                        reparsed.append(book.get('name'))
+                        fingerprint = book_fingerprint(book)
+                    books.append(book)
+                    parsed_books[digest] = book
+                    raw_blocks[digest] = block
+                    fingerprints[digest] = fingerprint
+            except (ValueError, yaml.YAMLError):
+                # 片段间有锚点引用等情况时退回整体解析
+                pass
+            else:
+                self._parsed_books = parsed_books
+                self._book_digests = {book.get('name'): digest for digest, book in parsed_books.items()}
+                self._raw_blocks = raw_blocks
+                self._fingerprints = fingerprints
+                self.reparsed = reparsed
+                return {'books': books}
+
+        data = yamlio.safe_load(raw) or {'books': []}
+        self._parsed_books = {}
+        self._book_digests = {}
+        self._raw_blocks = {}
+        self._fingerprints = {}
+        self.reparsed = [book.get('name') for book in data.get('books') or []]
+        return data
+
+    def _read_cache(self, digest, raw):
+        """books.yml 内容与缓存一致时返回缓存的解析结果，同时恢复按书籍复用所需的摘要和原文片段"""
+        if self.cache_file is None:
+            return None
+        try:
+            with open(self.cache_file, 'rb') as f:
+                version, cached_digest, data, book_digests = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if version != self.cache_format or cached_digest != digest:
+            return None
+        books = data.get('books') or []
+        blocks = split_books(raw) if book_digests is not None else None
+        if blocks is not None and len(book_digests) == len(books) == len(blocks):
+            self._parsed_books = dict(zip(book_digests, books))
+            self._book_digests = {book.get('name'): d for d, book in self._parsed_books.items()}
+            self._raw_blocks = dict(zip(book_digests, blocks))
+            self._fingerprints = {d: book_fingerprint(book) for d, book in self._parsed_books.items()}
+        else:
+            self._parsed_books = {}
+            self._book_digests = {}
+            self._raw_blocks = {}
+            self._fingerprints = {}
+        self.reparsed = []
+        return data
+
+    def _write_cache(self, digest, data, book_digests):
+        """写入解析结果缓存；数据中有 marshal 不支持的类型时不缓存"""
+        if self.cache_file is None:
+            return
+        try:
+            payload = marshal.dumps((self.cache_format, digest, data, book_digests or None))
+        except ValueError:
+            return
+        cache_dir = os.path.dirname(self.cache_file) or '.'
+        tmp_path = None
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix='.books-', suffix='.tmp', dir=cache_dir)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, self.cache_file)
+        except OSError:
+            # 缓存只用于加速，写不进去不影响使用
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _disk_stat(self):
+        return file_version(self.books_file), file_version(self.journal_file)
+
+    def changed_on_disk(self):
+        """books.yml 或变更日志是否在最近一次加载或写入之后被其他程序修改"""
+        return self._disk_stat() != self.file_stat
+
+    def _touch_book(self, book):
+        """书籍在内存中被修改：其解析结果不能再被下次加载复用，首次修改前的内容留作合并基准"""
+        if book not in self._base_books:
+            found = self._books.get(book)
+            self._base_books[book] = copy.deepcopy(found) if found is not None else None
+        digest = self._book_digests.pop(book, None)
+        if digest is not None:
+            self._parsed_books.pop(digest, None)
+            self._raw_blocks.pop(digest, None)
+            self._fingerprints.pop(digest, None)
+
+    def _read_journal(self):
+        """读取尚未压缩的变更日志条目"""
+        try:
+            with open(self.journal_file, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return []
+        entries = []
+        for line in lines:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                # 崩溃时可能留下半行，忽略即可
+                continue
+        return entries
+
+    def _replay_journal(self, entries):
+        """重放变更日志条目，返回重放条数"""
+        for entry in entries:
+            self.upsert_section(entry['book'], entry['chapter'], entry['name'],
+                                entry['slug'], entry['url'])
+        return len(entries)
+
+    def reindex(self):
+        """重建全部索引"""
+        for attr in INDEX_ATTRS:
+            setattr(self, attr, {})
+        for book in self.data['books']:
+            self._index_book(book)
+
+    def _reindex_from(self, previous):
+        """沿用上一次加载的索引，只重建解析结果不是同一对象的书籍；大部分书籍都变了时全部重建"""
+        books = {book['name']: book for book in self.data['books']}
+        stale = [name for name in set(books) | set(previous._books) if previous._books.get(name) is not books.get(name)]
+        if len(stale) * 2 > len(books):
+            self.reindex()
+            return
+        for attr in INDEX_ATTRS:
+            setattr(self, attr, dict(getattr(previous, attr)))
+        self._reindex_books(stale)
+
+    def _reindex_books(self, names):
+        """只重建指定书籍的索引，其他书籍的索引保持不变"""
+        names = set(names)
+        if not names:
+            return
+        for name in names:
+            self._books.pop(name, None)
+            self._section_counts.pop(name, None)
+        for index in (self._chapters, self._sections, self._slugs):
+            for key in [key for key in index if key[0] in names]:
+                del index[key]
+        for index in (self._slug_owners, self._url_owners):
+            for key in [key for key, owner in index.items() if owner[0] in names]:
+                del index[key]
+        for book in self.data['books']:
+            if book['name'] in names:
+                self._index_book(book)
+
+    def _index_book(self, book):
+        """为单本书籍建立索引"""
+        book_name = book['name']
+        book.setdefault('chapters', [])
+        self._books[book_name] = book
+        self._section_counts[book_name] = 0
+        for chapter in book['chapters']:
+            self._index_chapter(book_name, chapter)
+            self._section_counts[book_name] += len(chapter['sections'])
+
+    def _index_chapter(self, book_name, chapter):
+        """为单个章节建立索引"""
+        key = (book_name, chapter['name'])
+        chapter.setdefault('sections', [])
+        self._chapters[key] = chapter
+        for section in chapter['sections']:
+            self._index_section(key, section)
+
+    def _index_section(self, chapter_key, section):
+        """为单个小节建立索引"""
+        self._sections[chapter_key + (section['name'],)] = section
+        if section.get('slug'):
+            self._slugs[chapter_key + (section['slug'],)] = section
+            self._slug_owners[section['slug']] = chapter_key + (section['name'],)
+        if section.get('url'):
+            self._url_owners[section['url']] = chapter_key + (section['name'],)
+
+    def books(self):
+        """按原有顺序返回全部书籍"""
+        return self.data['books']
+
+    def book_digest(self, book):
+        """书籍在 books.yml 中的片段摘要；内存中改过、尚未写回的书籍返回 None"""
+        return self._book_digests.get(book)
+
+    def book_names(self):
+        """返回全部书籍名称"""
+        return list(self._books)
+
+    def get_book(self, book):
+        """按名称查找书籍"""
+        return self._books.get(book)
+
+    def book_counts(self, book):
+        """返回书籍的 (章节数, 文章总数)，由索引维护，无需逐章累加"""
+        return len(self._books[book]['chapters']), self._section_counts[book]
+
+    def get_chapter(self, book, chapter):
+        """按 (书籍, 章节) 查找章节"""
+        return self._chapters.get((book, chapter))
+
+    def get_section(self, book, chapter, name):
+        """按 (书籍, 章节, 小节名称) 查找小节"""
+        return self._sections.get((book, chapter, name))
+
+    def get_section_by_slug(self, book, chapter, slug):
+        """按 (书籍, 章节, slug) 查找小节"""
+        return self._slugs.get((book, chapter, slug))
+
+    def iter_sections(self):
+        """遍历全部小节，产出 ((书籍, 章节, 小节名称), 小节)"""
+        return iter(self._sections.items())
+
+    def find_slug(self, slug):
+        """按 slug 在整个目录中查找小节，返回 (书籍, 章节, 小节名称)"""
+        return self._slug_owners.get(slug)
+
+    def find_url(self, url):
+        """按 URL 在整个目录中查找小节，返回 (书籍, 章节, 小节名称)"""
+        return self._url_owners.get(url)
+
+    def upsert_section(self, book, chapter, name, slug, url):
+        """查找或创建书籍、章节，并新增或更新小节"""
+        self._touch_book(book)
+        book_found = self._books.get(book)
+        if book_found is None:
+            book_found = {
+                'name': book,
+                'chapters': []
+            }
+            self.data['books'].append(book_found)
+            self._books[book] = book_found
+            self._section_counts[book] = 0
+
+        chapter_key = (book, chapter)
+        chapter_found = self._chapters.get(chapter_key)
+        if chapter_found is None:
+            chapter_found = {
+                'name': chapter,
+                'sections': []
+            }
+            book_found['chapters'].append(chapter_found)
+            self._chapters[chapter_key] = chapter_found
+
+        section_found = self._sections.get(chapter_key + (name,))
+        if section_found is None:
+            section_found = {
+                'name': name,
+                'slug': slug,
+                'url': url
+            }
+            chapter_found['sections'].append(section_found)
+            self._section_counts[book] += 1
+        else:
+            # 更新现有小节，旧 slug 索引失效
+            old_slug = section_found.get('slug')
+            if old_slug and self._slugs.get(chapter_key + (old_slug,)) is section_found:
+                del self._slugs[chapter_key + (old_slug,)]
+            if self._slug_owners.get(old_slug) == chapter_key + (name,):
+                del self._slug_owners[old_slug]
+            if self._url_owners.get(section_found.get('url')) == chapter_key + (name,):
+                del self._url_owners[section_found['url']]
+            section_found['slug'] = slug
+            section_found['url'] = url
+        self._index_section(chapter_key, section_found)
+        return section_found
+
+    def set_section_url(self, book, chapter, name, url):
+        """只修改小节的URL，返回修改后的小节；不存在时返回 None"""
+        section = self._sections.get((book, chapter, name))
+        if section is None:
+            return None
+        return self.upsert_section(book, chapter, name, section.get('slug'), url)
+
+    def remove_section(self, book, chapter, name):
+        """删除小节，返回被删除的小节；不存在时返回 None"""
+        section = self._sections.pop((book, chapter, name), None)
+        if section is None:
+            return None
+        self._touch_book(book)
+        chapter_found = self._chapters[(book, chapter)]
+        chapter_found['sections'] = [s for s in chapter_found['sections'] if s is not section]
+        self._section_counts[book] -= 1
+        slug = section.get('slug')
+        if slug and self._slugs.get((book, chapter, slug)) is section:
+            del self._slugs[(book, chapter, slug)]
+        if slug and self._slug_owners.get(slug) == (book, chapter, name):
+            del self._slug_owners[slug]
+        if self._url_owners.get(section.get('url')) == (book, chapter, name):
+            del self._url_owners[section['url']]
+        return section
+
+    def record_section(self, book, chapter, name, slug, url):
+        """新增或更新小节并追加到变更日志，达到阈值时自动压缩"""
+        section = self.upsert_section(book, chapter, name, slug, url)
+        entry = {'book': book, 'chapter': chapter, 'name': name, 'slug': slug, 'url': url}
+        with self.locked():
+            # 其他进程没有改过磁盘时，追加后磁盘仍与内存一致；否则留给写回时合并
+            unchanged = self.file_stat is not None and self._disk_stat() == self.file_stat
+            with open(self.journal_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            if unchanged:
+                self.file_stat = self._disk_stat()
+        self.pending += 1
+
+        if self.pending >= self.compact_threshold:
+            self.save()
+        return section
+
+    def save(self):
+        """将目录原子写回 books.yml 并清空变更日志
+
+        在写锁内进行：books.yml 或变更日志在最近一次加载后被其他进程改过时，
+        先读入磁盘上的版本，与本进程改过的书籍三方合并后再写回
+        """
+        with self.locked():
+            self.conflicts = []
+            if self._disk_stat() != self.file_stat:
+                self._merge_disk()
+            self._write()
+            # 写回后由目录生成的文件（书籍导航）也在锁内更新，与 books.yml 的写入顺序一致
+            if self.on_save is not None:
+                self.on_save(self)
+
+    def _merge_disk(self):
+        """读入磁盘上的目录（含其他进程的变更日志），合并本进程改过的书籍后替换内存中的目录"""
+        # 本进程未改动的书籍按片段摘要复用解析结果，只解析其他进程改过的书籍；
+        # 不读缓存，反序列化整个目录比只解析改过的书籍慢
+        theirs = BooksCatalog(self.books_file, None)
+        theirs._apply_disk(self._read_disk(), previous=self)
+        books = []
+        changed = []
+        for book in theirs.books():
+            name = book.get('name')
+            if name in self._base_books:
+                merged = merge_book(self._base_books[name], self._books[name], book, self.conflicts)
+                if merged is not book:
+                    changed.append(name)
+                book = merged
+            books.append(book)
+        # 本进程新建、磁盘上还没有的书籍追加在最后
+        for book in self.data['books']:
+            name = book.get('name')
+            if name in self._base_books and theirs.get_book(name) is None:
+                books.append(book)
+                changed.append(name)
+        self.data = dict(theirs.data, books=books)
+        self._parsed_books = theirs._parsed_books
+        self._book_digests = theirs._book_digests
+        self._raw_blocks = theirs._raw_blocks
+        self._fingerprints = theirs._fingerprints
+        # 沿用对方已建好的索引，只重建合并结果与对方不同的书籍
+        for attr in INDEX_ATTRS:
+            setattr(self, attr, getattr(theirs, attr))
+        self._reindex_books(changed)
+
+    def _dump(self):
+        """序列化目录，返回 (字节, 各书籍的 (摘要, 片段, 内容摘要) 列表)
+
+        内容与读入时一致的书籍直接沿用原文片段，只序列化改动过的书籍；
+        数据不是单纯的书籍列表时整体序列化，片段列表为 None
+        """
+        books = self.data['books']
+        if not books or list(self.data) != ['books']:
+            return yamlio.dump(self.data).replace('\n', os.linesep).encode('utf-8'), None
+        blocks = []
+        for book in books:
+            digest = self._book_digests.get(book.get('name'))
+            block = self._raw_blocks.get(digest)
+            fingerprint = book_fingerprint(book)
+            # 逐本核对内容摘要：绕过目录方法原地改过的书籍也会重新序列化
+            if block is None or fingerprint is None or fingerprint != self._fingerprints.get(digest):
+                block = yamlio.dump([book]).replace('\n', os.linesep).encode('utf-8')
+                digest = block_digest(block)
+            blocks.append((digest, block, fingerprint))
+        raw = b''.join([b'books:' + os.linesep.encode('ascii')] + [block for _, block, _ in blocks])
+        return raw, blocks
+
+    def _write(self):
+        """原子写回 books.yml 并删除变更日志，调用方持有锁"""
+        # 与文本模式写入相同的换行，文件内容保持不变，同时得到写入的字节用于缓存
+        raw, blocks = self._dump()
+        books_dir = os.path.dirname(self.books_file) or '.'
+        fd, tmp_path = tempfile.mkstemp(prefix='.books-', suffix='.tmp', dir=books_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(raw)
+                f.flush()
+                os.fsync(f.fileno())
+            if os.path.exists(self.books_file):
+                shutil.copymode(self.books_file, tmp_path)
+            os.replace(tmp_path, self.books_file)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        # books.yml 已完整落盘，日志可以丢弃
+        if os.path.exists(self.journal_file):
+            os.remove(self.journal_file)
+        self.pending = 0
+        self.file_stat = self._disk_stat()
+        self._base_books = {}
+
+        # 每个片段都由书籍当前内容序列化或核对过内容摘要，写出的字节就是内存中的目录；
+        # 记录各书籍的摘要并更新缓存，下次启动无需解析
+        books = self.data['books']
+        book_digests = []
+        # 只有能被 split_books 按书籍切分的格式（\n 换行）才按书籍复用
+        if blocks is not None and raw.startswith(b'books:\n'):
+            book_digests = [digest for digest, _, _ in blocks]
+            self._parsed_books = dict(zip(book_digests, books))
+            self._book_digests = {book.get('name'): d for d, book in self._parsed_books.items()}
+            self._raw_blocks = {digest: block for digest, block, _ in blocks}
+            self._fingerprints = {digest: fingerprint for digest, _, fingerprint in blocks}
+        else:
+            self._parsed_books = {}
+            self._book_digests = {}
+            self._raw_blocks = {}
+            self._fingerprints = {}
+        self._write_cache(hashlib.blake2b(raw, digest_size=16).digest(), self.data, book_digests)
+
+
+class CatalogSnapshot:
+    """目录某一时刻的只读快照：书籍名称、各章名称和小节名称都保存为元组
+
+    界面主线程只读快照，后台线程同时修改目录也不会遍历到改到一半的字典；
+    传入上一份快照时，片段摘要没有变化的书籍直接复用
+    """
+
+    def __init__(self, catalog, previous=None):
+        reusable = previous._books if previous is not None else {}
+        # 书籍名称 -> (片段摘要, ((章节名称, (小节名称, ...)), ...))
+        books = {}
+        for name in catalog.book_names():
+            digest = catalog.book_digest(name)
+            cached = reusable.get(name)
+            if digest is not None and cached is not None and cached[0] == digest:
+                books[name] = cached
+                continue
+            book = catalog.get_book(name)
+            books[name] = (digest, tuple((chapter['name'], tuple(section['name'] for section in chapter['sections']))
+                                         for chapter in book['chapters']))
+        self._books = books
+        self.names = tuple(books)
+
+    def chapters(self, book):
+        """书籍的 ((章节名称, (小节名称, ...)), ...)；书籍不存在时返回 None"""
+        found = self._books.get(book)
+        return found[1] if found is not None else None
+
+    def book_counts(self, book):
+        """返回书籍的 (章节数, 文章总数)"""
+        chapters = self._books[book][1]
+        return len(chapters), sum(len(sections) for _, sections in chapters)
+
+    def overview(self):
+        """书籍概览：[(书籍名称, 章节数, 文章总数)]"""
+        return [(name,) + self.book_counts(name) for name in self.names]
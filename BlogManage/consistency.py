@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+一致性检查 - 对照 books.yml 与 _posts 头信息
+按 slug 关联小节与文章，找出悬空小节、孤立文章以及URL、日期不一致，
+修复时所有目录改动只写一次 books.yml；文件名日期与头信息不一致的文章按头信息日期重命名，
+Jekyll 按头信息日期生成URL，重命名不改变文章的URL
+
+用法:
+    python consistency.py              # 只检查
+    python consistency.py --repair     # 修复URL、日期并登记孤立文章
+    python consistency.py --repair --prune   # 同时删除找不到文章的小节
+"""
+
+import os
+import sys
+import time
+import argparse
+
+from permalinks import FILENAME_RE, front_matter_date, post_slug, post_url
+
+
+class ConsistencyReport:
+    """检查结果，同时记录修复所需的信息"""
+
+    def __init__(self):
+        # [(书籍, 章节, 小节名称)]
+        self.dangling = []
+        # [(相对路径, 头信息)]
+        self.orphans = []
+        # [((书籍, 章节, 小节名称), 目录中的URL, 实际URL)]
+        self.url_mismatches = []
+        # [(相对路径, 文件名日期, 头信息日期)]
+        self.date_mismatches = []
+
+    def __bool__(self):
+        return bool(self.dangling or self.orphans or self.url_mismatches or self.date_mismatches)
+
+    def summary(self):
+        """一行统计"""
+        return (f"悬空小节 {len(self.dangling)}，孤立文章 {len(self.orphans)}，"
+                f"URL不一致 {len(self.url_mismatches)}，日期不一致 {len(self.date_mismatches)}")
+
+    def lines(self):
+        """逐条问题描述"""
+        for book, chapter, name in self.dangling:
+            yield f"[悬空小节] {book} / {chapter} / {name}：找不到对应文章"
+        for path, meta in self.orphans:
+            yield f"[孤立文章] {path}：属于《{meta.get('book')}》但未登记到books.yml"
+        for (book, chapter, name), url, expected in self.url_mismatches:
+            yield f"[URL不一致] {book} / {chapter} / {name}：{url} -> {expected}"
+        for path, file_date, meta_date in self.date_mismatches:
+            yield f"[日期不一致] {path}：文件名 {file_date}，头信息 {meta_date}"
+
+
+def check(catalog, post_index):
+    """按 slug 关联目录与文章，返回 ConsistencyReport"""
+    report = ConsistencyReport()
+    posts_by_slug = {}
+    for path, meta in post_index.items():
+        slug = post_slug(path)
+        posts_by_slug[slug] = (path, meta)
+
+        match = FILENAME_RE.match(slug)
+        meta_date = front_matter_date(meta)
+        if match and meta_date:
+            file_date = '-'.join(match.groups()[:3])
+            if file_date != meta_date:
+                report.date_mismatches.append((path, file_date, meta_date))
+
+        if meta.get('book') and catalog.find_slug(slug) is None:
+            report.orphans.append((path, meta))
+
+    for key, section in catalog.iter_sections():
+        post = posts_by_slug.get(section.get('slug'))
+        if post is None:
+            report.dangling.append(key)
+            continue
+        expected = post_url(*post)
+        if expected and section.get('url') != expected:
+            report.url_mismatches.append((key, section.get('url'), expected))
+    return report
+
+
+def repair(catalog, report, prune=False, posts_dir=None):
+    """按检查结果修复并写回一次 books.yml，返回 (修改条数, 未能修复的问题列表)
+
+    日期不一致的文章按头信息日期重命名文件并更新小节的 slug；不传 posts_dir 时只报告不修复
+    """
+    changes = 0
+    skipped = []
+    for (book, chapter, name), _, expected in report.url_mismatches:
+        catalog.set_section_url(book, chapter, name, expected)
+        changes += 1
+
+    # 原路径 -> 重命名后的路径
+    renamed = {}
+    for path, file_date, meta_date in report.date_mismatches:
+        if posts_dir is None:
+            skipped.append(f"[日期不一致] {path}：未指定文章目录，未重命名")
+            continue
+        directory, _, filename = path.rpartition('/')
+        new_path = (directory + '/' if directory else '') + meta_date + filename[len(file_date):]
+        target = os.path.join(posts_dir, new_path)
+        if os.path.exists(target):
+            skipped.append(f"[日期不一致] {path}：{new_path} 已存在，未重命名")
+            continue
+        os.rename(os.path.join(posts_dir, path), target)
+        renamed[path] = new_path
+        owner = catalog.find_slug(post_slug(path))
+        if owner is not None:
+            catalog.upsert_section(*owner, post_slug(new_path), catalog.get_section(*owner).get('url'))
+        changes += 1
+
+    for path, meta in report.orphans:
+        if not (meta.get('chapter') and meta.get('section') and meta.get('title')):
+            skipped.append(f"[孤立文章] {path}：头信息缺少章节、小节或标题，未登记")
+            continue
+        path = renamed.get(path, path)
+        name = f"{meta['section']} {meta['title']}"
+        catalog.upsert_section(str(meta['book']), str(meta['chapter']), name,
+                               post_slug(path), post_url(path, meta))
+        changes += 1
+
+    # 重命名或登记孤立文章后重新对上文章的小节不再悬空
+    linked = {post_slug(path) for path in renamed.values()}
+    linked.update(post_slug(renamed.get(path, path)) for path, _ in report.orphans)
+    for book, chapter, name in report.dangling:
+        section = catalog.get_section(book, chapter, name)
+        if section is None or section.get('slug') in linked:
+            continue
+        if prune:
+            catalog.remove_section(book, chapter, name)
+            changes += 1
+        else:
+            skipped.append(f"[悬空小节] {book} / {chapter} / {name}：未指定 --prune，保留")
+
+    if changes:
+        catalog.save()
+    return changes, skipped
+
+
+def main(argv=None):
+    from core import BlogProject
+
+    parser = argparse.ArgumentParser(description='检查 books.yml 与 _posts 是否一致')
+    parser.add_argument('--root', default=None, help='博客根目录（默认为BlogManage的上级目录）')
+    parser.add_argument('--repair', action='store_true', help='修复URL、文件名日期并登记孤立文章')
+    parser.add_argument('--prune', action='store_true', help='修复时删除找不到文章的小节')
+    args = parser.parse_args(argv)
+
+    project = BlogProject(args.root).load()
+    start = time.perf_counter()
+    project.post_index.refresh()
+    report = check(project.catalog, project.post_index)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    for line in report.lines():
+        print(line)
+    print(f"{report.summary()}（用时 {elapsed:.1f} ms）")
+
+    if args.repair and report:
+        changes, skipped = repair(project.catalog, report, prune=args.prune, posts_dir=project.posts_dir)
+        for line in skipped:
+            print(line)
+        print(f"已修复 {changes} 处{'，books.yml 已更新' if changes else ''}；未修复 {len(skipped)} 处")
+        return 1 if skipped else 0
+    return 1 if report else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+博客管理核心 - 不依赖PyQt的纯Python逻辑
+书籍目录、slug生成、头信息渲染和文章写入都在这里，
+图形界面、批量导入等工具只是它的一层外壳
+"""
+
+import os
+
+from catalog import BooksCatalog, CatalogSnapshot
+from posts import build_article_data, generate_slug, render_post, write_post
+
+__all__ = ['BlogProject', 'BooksCatalog', 'build_article_data', 'generate_slug',
+           'render_post', 'section_name', 'write_post']
+
+DEFAULT_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def section_name(article_data):
+    """books.yml 中的小节名称：“小节编号 标题”"""
+    return f"{article_data['section']} {article_data['title']}"
+
+
+class BlogProject:
+    """博客工程，所有路径都以 project_root 为基准"""
+
+    def __init__(self, project_root=None):
+        self.project_root = project_root or DEFAULT_PROJECT_ROOT
+        self.books_file = os.path.join(self.project_root, '_data', 'books.yml')
+        self.posts_dir = os.path.join(self.project_root, '_posts')
+        self.cache_dir = os.path.join(self.project_root, '.cache')
+        self.catalog_cache = os.path.join(self.cache_dir, 'books.marshal')
+        self.catalog = self._new_catalog()
+        self._post_index = None
+        self._permalinks = None
+        self._book_nav = None
+        self._post_search = None
+        self._site_build = None
+
+    def _new_catalog(self):
+        """books.yml 每次写回后同步更新书籍导航"""
+        return BooksCatalog(self.books_file, self.catalog_cache, on_save=self.update_book_nav)
+
+    def load(self):
+        """加载书籍目录"""
+        self.catalog.load()
+        return self
+
+    def reload(self):
+        """重新加载书籍目录；加载完成后才替换，读取方不会看到半成品
+        未改动的书籍复用当前目录的解析结果"""
+        catalog = self._new_catalog().load(previous=self.catalog)
+        self.catalog = catalog
+        return catalog
+
+    def sync(self):
+        """把磁盘上的变化同步到内存，返回 (重新解析的书籍, 变化的文章, 删除的文章)
+
+        books.yml 没有被其他程序修改时不重新加载，修改时只解析改动的书籍；
+        _posts 只重新解析 mtime 或大小变化的文章
+        """
+        reparsed = []
+        if self.catalog.changed_on_disk():
+            reparsed = self.reload().reparsed
+            # books.yml 被其他程序修改，导航也要跟着更新；未变化的书籍按摘要跳过
+            self.update_book_nav()
+        changed, removed = self.post_index.refresh()
+        if self._post_search is not None and (changed or removed):
+            self._post_search.refresh()
+        return reparsed, changed, removed
+
+    def overview(self):
+        """书籍概览：[(书籍名称, 章节数, 文章总数)]"""
+        catalog = self.catalog
+        return [(name,) + catalog.book_counts(name) for name in catalog.book_names()]
+
+    def snapshot(self, previous=None):
+        """书籍目录的只读快照，供界面主线程使用；未变化的书籍复用 previous 中的内容"""
+        return CatalogSnapshot(self.catalog, previous)
+
+    @property
+    def post_index(self):
+        """_posts 头信息索引，首次使用时打开"""
+        if self._post_index is None:
+            from post_index import PostIndex
+            self._post_index = PostIndex(self.posts_dir, os.path.join(self.cache_dir, 'posts.sqlite'))
+        return self._post_index
+
+    @property
+    def post_search(self):
+        """_posts 全文搜索索引，首次使用时打开"""
+        if self._post_search is None:
+            from post_search import PostSearch
+            self._post_search = PostSearch(self.posts_dir, os.path.join(self.cache_dir, 'search.sqlite'))
+        return self._post_search
+
+    @property
+    def permalinks(self):
+        """_posts 的 slug/URL 反向索引，首次使用时刷新文章索引并建立，之后随文章索引增量同步"""
+        if self._permalinks is None:
+            from permalinks import PermalinkIndex
+            self.post_index.refresh()
+            self._permalinks = PermalinkIndex()
+        return self._permalinks.sync(self.post_index)
+
+    @property
+    def book_nav(self):
+        """按书籍预生成的侧栏导航"""
+        if self._book_nav is None:
+            from book_nav import BookNav
+            self._book_nav = BookNav(self.project_root)
+        return self._book_nav
+
+    @property
+    def site_build(self):
+        """页面依赖记录，增量构建时计算受改动影响的页面"""
+        if self._site_build is None:
+            from site_build import SiteBuild
+            self._site_build = SiteBuild(self)
+        return self._site_build
+
+    def update_book_nav(self, catalog=None):
+        """重新生成内容变化的书籍导航，返回 (写入的文件, 删除的文件)"""
+        return self.book_nav.update(catalog or self.catalog)
+
+    def check_permalink(self, article_data):
+        """保存前检查文件名和URL是否被其他文章占用，冲突时抛出 SlugConflictError"""
+        self.permalinks.check(article_data, self.catalog, self.posts_dir)
+
+    def uncataloged_posts(self):
+        """返回存在于 _posts 但未登记在 books.yml 中的文章路径"""
+        from permalinks import post_slug
+        return sorted(path for path, _ in self.post_index.items()
+                      if self.catalog.find_slug(post_slug(path)) is None)
+
+    def check_consistency(self):
+        """增量刷新文章索引后对照 books.yml，返回 ConsistencyReport"""
+        from consistency import check
+        self.post_index.refresh()
+        return check(self.catalog, self.post_index)
+
+    def update_catalog(self, article_data, journal=True):
+        """将文章登记到书籍目录；journal 为 False 时只修改内存，由调用方统一保存"""
+        update = self.catalog.record_section if journal else self.catalog.upsert_section
+        return update(article_data['book'], article_data['chapter'],
+                      section_name(article_data), article_data['slug'],
+                      article_data['url'])
+
+    def write_article(self, article_data):
+        """写入文章文件，返回文件路径"""
+        path = write_post(self.posts_dir, article_data)
+        if self._permalinks is not None:
+            self._permalinks.add_written(os.path.basename(path), {
+                key: article_data[key] for key in ('book', 'chapter', 'section', 'title', 'date')})
+        if self._post_search is not None:
+            # 全文索引已打开时只重新索引这一篇，未打开时下次刷新会发现变化
+            self._post_search.update_post(os.path.basename(path))
+        return path
+
+    def save_article(self, book, chapter, section, title, **fields):
+        """生成文章数据、登记目录并写入文件，返回文章数据"""
+        article_data = build_article_data(book, chapter, section, title, **fields)
+        self.check_permalink(article_data)
+        self.update_catalog(article_data)
+        self.write_article(article_data)
+        return article_data
@@ -0,0 +1,716 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+博客管理工具 - PyQt界面
+基于文章发布指南的自动化管理脚本，业务逻辑见 core.py
+"""
+
+import os
+import sys
+import html
+import time
+import sqlite3
+from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
+                             QHBoxLayout, QLabel, QLineEdit, QTextEdit, 
+                             QPushButton, QComboBox, QDateEdit, QTabWidget,
+                             QTableView, QTreeWidget, QMessageBox,
+                             QGroupBox, QFormLayout, QSplitter,
+                             QCheckBox, QSpinBox, QTextBrowser)
+from PyQt5.QtCore import Qt, QDate, QTimer, QUrl
+from PyQt5.QtGui import QDesktopServices, QFont, QTextCursor, QTextFrameFormat
+
+from core import BlogProject, build_article_data, generate_slug
+from models import BooksTableModel, LazyTreeItem
+from posts import post_filename
+from preview import MarkdownPreview, diff_blocks
+from rendering import render_post, template_names
+from watcher import watch_paths
+from workers import FileWatcher, TaskQueue
+
+# 概览表中未登记文章的汇总行
+UNCATALOGED_LABEL = "（未收录文章）"
+
+class LivePreview(QTextBrowser):
+    """正文的实时HTML预览：停止输入后渲染，只替换内容有变化的块"""
+    
+    def __init__(self, editor, delay=150, parent=None):
+        super().__init__(parent)
+        self.setOpenExternalLinks(True)
+        self.document().setUndoRedoEnabled(False)
+        self.editor = editor
+        self.renderer = MarkdownPreview()
+        self.blocks = []
+        
+        # 每次按键只重启定时器，连续输入合并为一次渲染
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay)
+        self.timer.timeout.connect(self.refresh)
+        editor.textChanged.connect(self.timer.start)
+        
+    def refresh(self):
+        """按编辑框当前内容更新预览"""
+        rendered = self.renderer.update(self.editor.toPlainText())
+        blocks = [block for block, _ in rendered]
+        prefix, suffix = diff_blocks(self.blocks, blocks)
+        if prefix == len(blocks) == len(self.blocks):
+            return
+        
+        # 每个块对应文档中的一个框架，框架位置随前面的修改自动调整
+        doc = self.document()
+        frames = doc.rootFrame().childFrames()
+        cursor = QTextCursor(doc)
+        cursor.beginEditBlock()
+        for frame in frames[prefix:len(frames) - suffix]:
+            cursor.setPosition(frame.firstPosition() - 1)
+            cursor.setPosition(frame.lastPosition() + 1, QTextCursor.KeepAnchor)
+            cursor.removeSelectedText()
+        if suffix:
+            position = frames[len(frames) - suffix].firstPosition() - 1
+        else:
+            position = doc.rootFrame().lastPosition()
+        for _, block_html in reversed(rendered[prefix:len(rendered) - suffix]):
+            cursor.setPosition(position)
+            cursor.insertFrame(QTextFrameFormat())
+            cursor.insertHtml(block_html)
+        cursor.endEditBlock()
+        self.blocks = blocks
+
+class BlogManager(QMainWindow):
+    def __init__(self, project_root=None, background_io=True):
+        super().__init__()
+        self.project = BlogProject(project_root)
+        self.project_root = self.project.project_root
+        self.books_file = self.project.books_file
+        self.posts_dir = self.project.posts_dir
+        # 主线程只读后台任务交回的目录快照和未收录文章列表 [(路径, 标题)]
+        self.snapshot = None
+        self.uncataloged_posts = []
+        self.search_hits = []
+        self.search_indexed = False
+        
+        # 文件读写和解析在后台线程串行执行，避免界面卡顿
+        self.tasks = TaskQueue(self, background=background_io)
+        
+        # 保存后延迟压缩变更日志，连续保存合并为一次写入
+        self.compact_timer = QTimer(self)
+        self.compact_timer.setSingleShot(True)
+        self.compact_timer.setInterval(2000)
+        self.compact_timer.timeout.connect(self.compact_books_data)
+        
+        # 其他编辑器或git修改books.yml、_posts后自动增量同步
+        self.watching = False
+        self.watcher = FileWatcher(self.project, parent=self)
+        self.watcher.changed.connect(self.sync_data)
+        
+        self.init_ui()
+        self.load_books_data()
+        self.sync_data()
+        
+    def init_ui(self):
+        self.setWindowTitle('博客文章管理器')
+        self.setGeometry(100, 100, 1200, 800)
+        
+        # 创建主窗口部件
+        main_widget = QWidget()
+        self.setCentralWidget(main_widget)
+        
+        # 创建标签页
+        self.tabs = QTabWidget()
+        self.create_overview_tab()
+        self.create_add_article_tab()
+        self.create_search_tab()
+        self.tabs.currentChanged.connect(self.on_tab_changed)
+        
+        layout = QVBoxLayout()
+        layout.addWidget(self.tabs)
+        main_widget.setLayout(layout)
+        
+    def create_overview_tab(self):
+        """创建概览标签页"""
+        overview_widget = QWidget()
+        layout = QHBoxLayout()
+        
+        # 左侧书籍列表
+        left_group = QGroupBox("书籍列表")
+        left_layout = QVBoxLayout()
+        
+        # 模型/视图：统计值预先算好，视图只绘制可见行
+        self.books_model = BooksTableModel(self)
+        self.books_table = QTableView()
+        self.books_table.setModel(self.books_model)
+        self.books_table.setSelectionBehavior(QTableView.SelectRows)
+        self.books_table.verticalHeader().setDefaultSectionSize(24)
+        self.books_table.clicked.connect(self.show_book_details)
+        
+        left_layout.addWidget(self.books_table)
+        left_group.setLayout(left_layout)
+        
+        # 右侧详情
+        right_group = QGroupBox("详细信息")
+        right_layout = QVBoxLayout()
+        
+        self.details_label = QLabel()
+        self.details_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        right_layout.addWidget(self.details_label)
+        
+        # 章节详情按需展开，展开时才创建小节节点
+        self.details_tree = QTreeWidget()
+        self.details_tree.setHeaderHidden(True)
+        self.details_tree.itemExpanded.connect(self.expand_details_item)
+        right_layout.addWidget(self.details_tree)
+        
+        # 刷新按钮
+        refresh_btn = QPushButton("刷新数据")
+        refresh_btn.clicked.connect(self.refresh_data)
+        right_layout.addWidget(refresh_btn)
+        
+        right_group.setLayout(right_layout)
+        
+        layout.addWidget(left_group, 1)
+        layout.addWidget(right_group, 2)
+        overview_widget.setLayout(layout)
+        
+        self.tabs.addTab(overview_widget, "文章概览")
+        
+    def create_add_article_tab(self):
+        """创建添加文章标签页"""
+        add_widget = QWidget()
+        layout = QVBoxLayout()
+        
+        # 快捷填充组
+        quick_group = QGroupBox("快捷填充")
+        quick_layout = QVBoxLayout()
+        
+        # 自动编号
+        auto_layout = QHBoxLayout()
+        self.auto_number = QCheckBox("自动编号")
+        self.auto_number.setChecked(True)
+        self.auto_number.toggled.connect(self.toggle_auto_number)
+        auto_layout.addWidget(self.auto_number)
+        
+        self.chapter_spin = QSpinBox()
+        self.chapter_spin.setRange(1, 20)
+        self.chapter_spin.setValue(1)
+        self.chapter_spin.setPrefix("第")
+        self.chapter_spin.setSuffix("章")
+        self.chapter_spin.valueChanged.connect(self.auto_fill_chapter)
+        auto_layout.addWidget(QLabel("章节:"))
+        auto_layout.addWidget(self.chapter_spin)
+        
+        self.section_spin = QSpinBox()
+        self.section_spin.setRange(1, 10)
+        self.section_spin.setValue(1)
+        self.section_spin.valueChanged.connect(self.auto_fill_section)
+        auto_layout.addWidget(QLabel("小节:"))
+        auto_layout.addWidget(self.section_spin)
+        quick_layout.addLayout(auto_layout)
+        
+        # 快捷填充按钮
+        fill_buttons = QHBoxLayout()
+        fill_chapter_btn = QPushButton("填充章节")
+        fill_chapter_btn.clicked.connect(lambda: self.auto_fill_chapter_text())
+        fill_buttons.addWidget(fill_chapter_btn)
+        
+        fill_section_btn = QPushButton("填充小节")
+        fill_section_btn.clicked.connect(lambda: self.auto_fill_section_text())
+        fill_buttons.addWidget(fill_section_btn)
+        
+        quick_layout.addLayout(fill_buttons)
+        quick_group.setLayout(quick_layout)
+        layout.addWidget(quick_group)
+        
+        # 文章信息表单
+        form_group = QGroupBox("文章信息")
+        form_layout = QFormLayout()
+        
+        self.book_combo = QComboBox()
+        self.book_combo.setEditable(True)
+        self.book_combo.setPlaceholderText("选择或输入书籍名称")
+        
+        self.chapter_input = QLineEdit()
+        self.chapter_input.setPlaceholderText("例如：第1章：XXX")
+        
+        self.section_input = QLineEdit()
+        self.section_input.setPlaceholderText("例如：1.1")
+        
+        self.title_input = QLineEdit()
+        self.title_input.setPlaceholderText("文章标题")
+        self.subtitle_input = QLineEdit()
+        self.subtitle_input.setPlaceholderText("副标题（可选）")
+        self.date_edit = QDateEdit()
+        self.date_edit.setDate(QDate.currentDate())
+        self.date_edit.setCalendarPopup(True)
+        
+        self.tags_input = QLineEdit()
+        self.tags_input.setPlaceholderText("标签，用逗号分隔")
+        
+        self.description_text = QTextEdit()
+        self.description_text.setMaximumHeight(80)
+        self.description_text.setPlaceholderText("文章描述（可选）")
+        
+        self.content_text = QTextEdit()
+        self.content_text.setPlaceholderText("文章内容（支持Markdown格式）")
+        
+        # 内容为空时使用所选模板生成正文
+        self.template_combo = QComboBox()
+        self.template_combo.addItem("（不使用模板）", '')
+        for name in template_names():
+            self.template_combo.addItem(name, name)
+        
+        form_layout.addRow("书籍：", self.book_combo)
+        form_layout.addRow("章节：", self.chapter_input)
+        form_layout.addRow("小节：", self.section_input)
+        form_layout.addRow("标题：", self.title_input)
+        form_layout.addRow("副标题：", self.subtitle_input)
+        form_layout.addRow("日期：", self.date_edit)
+        form_layout.addRow("标签：", self.tags_input)
+        form_layout.addRow("描述：", self.description_text)
+        # 正文与实时预览左右并排
+        self.live_preview = LivePreview(self.content_text)
+        content_splitter = QSplitter(Qt.Horizontal)
+        content_splitter.addWidget(self.content_text)
+        content_splitter.addWidget(self.live_preview)
+        form_layout.addRow("内容：", content_splitter)
+        form_layout.addRow("模板：", self.template_combo)
+        
+        form_group.setLayout(form_layout)
+        
+        # 预览区域
+        preview_group = QGroupBox("预览")
+        preview_layout = QVBoxLayout()
+        self.preview_text = QTextEdit()
+        self.preview_text.setMaximumHeight(150)
+        preview_layout.addWidget(self.preview_text)
+        preview_group.setLayout(preview_layout)
+        
+        # 操作按钮
+        button_layout = QHBoxLayout()
+        
+        preview_btn = QPushButton("预览")
+        preview_btn.clicked.connect(self.preview_article)
+        
+        save_btn = QPushButton("保存文章")
+        save_btn.clicked.connect(self.save_article)
+        
+        clear_btn = QPushButton("清空")
+        clear_btn.clicked.connect(self.clear_form)
+        
+        button_layout.addWidget(preview_btn)
+        button_layout.addWidget(save_btn)
+        button_layout.addWidget(clear_btn)
+        
+        layout.addWidget(form_group)
+        layout.addWidget(preview_group)
+        layout.addLayout(button_layout)
+        add_widget.setLayout(layout)
+        
+        self.tabs.addTab(add_widget, "添加文章")
+        
+    def create_search_tab(self):
+        """创建全文搜索标签页"""
+        self.search_widget = QWidget()
+        layout = QVBoxLayout()
+        
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("搜索正文、标题和标签，例如：GPIO 寄存器")
+        self.search_input.returnPressed.connect(self.run_search)
+        layout.addWidget(self.search_input)
+        
+        # 停止输入后再查询，连续输入合并为一次
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(200)
+        self.search_timer.timeout.connect(self.run_search)
+        self.search_input.textChanged.connect(self.search_timer.start)
+        
+        self.search_status = QLabel()
+        layout.addWidget(self.search_status)
+        
+        self.search_results = QTextBrowser()
+        self.search_results.setOpenLinks(False)
+        self.search_results.anchorClicked.connect(self.open_search_result)
+        layout.addWidget(self.search_results)
+        
+        self.search_widget.setLayout(layout)
+        self.tabs.addTab(self.search_widget, "全文搜索")
+        
+    def on_tab_changed(self, index):
+        """第一次打开搜索页时在后台建立或增量更新全文索引"""
+        if self.tabs.widget(index) is self.search_widget and not self.search_indexed:
+            self.search_status.setText("正在更新全文索引……")
+            self.tasks.submit('search-index', self._index_in_background,
+                              on_done=self.on_search_indexed, on_error=self.on_search_failed)
+            
+    def _index_in_background(self):
+        """后台线程：增量更新全文索引，之后保存文章时只更新该篇"""
+        changed, _ = self.project.post_search.refresh()
+        self.search_indexed = True
+        return len(self.project.post_search), len(changed)
+        
+    def on_search_indexed(self, result):
+        """全文索引就绪"""
+        total, changed = result
+        self.search_status.setText(f"已索引 {total} 篇文章（本次更新 {changed} 篇）")
+        if self.search_input.text().strip():
+            self.run_search()
+            
+    def run_search(self):
+        """在后台执行查询，排队中的旧查询被最新输入替换"""
+        self.search_timer.stop()
+        query = self.search_input.text()
+        if not query.strip():
+            self.search_hits = []
+            self.search_results.clear()
+            return
+        self.tasks.submit('search', self._search_in_background, args=(query,),
+                          on_done=self.show_search_results, on_error=self.on_search_failed)
+        
+    def _search_in_background(self, query):
+        """后台线程：查询全文索引，返回 (查询, 结果, 毫秒)"""
+        if not self.search_indexed:
+            self._index_in_background()
+        start = time.perf_counter()
+        hits = self.project.post_search.search(query)
+        return query, hits, (time.perf_counter() - start) * 1000
+        
+    def show_search_results(self, result):
+        """显示结果列表：标题、日期、路径和摘要"""
+        query, hits, elapsed = result
+        if query != self.search_input.text():
+            return
+        self.search_hits = hits
+        self.search_status.setText(f"找到 {len(hits)} 条结果，用时 {elapsed:.1f} ms")
+        parts = []
+        for i, hit in enumerate(hits):
+            parts.append(f'<p><a href="result:{i}"><b>{html.escape(hit["title"] or hit["path"])}</b></a>'
+                         f'<br><span style="color:#7f8c8d;">{html.escape(hit["date"][:10])}  '
+                         f'{html.escape(hit["path"])}</span><br>{hit["snippet"]}</p>')
+        self.search_results.setHtml(''.join(parts))
+        
+    def on_search_failed(self, message):
+        """全文搜索失败"""
+        self.search_status.setText(f"全文搜索失败：{message}")
+        
+    def open_search_result(self, url):
+        """用系统默认程序打开搜索结果对应的文章"""
+        index = int(url.toString().split(':', 1)[1])
+        path = os.path.join(self.posts_dir, self.search_hits[index]['path'])
+        QDesktopServices.openUrl(QUrl.fromLocalFile(path))
+        
+    def load_books_data(self):
+        """在后台加载书籍数据"""
+        self.tasks.submit('load', self._load_in_background,
+                          on_done=self.on_books_loaded, on_error=self.on_load_failed)
+        
+    def _load_in_background(self):
+        """后台线程：重新加载目录，返回只读快照"""
+        self.project.reload()
+        return self._snapshot_in_background()
+        
+    def _snapshot_in_background(self):
+        """后台线程：目录的只读快照，未变化的书籍复用上一份快照"""
+        return self.project.snapshot(self.snapshot)
+        
+    def _uncataloged_in_background(self):
+        """后台线程：未登记到books.yml的文章 [(路径, 标题)]"""
+        post_index = self.project.post_index
+        return [(path, (post_index.get(path) or {}).get('title', ''))
+                for path in self.project.uncataloged_posts()]
+        
+    def on_books_loaded(self, snapshot):
+        """书籍数据加载完成"""
+        self.snapshot = snapshot
+        self.update_books_list()
+        
+    def on_load_failed(self, message):
+        """书籍数据加载失败"""
+        QMessageBox.warning(self, "警告", f"加载书籍数据失败: {message}")
+            
+    def update_books_list(self):
+        """更新书籍下拉列表"""
+        current = self.book_combo.currentText()
+        self.book_combo.clear()
+        self.book_combo.addItems(self.snapshot.names if self.snapshot else [])
+        self.book_combo.setEditText(current)
+        
+    def refresh_data(self):
+        """刷新数据"""
+        self.statusBar().showMessage("正在刷新数据……")
+        self.tasks.submit('refresh', self._refresh_in_background,
+                          on_done=self.on_data_refreshed, on_error=self.on_load_failed)
+        
+    def _refresh_in_background(self):
+        """后台线程：重新加载目录和文章索引，准备概览数据"""
+        self.project.reload()
+        error = None
+        try:
+            self.project.post_index.refresh()
+            uncataloged = self._uncataloged_in_background()
+        except (sqlite3.Error, OSError) as e:
+            # 文章索引失败不影响书籍目录，未收录文章留空并在界面上提示
+            uncataloged, error = [], str(e)
+        return self._snapshot_in_background(), uncataloged, error
+        
+    def on_data_refreshed(self, result):
+        """刷新完成，更新界面"""
+        snapshot, self.uncataloged_posts, error = result
+        self.on_books_loaded(snapshot)
+        self.display_books_overview()
+        if error:
+            QMessageBox.warning(self, "警告", f"扫描文章失败，未收录文章列表可能不完整: {error}")
+            self.statusBar().showMessage("数据已刷新（文章扫描失败）", 5000)
+        else:
+            self.statusBar().showMessage("数据已刷新", 3000)
+        
+    def sync_data(self):
+        """在后台同步磁盘上的修改，只重新解析改动过的书籍和文章"""
+        self.tasks.submit('sync', self._sync_in_background,
+                          on_done=self.on_data_synced,
+                          on_error=lambda message: self.statusBar().showMessage(
+                              f"同步失败：{message}", 5000))
+        
+    def _sync_in_background(self):
+        """后台线程：增量同步并准备概览数据和监视路径"""
+        changes = self.project.sync()
+        return (changes, self._snapshot_in_background(), self._uncataloged_in_background(),
+                watch_paths(self.project))
+        
+    def on_data_synced(self, result):
+        """同步完成，更新界面和监视路径"""
+        (reparsed, changed, removed), snapshot, self.uncataloged_posts, paths = result
+        self.watcher.watch(paths)
+        if reparsed or self.snapshot is None:
+            self.on_books_loaded(snapshot)
+        self.snapshot = snapshot
+        self.display_books_overview()
+        if self.watching and (reparsed or changed or removed):
+            self.statusBar().showMessage(
+                f"已同步外部修改：书籍 {len(reparsed)} 本，文章 {len(changed) + len(removed)} 篇", 3000)
+        self.watching = True
+        
+    def display_books_overview(self, overview=None):
+        """显示书籍概览，默认取最近一次的目录快照"""
+        if overview is None:
+            overview = self.snapshot.overview() if self.snapshot else []
+        rows = list(overview)
+        
+        # 磁盘上存在但未登记到books.yml的文章
+        if self.uncataloged_posts:
+            rows.append((UNCATALOGED_LABEL, "-", len(self.uncataloged_posts)))
+        self.books_model.set_rows(rows)
+            
+    def show_book_details(self, index):
+        """显示书籍详情"""
+        book_name = self.books_model.row_name(index.row())
+        
+        if book_name == UNCATALOGED_LABEL:
+            self.show_uncataloged_posts()
+            return
+            
+        chapters = self.snapshot.chapters(book_name) if self.snapshot else None
+        if chapters is None:
+            return
+            
+        chapter_count, article_count = self.snapshot.book_counts(book_name)
+        self.details_label.setText(f"书籍名称: {book_name}\n"
+                                   f"章节数量: {chapter_count}\n"
+                                   f"文章总数: {article_count}")
+        
+        self.details_tree.clear()
+        self.details_tree.addTopLevelItems([
+            LazyTreeItem(f"{chapter} ({len(sections)}篇文章)", lambda sections=sections: list(sections))
+            for chapter, sections in chapters
+        ])
+                
+    def show_uncataloged_posts(self):
+        """显示未登记到books.yml的文章"""
+        posts = self.uncataloged_posts
+        self.details_label.setText(f"未收录文章: {len(posts)}篇")
+        
+        def post_lines():
+            return [f"{path}  {title}" for path, title in posts]
+            
+        self.details_tree.clear()
+        item = LazyTreeItem(UNCATALOGED_LABEL, post_lines)
+        self.details_tree.addTopLevelItem(item)
+        item.setExpanded(True)
+        
+    def expand_details_item(self, item):
+        """展开章节时填充小节"""
+        if isinstance(item, LazyTreeItem):
+            item.populate()
+                
+    def preview_article(self):
+        """预览文章，与保存时写入的文件内容完全一致"""
+        article_data = self.get_article_data()
+        if not article_data:
+            return
+            
+        self.preview_text.setPlainText(render_post(article_data))
+        
+    def get_article_data(self):
+        """读取表单并生成文章数据，必填字段缺失时返回 None"""
+        book = self.book_combo.currentText().strip()
+        chapter = self.chapter_input.text().strip()
+        section = self.section_input.text().strip()
+        title = self.title_input.text().strip()
+        
+        if not all([book, chapter, section, title]):
+            QMessageBox.warning(self, "警告", "请填写完整的书籍、章节、小节和标题信息！")
+            return None
+            
+        return build_article_data(book, chapter, section, title,
+                                  tags=self.tags_input.text().strip(),
+                                  description=self.description_text.toPlainText().strip(),
+                                  content=self.content_text.toPlainText().strip(),
+                                  subtitle=self.subtitle_input.text().strip(),
+                                  date=self.date_edit.date().toPyDate(),
+                                  template=self.template_combo.currentData() or '')
+        
+    def save_article(self):
+        """保存文章"""
+        try:
+            article_data = self.get_article_data()
+        except Exception as e:
+            QMessageBox.critical(self, "错误", f"保存失败：{str(e)}")
+            return
+        if not article_data:
+            return
+            
+        # 同一篇文章连续点击保存时，排队中的请求合并为最新内容
+        self.statusBar().showMessage("正在保存……")
+        self.tasks.submit(('save', post_filename(article_data)), self._save_in_background,
+                          args=(article_data,), on_done=self.on_article_saved,
+                          on_error=self.on_save_failed)
+
+    def _save_in_background(self, article_data):
+        """后台线程：更新books.yml、写入文章并检查一致性"""
+        # 文件名或URL已被其他文章占用时直接失败，不覆盖
+        self.project.check_permalink(article_data)
+        
+        # 更新books.yml
+        self.update_books_data_exact(article_data)
+        
+        # 创建文章文件
+        self.create_article_file_exact(article_data)
+        
+        return self.project.check_consistency(), self._snapshot_in_background()
+
+    def on_article_saved(self, result):
+        """保存完成"""
+        report, snapshot = result
+        self.set_snapshot(snapshot)
+        self.compact_timer.start()
+        self.show_consistency(report)
+        if not self.tasks.pending():
+            QMessageBox.information(self, "成功", "文章保存成功！")
+
+    def on_save_failed(self, message):
+        """保存失败"""
+        self.statusBar().clearMessage()
+        QMessageBox.critical(self, "错误", f"保存失败：{message}")
+
+    def update_books_data_exact(self, article_data):
+        """精确更新books.yml文件，使用正确的数据结构"""
+        # 追加到变更日志，稍后批量压缩写回
+        self.project.update_catalog(article_data)
+
+    def show_consistency(self, report):
+        """在状态栏显示books.yml与_posts的一致性检查结果"""
+        if report:
+            self.statusBar().showMessage(f"一致性检查：{report.summary()}（运行 blog_manager.py check --repair 修复）")
+        else:
+            self.statusBar().showMessage("一致性检查通过")
+
+    def compact_books_data(self):
+        """在后台将变更日志压缩写回books.yml"""
+        self.tasks.submit('compact', self._compact_in_background, on_done=self.set_snapshot,
+                          on_error=lambda message: QMessageBox.warning(
+                              self, "警告", f"写入书籍数据失败: {message}"))
+
+    def _compact_in_background(self):
+        """后台线程：有未压缩的变更时写回books.yml（可能合并其他进程的修改），返回新的快照"""
+        if self.project.catalog.pending:
+            self.project.catalog.save()
+        return self._snapshot_in_background()
+
+    def set_snapshot(self, snapshot):
+        """换上后台任务交回的快照，书籍有增减时更新下拉列表"""
+        names_changed = self.snapshot is None or snapshot.names != self.snapshot.names
+        self.snapshot = snapshot
+        if names_changed:
+            self.update_books_list()
+
+    def closeEvent(self, event):
+        """关闭窗口前完成排队的任务并写回未压缩的变更"""
+        self.compact_timer.stop()
+        self.watcher.stop()
+        try:
+            self.tasks.drain()
+            self._compact_in_background()
+        except Exception as e:
+            QMessageBox.warning(self, "警告", f"写入书籍数据失败: {str(e)}")
+        super().closeEvent(event)
+
+    def create_article_file_exact(self, article_data):
+        """创建文章文件，使用book布局格式"""
+        return self.project.write_article(article_data)
+
+    def clear_form(self):
+        """清空表单"""
+        self.title_input.clear()
+        self.subtitle_input.clear()
+        self.chapter_input.clear()
+        self.section_input.clear()
+        self.tags_input.clear()
+        self.description_text.clear()
+        self.content_text.clear()
+        self.template_combo.setCurrentIndex(0)
+        self.date_edit.setDate(QDate.currentDate())
+        self.preview_text.clear()
+        
+    def toggle_auto_number(self, checked):
+        """切换自动编号状态"""
+        self.chapter_spin.setEnabled(checked)
+        self.section_spin.setEnabled(checked)
+        
+    def auto_fill_chapter(self, value):
+        """自动填充章节"""
+        if self.auto_number.isChecked():
+            self.chapter_input.setText(f"第{value}章")
+            
+    def auto_fill_section(self, value):
+        """自动填充小节"""
+        if self.auto_number.isChecked():
+            chapter_num = self.chapter_spin.value()
+            self.section_input.setText(f"{chapter_num}.{value}")
+            
+    def auto_fill_chapter_text(self):
+        """手动填充章节"""
+        chapter_num = self.chapter_spin.value()
+        self.chapter_input.setText(f"第{chapter_num}章")
+        
+    def auto_fill_section_text(self):
+        """手动填充小节"""
+        chapter_num = self.chapter_spin.value()
+        section_num = self.section_spin.value()
+        self.section_input.setText(f"{chapter_num}.{section_num}")
+
+    def generate_slug(self, text):
+        """生成URL友好的slug"""
+        return generate_slug(text)
+
+def main(argv=None):
+    app = QApplication(sys.argv[:1] + list(argv or []))
+    
+    # 设置中文字体
+    font = QFont("Microsoft YaHei", 9)
+    app.setFont(font)
+    
+    manager = BlogManager()
+    manager.show()
+    return app.exec_()
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+图片优化 - 为 img/ 等目录中的图片生成多种宽度的压缩版本和 WebP
+在进程池中并行处理，输出文件名带内容哈希，可以长期缓存；
+清单 _data/images.json 记录源图哈希，未变化的图片下次运行直接跳过，
+页面通过 _includes/bg-image.html 按清单选用优化后的图片
+
+用法:
+    python images.py                # 增量处理
+    python images.py --full         # 忽略清单全部重新生成
+    python blog_manager.py images
+
+需要 Pillow：pip install Pillow
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import hashlib
+import importlib.util
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from core import DEFAULT_PROJECT_ROOT
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif')
+# 相对博客根目录
+SOURCE_DIRS = ('img', 'assets')
+OUTPUT_DIR = 'img/optimized'
+MANIFEST_FILE = '_data/images.json'
+
+WIDTHS = (640, 1280, 1920)
+JPEG_QUALITY = 82
+WEBP_QUALITY = 80
+# 参数变化后清单中的旧结果全部失效
+SETTINGS = f"{'/'.join(map(str, WIDTHS))};jpeg{JPEG_QUALITY};webp{WEBP_QUALITY}"
+
+
+def scan_images(root, source_dirs=SOURCE_DIRS, output_dir=OUTPUT_DIR):
+    """返回源图片的相对路径列表（/ 分隔），跳过输出目录"""
+    images = []
+    for source in source_dirs:
+        for current, dirs, files in os.walk(os.path.join(root, source)):
+            rel_dir = os.path.relpath(current, root).replace(os.sep, '/')
+            dirs[:] = sorted(d for d in dirs if f"{rel_dir}/{d}" != output_dir)
+            images.extend(f"{rel_dir}/{name}" for name in sorted(files)
+                          if name.lower().endswith(IMAGE_EXTENSIONS))
+    return images
+
+
+def file_digest(path):
+    """文件内容的 sha256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def encode(image, fmt):
+    """按输出格式压缩，返回字节串"""
+    buf = io.BytesIO()
+    if fmt == 'jpeg':
+        image.convert('RGB').save(buf, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+    elif fmt == 'png':
+        image.save(buf, 'PNG', optimize=True)
+    else:
+        image.save(buf, 'WEBP', quality=WEBP_QUALITY)
+    return buf.getvalue()
+
+
+def write_variant(root, output_dir, rel_path, width, fmt, data):
+    """以内容哈希命名写入优化后的图片，已存在时不重复写入，返回相对路径"""
+    stem = os.path.splitext(rel_path.rsplit('/', 1)[-1])[0]
+    ext = '.jpg' if fmt == 'jpeg' else '.' + fmt
+    name = f"{output_dir}/{stem}-{width}.{hashlib.sha256(data).hexdigest()[:10]}{ext}"
+    path = os.path.join(root, name)
+    if not os.path.exists(path):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    return name
+
+
+def optimize_image(job):
+    """进程池任务：生成一张图片的全部版本，返回 (相对路径, 清单条目, 错误信息)"""
+    root, rel_path, digest, output_dir = job
+    try:
+        return rel_path, _optimize(root, rel_path, digest, output_dir), None
+    except Exception as e:
+        return rel_path, None, str(e)
+
+
+def _optimize(root, rel_path, digest, output_dir):
+    from PIL import Image, ImageOps
+
+    source = os.path.join(root, rel_path)
+    original_bytes = os.path.getsize(source)
+    variants = []
+
+    def add(width, fmt, data):
+        # 与原图同宽却没有变小时直接引用原图
+        if width == size[0] and fmt != 'webp' and len(data) >= original_bytes:
+            variants.append({'width': width, 'format': fmt, 'file': rel_path, 'bytes': original_bytes})
+        else:
+            variants.append({'width': width, 'format': fmt, 'bytes': len(data),
+                             'file': write_variant(root, output_dir, rel_path, width, fmt, data)})
+
+    with Image.open(source) as image:
+        size = image.size
+        if getattr(image, 'is_animated', False):
+            # 动图只转换为同尺寸的动态 WebP，原图作为后备
+            buf = io.BytesIO()
+            image.save(buf, 'WEBP', save_all=True, quality=WEBP_QUALITY)
+            add(size[0], 'webp', buf.getvalue())
+            variants.append({'width': size[0], 'format': 'gif', 'file': rel_path, 'bytes': original_bytes})
+        else:
+            fmt = 'jpeg' if image.format == 'JPEG' else 'png'
+            image = ImageOps.exif_transpose(image)
+            size = image.size
+            widths = [w for w in WIDTHS if w < size[0]]
+            if size[0] <= WIDTHS[-1]:
+                widths.append(size[0])
+            for width in widths:
+                resized = image if width == size[0] else image.resize(
+                    (width, max(1, round(size[1] * width / size[0]))), Image.LANCZOS)
+                add(width, fmt, encode(resized, fmt))
+                add(width, 'webp', encode(resized, 'webp'))
+
+    return build_entry(digest, original_bytes, size, variants)
+
+
+def build_entry(digest, original_bytes, size, variants):
+    """组装清单条目，附带模板直接使用的 srcset 和大小两档图片"""
+    def of_format(webp):
+        """WebP 或原格式的全部尺寸，按宽度升序"""
+        return sorted((v for v in variants if (v['format'] == 'webp') == webp), key=lambda v: v['width'])
+
+    webp, fallback = of_format(True), of_format(False)
+    largest = max(v['width'] for v in variants)
+    best = min(v['bytes'] for v in variants if v['width'] == largest)
+    return {
+        'sha256': digest,
+        'settings': SETTINGS,
+        'bytes': original_bytes,
+        'width': size[0],
+        'height': size[1],
+        'saved': original_bytes - best,
+        'variants': variants,
+        'srcset': {
+            'webp': ', '.join(f"{v['file']} {v['width']}w" for v in webp),
+            'fallback': ', '.join(f"{v['file']} {v['width']}w" for v in fallback),
+        },
+        'large': {'webp': webp[-1]['file'], 'fallback': fallback[-1]['file']},
+        'small': {'webp': webp[0]['file'], 'fallback': fallback[0]['file']},
+    }
+
+
+def load_manifest(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def is_current(root, entry, digest):
+    """清单条目是否仍然有效：源图和参数未变，输出文件都还在"""
+    return (entry is not None and entry.get('sha256') == digest
+            and entry.get('settings') == SETTINGS
+            and all(os.path.exists(os.path.join(root, v['file'])) for v in entry['variants']))
+
+
+def run(root, workers=None, full=False, report=print):
+    """增量优化全部图片，返回 (处理张数, 跳过张数, 失败列表, 节省字节数)"""
+    manifest_path = os.path.join(root, MANIFEST_FILE)
+    manifest = {} if full else load_manifest(manifest_path)
+    os.makedirs(os.path.join(root, OUTPUT_DIR), exist_ok=True)
+
+    entries = {}
+    jobs = []
+    for rel_path in scan_images(root):
+        digest = file_digest(os.path.join(root, rel_path))
+        if is_current(root, manifest.get(rel_path), digest):
+            entries[rel_path] = manifest[rel_path]
+        else:
+            jobs.append((root, rel_path, digest, OUTPUT_DIR))
+
+    failures = []
+    if jobs:
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for rel_path, entry, error in executor.map(optimize_image, jobs):
+                if error:
+                    failures.append((rel_path, error))
+                    report(f"失败 {rel_path}: {error}")
+                    continue
+                entries[rel_path] = entry
+                report(f"{rel_path}: {entry['bytes'] / 1024:.0f} KB -> "
+                       f"{(entry['bytes'] - entry['saved']) / 1024:.0f} KB，"
+                       f"节省 {entry['saved'] / 1024:.0f} KB")
+
+    # 删除不再被清单引用的旧版本
+    referenced = {v['file'] for entry in entries.values() for v in entry['variants']}
+    output_path = os.path.join(root, OUTPUT_DIR)
+    for name in os.listdir(output_path):
+        if f"{OUTPUT_DIR}/{name}" not in referenced:
+            os.remove(os.path.join(output_path, name))
+
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(dict(sorted(entries.items())), f, ensure_ascii=False, indent=1)
+
+    processed = len(jobs) - len(failures)
+    return processed, len(entries) - processed, failures, sum(e['saved'] for e in entries.values())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='生成多种宽度和WebP格式的优化图片')
+    parser.add_argument('--root', default=DEFAULT_PROJECT_ROOT,
+                        help='博客根目录（默认为BlogManage的上级目录）')
+    parser.add_argument('--workers', type=int, default=None, help='进程数（默认为CPU核数）')
+    parser.add_argument('--full', action='store_true', help='忽略清单，全部重新生成')
+    args = parser.parse_args(argv)
+
+    if importlib.util.find_spec('PIL') is None:
+        print("需要安装 Pillow：pip install Pillow", file=sys.stderr)
+        return 1
+
+    start = time.perf_counter()
+    processed, skipped, failures, saved = run(args.root, args.workers, args.full)
+    elapsed = time.perf_counter() - start
+    print(f"处理 {processed} 张，跳过未变化的 {skipped} 张，失败 {len(failures)} 张，"
+          f"共节省 {saved / 1024 / 1024:.1f} MB，用时 {elapsed:.2f} 秒")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
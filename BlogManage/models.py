@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+界面数据模型 - 概览表与详情树
+概览表直接读取预先算好的统计行，视图只绘制可见行；
+详情树只在展开章节时才创建该章的小节节点
+"""
+
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PyQt5.QtWidgets import QTreeWidgetItem
+
+# 每次向视图追加的行数
+FETCH_BATCH = 500
+
+
+class BooksTableModel(QAbstractTableModel):
+    """书籍概览表模型：[(书籍名称, 章节数, 文章总数)]"""
+
+    HEADERS = ['书籍名称', '章节数', '文章总数']
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+        self._loaded = 0
+
+    def set_rows(self, rows):
+        """替换全部数据，视图按需分批取行"""
+        self.beginResetModel()
+        self._rows = rows
+        self._loaded = min(len(rows), FETCH_BATCH)
+        self.endResetModel()
+
+    def row_name(self, row):
+        """返回某行的书籍名称"""
+        return self._rows[row][0]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._loaded
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._loaded < len(self._rows)
+
+    def fetchMore(self, parent=QModelIndex()):
+        count = min(FETCH_BATCH, len(self._rows) - self._loaded)
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        value = self._rows[index.row()][index.column()]
+        return value if index.column() == 0 else str(value)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+
+class LazyTreeItem(QTreeWidgetItem):
+    """展开时才创建子节点的树节点，load_children 返回子节点文字列表"""
+
+    def __init__(self, text, load_children):
+        super().__init__([text])
+        self.load_children = load_children
+        self.setChildIndicatorPolicy(QTreeWidgetItem.ShowIndicator)
+
+    def populate(self):
+        """首次展开时创建子节点"""
+        if self.load_children is None:
+            return
+        children = self.load_children()
+        self.load_children = None
+        self.addChildren([QTreeWidgetItem([text]) for text in children])
+        if not children:
+            self.setChildIndicatorPolicy(QTreeWidgetItem.DontShowIndicatorWhenChildless)
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Slug 与固定链接 - 文章 slug、文件名和URL的唯一生成规则
+slug 计算带LRU缓存；PermalinkIndex 按 slug 和 URL 反查 _posts 中的文章，
+与 books.yml 的 slug/URL 索引一起在保存前 O(1) 发现会覆盖其他文章的冲突。
+reslug 一次遍历按当前规则重新命名 books.yml 中登记的全部文章；会改变已发布文章URL的重命名
+需要明确指定，并在头信息中加入 redirect_from 让旧URL跳转到新地址
+
+用法:
+    python permalinks.py              # 列出冲突和需要重新命名的文章
+    python permalinks.py --apply      # 只执行不改变URL的重命名，books.yml 只写一次
+    python permalinks.py --apply --rename-existing   # 同时重命名会改变URL的文章
+    python blog_manager.py permalinks
+"""
+
+import os
+import re
+import sys
+import argparse
+import urllib.parse
+from functools import lru_cache
+
+SLUG_STRIP_RE = re.compile(r'[^\w\s-]')
+SLUG_SEPARATOR_RE = re.compile(r'[-\s]+')
+FILENAME_RE = re.compile(r'^(\d{4})-(\d{2})-(\d{2})-(.+)$')
+DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}')
+
+
+class SlugConflictError(ValueError):
+    """文章的文件名或URL已被其他文章占用"""
+
+
+@lru_cache(maxsize=8192)
+def generate_slug(text):
+    """生成URL友好的slug"""
+    # 转换为小写，移除非字母数字字符，替换空格为连字符
+    slug = SLUG_STRIP_RE.sub('', text.lower())
+    slug = SLUG_SEPARATOR_RE.sub('-', slug).strip('-')
+    # 如果slug为空（标题全是标点等情况），使用原始文本的URL编码
+    if not slug:
+        slug = urllib.parse.quote(text)
+    return slug
+
+
+def permalink(date_str, title_slug):
+    """permalink: pretty 下文章的URL：/2025/08/17/slug/"""
+    return f"/{date_str.replace('-', '/')}/{title_slug}/"
+
+
+def post_slug(rel_path):
+    """文章slug：去掉目录和扩展名的文件名，与 books.yml 中的 slug 对应"""
+    return os.path.splitext(rel_path.rsplit('/', 1)[-1])[0]
+
+
+def front_matter_date(meta):
+    """头信息中的日期（YYYY-MM-DD），没有或格式不对时返回 None"""
+    value = str(meta.get('date') or '')
+    return value[:10] if DATE_RE.match(value) else None
+
+
+def post_url(rel_path, meta):
+    """按 permalink: pretty 规则推算 Jekyll 生成的文章URL"""
+    if meta.get('permalink'):
+        return meta['permalink']
+    match = FILENAME_RE.match(post_slug(rel_path))
+    if not match:
+        return None
+    year, month, day, title = match.groups()
+    date = front_matter_date(meta)
+    if date:
+        year, month, day = date.split('-')
+
+    categories = meta.get('categories') or meta.get('category') or []
+    if isinstance(categories, str):
+        categories = categories.split()
+    parts = [str(category).lower() for category in categories]
+    parts += [year, month, day, str(meta.get('slug') or title)]
+    return '/' + '/'.join(parts) + '/'
+
+
+def post_owner(meta):
+    """文章头信息对应的小节 (书籍, 章节, 小节名称)，不是本工具生成的文章返回 None"""
+    if not (meta.get('book') and meta.get('chapter') and meta.get('section') and meta.get('title')):
+        return None
+    return str(meta['book']), str(meta['chapter']), f"{meta['section']} {meta['title']}"
+
+
+def article_owner(article_data):
+    """文章数据对应的小节 (书籍, 章节, 小节名称)"""
+    return (article_data['book'], article_data['chapter'],
+            f"{article_data['section']} {article_data['title']}")
+
+
+class PermalinkIndex:
+    """_posts 的反向索引：slug、URL -> 文章路径集合"""
+
+    def __init__(self):
+        self.by_slug = {}
+        self.by_url = {}
+        # 相对路径 -> (头信息, slug, URL)
+        self._posts = {}
+        # 刚写入、文章索引还没有刷新到的文章
+        self._written = set()
+
+    def add_post(self, path, meta):
+        """登记或更新一篇文章"""
+        self.remove_post(path)
+        slug = post_slug(path)
+        url = post_url(path, meta)
+        self._posts[path] = (meta, slug, url)
+        self.by_slug.setdefault(slug, set()).add(path)
+        if url:
+            self.by_url.setdefault(url, set()).add(path)
+
+    def add_written(self, path, meta):
+        """登记刚写入的文章，文章索引刷新前同步时不会被移除"""
+        self.add_post(path, meta)
+        self._written.add(path)
+
+    def remove_post(self, path):
+        """移除一篇文章"""
+        entry = self._posts.pop(path, None)
+        if entry is None:
+            return
+        _, slug, url = entry
+        for table, key in ((self.by_slug, slug), (self.by_url, url)):
+            paths = table.get(key)
+            if paths is not None:
+                paths.discard(path)
+                if not paths:
+                    del table[key]
+
+    def sync(self, post_index):
+        """与文章索引同步：PostIndex 刷新时会替换变化文章的头信息对象，只需按对象比较"""
+        posts = post_index.posts
+        self._written.difference_update(posts)
+        for path in [path for path in self._posts if path not in posts and path not in self._written]:
+            self.remove_post(path)
+        for path, meta in posts.items():
+            entry = self._posts.get(path)
+            if entry is None or entry[0] is not meta:
+                self.add_post(path, meta)
+        return self
+
+    def find_slug(self, slug):
+        return self.by_slug.get(slug, set())
+
+    def find_url(self, url):
+        return self.by_url.get(url, set())
+
+    def meta(self, path):
+        entry = self._posts.get(path)
+        return entry[0] if entry else None
+
+    def conflicts(self, article_data, catalog=None, posts_dir=None):
+        """保存这篇文章会覆盖或冒用其他文章时，返回问题描述列表"""
+        owner = article_owner(article_data)
+        slug, url = article_data['slug'], article_data['url']
+        problems = []
+
+        if posts_dir is not None:
+            # 索引刷新之后才出现的同名文件
+            filename = article_data['filename']
+            if filename not in self._posts and os.path.exists(os.path.join(posts_dir, filename)):
+                from posts import read_front_matter
+                self.add_post(filename, read_front_matter(os.path.join(posts_dir, filename))[0])
+
+        for kind, paths in (('文件名', self.find_slug(slug)), ('URL', self.find_url(url))):
+            for path in sorted(paths):
+                if post_owner(self._posts[path][0]) != owner:
+                    problems.append(f"{kind}与文章 {path} 冲突")
+        if catalog is not None:
+            for kind, key in (('slug', catalog.find_slug(slug)), ('URL', catalog.find_url(url))):
+                if key is not None and key != owner:
+                    problems.append(f"{kind}已被小节 {' / '.join(key)} 使用")
+        return list(dict.fromkeys(problems))
+
+    def check(self, article_data, catalog=None, posts_dir=None):
+        """有冲突时抛出 SlugConflictError"""
+        problems = self.conflicts(article_data, catalog, posts_dir)
+        if problems:
+            raise SlugConflictError(f"{article_data['filename']}：" + '；'.join(problems))
+
+    def collisions(self):
+        """已经存在的冲突：[(类型, slug或URL, 文章路径列表)]"""
+        found = []
+        for kind, table in (('slug', self.by_slug), ('URL', self.by_url)):
+            found.extend((kind, key, sorted(paths)) for key, paths in table.items() if len(paths) > 1)
+        return sorted(found)
+
+
+def plan_reslug(catalog, index):
+    """按当前规则计算需要重命名的文章，一次遍历完成冲突检查
+
+    返回 (重命名列表, 问题列表)；重命名项为 (小节键, 原路径, 新路径, 新slug, 原URL, 新URL)
+    """
+    renames = []
+    problems = []
+    targets = {}
+    for key, section in catalog.iter_sections():
+        paths = sorted(index.find_slug(section.get('slug')))
+        if not paths:
+            continue
+        path = paths[0]
+        meta = index.meta(path)
+        match = FILENAME_RE.match(post_slug(path))
+        date = front_matter_date(meta) or (match and '-'.join(match.groups()[:3]))
+        if not (date and meta.get('title')):
+            continue
+        new_slug = f"{date}-{generate_slug(str(meta['title']))}"
+        if new_slug == section['slug']:
+            continue
+
+        directory, name = path.rsplit('/', 1) if '/' in path else ('', path)
+        new_path = (directory + '/' if directory else '') + new_slug + os.path.splitext(name)[1]
+        occupied = index.find_slug(new_slug) - {path}
+        if occupied:
+            problems.append(f"{path} -> {new_path}：与 {', '.join(sorted(occupied))} 冲突")
+        elif new_slug in targets:
+            problems.append(f"{path} -> {new_path}：与 {targets[new_slug]} 的新文件名相同")
+        else:
+            targets[new_slug] = path
+            renames.append((key, path, new_path, new_slug, post_url(path, meta), post_url(new_path, meta)))
+    return renames, problems
+
+
+def add_redirect(path, url):
+    """在文章头信息的 redirect_from 中加入旧URL，其余头信息原样保留；已有时不修改"""
+    from posts import read_front_matter
+    import yamlio
+
+    meta, offset = read_front_matter(path)
+    redirects = meta.get('redirect_from') or []
+    if isinstance(redirects, str):
+        redirects = [redirects]
+    if not offset or url in redirects:
+        return False
+    with open(path, 'rb') as f:
+        raw = f.read()
+    lines = raw[:offset].decode('utf-8').splitlines(keepends=True)
+    # 去掉原有的 redirect_from 键及其列表项，合并后追加在头信息末尾
+    kept = []
+    skipping = False
+    for line in lines[1:-1]:
+        if line.startswith('redirect_from:'):
+            skipping = True
+            continue
+        if skipping and line[:1] in (' ', '\t', '-'):
+            continue
+        skipping = False
+        kept.append(line)
+    if kept and not kept[-1].endswith('\n'):
+        kept[-1] += '\n'
+    head = lines[0] + ''.join(kept) + yamlio.dump({'redirect_from': redirects + [url]}) + lines[-1]
+    with open(path, 'wb') as f:
+        f.write(head.encode('utf-8') + raw[offset:])
+    return True
+
+
+def apply_reslug(catalog, posts_dir, renames, rename_existing=False):
+    """重命名文章文件并更新小节，全部完成后写回一次 books.yml，返回 (重命名篇数, 跳过的重命名)
+
+    改变URL的重命名会让外部链接和书签失效，只在 rename_existing 时执行，
+    并在新文件的头信息中加入 redirect_from: [原URL]
+    """
+    done = 0
+    skipped = []
+    for rename in renames:
+        (book, chapter, name), path, new_path, new_slug, old_url, new_url = rename
+        moved = old_url != new_url
+        if moved and not rename_existing:
+            skipped.append(rename)
+            continue
+        target = os.path.join(posts_dir, new_path)
+        os.rename(os.path.join(posts_dir, path), target)
+        if moved and old_url:
+            add_redirect(target, old_url)
+        catalog.upsert_section(book, chapter, name, new_slug, new_url)
+        done += 1
+    if done:
+        catalog.save()
+    return done, skipped
+
+
+def main(argv=None):
+    from core import BlogProject
+
+    parser = argparse.ArgumentParser(description='检查文章slug冲突，按统一规则批量重新命名')
+    parser.add_argument('--root', default=None, help='博客根目录（默认为BlogManage的上级目录）')
+    parser.add_argument('--apply', action='store_true', help='执行不改变URL的重命名')
+    parser.add_argument('--rename-existing', action='store_true',
+                        help='同时重命名会改变URL的文章，旧URL写入 redirect_from')
+    args = parser.parse_args(argv)
+
+    project = BlogProject(args.root).load()
+    index = project.permalinks
+
+    collisions = index.collisions()
+    for kind, key, paths in collisions:
+        print(f"[{kind}冲突] {key}：{', '.join(paths)}")
+
+    renames, problems = plan_reslug(project.catalog, index)
+    for _, path, new_path, _, old_url, new_url in renames:
+        moved = f"（URL {old_url} -> {new_url}）" if old_url != new_url else ''
+        print(f"[重命名] {path} -> {new_path}{moved}")
+    for problem in problems:
+        print(f"[无法重命名] {problem}")
+    print(f"冲突 {len(collisions)} 处，需要重命名 {len(renames)} 篇，无法重命名 {len(problems)} 篇")
+
+    if args.apply and renames:
+        count, skipped = apply_reslug(project.catalog, project.posts_dir, renames, args.rename_existing)
+        if skipped:
+            print(f"跳过 {len(skipped)} 篇会改变URL的文章，确认后加 --rename-existing 重命名（旧URL写入 redirect_from）")
+        print(f"已重命名 {count} 篇{'，books.yml 已更新' if count else ''}")
+    return 1 if collisions or problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文章索引 - _posts 头信息的持久化缓存
+只解析每篇文章的YAML头信息，按 (路径, mtime, 大小) 判断是否变化，
+刷新时只重新解析改动过的文件
+
+用法:
+    python post_index.py            # 刷新索引并输出统计
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+
+from posts import read_front_matter
+
+POST_EXTENSIONS = ('.md', '.markdown')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    front_matter TEXT NOT NULL
+)
+"""
+
+
+def scan_posts(posts_dir):
+    """递归扫描 _posts，返回 {相对路径: (mtime_ns, 大小)}"""
+    stats = {}
+    pending = [(posts_dir, '')]
+    while pending:
+        current, prefix = pending.pop()
+        try:
+            entries = os.scandir(current)
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append((entry.path, prefix + entry.name + '/'))
+                elif entry.name.endswith(POST_EXTENSIONS):
+                    st = entry.stat()
+                    stats[prefix + entry.name] = (st.st_mtime_ns, st.st_size)
+    return stats
+
+
+class PostIndex:
+    """_posts 头信息索引，持久化在 SQLite 中"""
+
+    def __init__(self, posts_dir, cache_file):
+        self.posts_dir = posts_dir
+        self.cache_file = cache_file
+        self.posts = {}
+        self._stats = {}
+        self._conn = None
+
+    def _connect(self):
+        """打开缓存数据库并载入已有索引"""
+        if self._conn is not None:
+            return self._conn
+        os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+        # 调用方保证串行访问；后台线程池和监视线程可能在不同线程中刷新
+        self._conn = sqlite3.connect(self.cache_file, check_same_thread=False)
+        self._conn.execute(SCHEMA)
+        for path, mtime_ns, size, front_matter in self._conn.execute(
+                'SELECT path, mtime_ns, size, front_matter FROM posts'):
+            self._stats[path] = (mtime_ns, size)
+            self.posts[path] = json.loads(front_matter)
+        return self._conn
+
+    def refresh(self):
+        """增量刷新索引，返回 (变化的路径, 删除的路径)"""
+        conn = self._connect()
+        current = scan_posts(self.posts_dir)
+
+        changed = [path for path, stat in current.items() if self._stats.get(path) != stat]
+        removed = [path for path in self._stats if path not in current]
+
+        rows = []
+        for path in changed:
+            try:
+                meta = read_front_matter(os.path.join(self.posts_dir, path))[0]
+            except Exception:
+                # 头信息格式错误时按空头信息记录，避免每次刷新都重试
+                meta = {}
+            # 日期等非JSON类型统一存为字符串
+            front_matter = json.dumps(meta, ensure_ascii=False, default=str)
+            self.posts[path] = json.loads(front_matter)
+            self._stats[path] = current[path]
+            rows.append((path, current[path][0], current[path][1], front_matter))
+
+        for path in removed:
+            del self.posts[path]
+            del self._stats[path]
+
+        if rows or removed:
+            with conn:
+                conn.executemany('INSERT OR REPLACE INTO posts VALUES (?, ?, ?, ?)', rows)
+                conn.executemany('DELETE FROM posts WHERE path = ?', [(path,) for path in removed])
+        return changed, removed
+
+    def get(self, rel_path):
+        """返回单篇文章的头信息"""
+        return self.posts.get(rel_path)
+
+    def items(self):
+        """返回 (相对路径, 头信息) 列表"""
+        return self.posts.items()
+
+    def stats(self):
+        """返回上次刷新时的 {相对路径: (mtime_ns, 大小)}"""
+        return self._stats
+
+    def close(self):
+        """关闭缓存数据库"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def main(argv=None):
+    from core import BlogProject
+
+    parser = argparse.ArgumentParser(description='刷新 _posts 头信息索引')
+    parser.add_argument('--root', default=None, help='博客根目录（默认为BlogManage的上级目录）')
+    args = parser.parse_args(argv)
+
+    project = BlogProject(args.root)
+    start = time.perf_counter()
+    changed, removed = project.post_index.refresh()
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"共 {len(project.post_index.posts)} 篇文章，重新解析 {len(changed)} 篇，"
+          f"移除 {len(removed)} 篇，用时 {elapsed:.1f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+全文搜索 - _posts 正文和头信息的本地 SQLite FTS5 索引，供管理界面查找文章
+分词与站内搜索索引相同（search_index.tokenize）：英文数字按单词，中日韩文字按二元组，
+切好的词项以空格连接后写入 FTS5；结果按 bm25 排序，标题、头信息加权，
+摘要从原文截取并标出查询词。按 (路径, mtime, 大小) 增量更新，保存文章时只重建该篇
+
+用法:
+    python post_search.py GPIO 寄存器        # 增量更新索引后搜索
+    python post_search.py --rebuild NVIC      # 全量重建后搜索
+    python blog_manager.py find EXTI
+"""
+
+import os
+import re
+import sys
+import html
+import time
+import sqlite3
+import argparse
+
+from permalinks import post_url
+from post_index import scan_posts
+from posts import read_body, read_front_matter
+from search_index import TOKEN_RE, tokenize
+
+# 索引结构版本，变化时自动重建
+SCHEMA_VERSION = 1
+# bm25 列权重：标题、头信息（副标题、标签、书籍、章节、描述）、正文
+COLUMN_WEIGHTS = (5.0, 3.0, 1.0)
+SNIPPET_WIDTH = 80
+WHITESPACE_RE = re.compile(r'\s+')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    url TEXT NOT NULL,
+    date TEXT NOT NULL,
+    body TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS post_fts USING fts5(
+    title, meta, body, tokenize = "unicode61 tokenchars '_'"
+);
+"""
+
+
+def index_text(text):
+    """切分后以空格连接的词项，FTS5 按空格切分即得到同样的词项"""
+    return ' '.join(tokenize(text))
+
+
+def match_expression(query):
+    """把用户输入转换为 FTS5 查询：每个词的词项组成短语，各短语同时出现
+
+    单个中日韩文字不会单独出现在索引中，按前缀匹配以它开头的二元组；
+    输入未以空格结尾时最后一个词项也按前缀匹配，边输入边搜索
+    """
+    phrases = []
+    words = query.split()
+    for index, word in enumerate(words):
+        tokens = tokenize(word)
+        if not tokens:
+            continue
+        phrase = '"' + ' '.join(tokens) + '"'
+        last = tokens[-1]
+        is_last = index == len(words) - 1 and not query[-1:].isspace()
+        if (len(last) == 1 and last >= '\u3040') or (is_last and last < '\u3040'):
+            phrase += ' *'
+        phrases.append(phrase)
+    return ' AND '.join(phrases)
+
+
+def make_snippet(text, words, width=SNIPPET_WIDTH):
+    """从原文中截取第一个查询词附近的一段，查询词加粗，返回HTML"""
+    text = WHITESPACE_RE.sub(' ', text).strip()
+    lowered = text.lower()
+    positions = [lowered.find(word) for word in words]
+    positions = [position for position in positions if position >= 0]
+    start = max(0, min(positions) - width // 3) if positions else 0
+    snippet = text[start:start + width]
+
+    pieces = []
+    if words:
+        pattern = re.compile('|'.join(re.escape(word) for word in sorted(words, key=len, reverse=True)),
+                             re.I)
+        last = 0
+        for match in pattern.finditer(snippet):
+            pieces.append(html.escape(snippet[last:match.start()]))
+            pieces.append(f'<b>{html.escape(match.group())}</b>')
+            last = match.end()
+        pieces.append(html.escape(snippet[last:]))
+    else:
+        pieces.append(html.escape(snippet))
+    return ('…' if start else '') + ''.join(pieces) + ('…' if start + width < len(text) else '')
+
+
+def query_words(query):
+    """用于在原文中定位和加粗的查询词：英文数字和中日韩文字连续片段"""
+    return list(dict.fromkeys(TOKEN_RE.findall(query.lower())))
+
+
+class PostSearch:
+    """_posts 的全文搜索索引，持久化在 SQLite FTS5 中"""
+
+    def __init__(self, posts_dir, cache_file):
+        self.posts_dir = posts_dir
+        self.cache_file = cache_file
+        self._stats = {}
+        self._conn = None
+
+    def _connect(self):
+        """打开索引数据库，结构版本不符时清空重建"""
+        if self._conn is not None:
+            return self._conn
+        os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+        # 调用方保证串行访问：界面的查询和更新都在后台任务队列中执行
+        conn = sqlite3.connect(self.cache_file, check_same_thread=False)
+        if conn.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION:
+            with conn:
+                conn.execute('DROP TABLE IF EXISTS docs')
+                conn.execute('DROP TABLE IF EXISTS post_fts')
+        try:
+            conn.executescript(SCHEMA)
+        except sqlite3.OperationalError as e:
+            conn.close()
+            raise RuntimeError(f"当前 SQLite 不支持 FTS5 全文索引：{e}")
+        conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        self._stats = {path: (mtime_ns, size) for path, mtime_ns, size in
+                       conn.execute('SELECT path, mtime_ns, size FROM docs')}
+        self._conn = conn
+        return conn
+
+    def __len__(self):
+        self._connect()
+        return len(self._stats)
+
+    def _index_post(self, conn, path, stat):
+        """重新索引一篇文章"""
+        filepath = os.path.join(self.posts_dir, path)
+        try:
+            meta, offset = read_front_matter(filepath)
+            body = read_body(filepath, offset)
+        except Exception:
+            # 头信息格式错误时按空头信息记录，避免每次刷新都重试
+            meta, body = {}, ''
+        tags = meta.get('tags') or []
+        if isinstance(tags, str):
+            tags = [tags]
+        title = str(meta.get('title') or '')
+        extra = ' '.join(str(value) for value in [meta.get('subtitle'), meta.get('book'), meta.get('chapter'),
+                                                  meta.get('description')] + list(tags) if value)
+
+        self._remove_post(conn, path)
+        doc_id = conn.execute(
+            'INSERT INTO docs (path, mtime_ns, size, title, url, date, body) VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (path, stat[0], stat[1], title, post_url(path, meta) or '',
+             str(meta.get('date') or path[:10]), body)).lastrowid
+        conn.execute('INSERT INTO post_fts (rowid, title, meta, body) VALUES (?, ?, ?, ?)',
+                     (doc_id, index_text(title), index_text(extra), index_text(body)))
+        self._stats[path] = stat
+
+    def _remove_post(self, conn, path):
+        row = conn.execute('SELECT id FROM docs WHERE path = ?', (path,)).fetchone()
+        if row is not None:
+            conn.execute('DELETE FROM post_fts WHERE rowid = ?', row)
+            conn.execute('DELETE FROM docs WHERE id = ?', row)
+        self._stats.pop(path, None)
+
+    def refresh(self, full=False):
+        """增量更新索引，返回 (重新索引的路径, 删除的路径)"""
+        conn = self._connect()
+        current = scan_posts(self.posts_dir)
+        if full:
+            with conn:
+                conn.execute('DELETE FROM docs')
+                conn.execute('DELETE FROM post_fts')
+            self._stats = {}
+        changed = [path for path, stat in current.items() if self._stats.get(path) != stat]
+        removed = [path for path in self._stats if path not in current]
+        if changed or removed:
+            with conn:
+                for path in removed:
+                    self._remove_post(conn, path)
+                for path in changed:
+                    self._index_post(conn, path, current[path])
+        return changed, removed
+
+    def update_post(self, rel_path):
+        """保存文章后只重新索引这一篇；文件已不存在时从索引中移除"""
+        conn = self._connect()
+        try:
+            st = os.stat(os.path.join(self.posts_dir, rel_path))
+        except FileNotFoundError:
+            with conn:
+                self._remove_post(conn, rel_path)
+            return
+        with conn:
+            self._index_post(conn, rel_path, (st.st_mtime_ns, st.st_size))
+
+    def search(self, query, limit=20):
+        """按相关度返回 [{'path', 'title', 'url', 'date', 'snippet', 'score'}]"""
+        expression = match_expression(query)
+        if not expression:
+            return []
+        conn = self._connect()
+        # 先在全文索引中排序取前 limit 条，再读取这些文章的原文生成摘要
+        ranked = conn.execute(
+            'SELECT rowid, bm25(post_fts, ?, ?, ?) AS score FROM post_fts '
+            'WHERE post_fts MATCH ? ORDER BY score LIMIT ?',
+            COLUMN_WEIGHTS + (expression, limit)).fetchall()
+        words = query_words(query)
+        results = []
+        for doc_id, score in ranked:
+            path, title, url, date, body = conn.execute(
+                'SELECT path, title, url, date, body FROM docs WHERE id = ?', (doc_id,)).fetchone()
+            results.append({
+                'path': path,
+                'title': title,
+                'url': url,
+                'date': date,
+                'snippet': make_snippet(body, words),
+                'score': -score,
+            })
+        return results
+
+    def close(self):
+        """关闭索引数据库"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def main(argv=None):
+    from core import BlogProject
+
+    parser = argparse.ArgumentParser(description='在 _posts 中全文搜索')
+    parser.add_argument('query', nargs='+', help='查询词，多个词同时出现')
+    parser.add_argument('--root', default=None, help='博客根目录（默认为BlogManage的上级目录）')
+    parser.add_argument('--limit', type=int, default=20, help='最多显示的结果数')
+    parser.add_argument('--rebuild', action='store_true', help='全量重建索引')
+    args = parser.parse_args(argv)
+
+    project = BlogProject(args.root)
+    start = time.perf_counter()
+    changed, removed = project.post_search.refresh(full=args.rebuild)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"索引 {len(project.post_search)} 篇文章：重新索引 {len(changed)} 篇，"
+          f"移除 {len(removed)} 篇，用时 {elapsed:.1f} ms")
+
+    query = ' '.join(args.query)
+    start = time.perf_counter()
+    results = project.post_search.search(query, args.limit)
+    elapsed = (time.perf_counter() - start) * 1000
+    for result in results:
+        snippet = re.sub(r'</?b>', '', html.unescape(result['snippet']))
+        print(f"{result['score']:6.2f}  {result['path']}  {result['title']}\n        {snippet}")
+    print(f"找到 {len(results)} 条结果，查询用时 {elapsed:.1f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
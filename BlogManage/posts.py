@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文章生成 - 文章数据与文件写入
+供图形界面和批量导入共用，不依赖PyQt；slug 与URL规则见 permalinks.py，
+文件内容由 rendering.render_post 渲染
+"""
+
+import os
+from datetime import datetime
+
+import yamlio
+from permalinks import generate_slug, permalink
+from rendering import render_post
+
+
+def build_article_data(book, chapter, section, title, tags='', description='',
+                       content='', subtitle='', date=None, template=''):
+    """生成保存文章所需的数据（slug、URL、文件名）"""
+    # 生成日期字符串
+    date_str = (date or datetime.now()).strftime("%Y-%m-%d")
+
+    # 生成标题slug，与文件名使用同一规则
+    title_slug = generate_slug(title)
+
+    # 生成完整slug
+    full_slug = f"{date_str}-{title_slug}"
+
+    article_data = {
+        'book': book,
+        'chapter': chapter,
+        'section': section,
+        'title': title,
+        'slug': full_slug,
+        # 生成URL路径
+        'url': permalink(date_str, title_slug),
+        'tags': tags,
+        'description': description,
+        'content': content,
+        'date': date_str,
+        'filename': f"{full_slug}.md"
+    }
+    if subtitle:
+        article_data['subtitle'] = subtitle
+    if template:
+        article_data['template'] = template
+    return article_data
+
+
+def post_filename(article_data):
+    """文章文件名格式：2025-08-17-STM32-GPIO-configuration.md"""
+    return f"{article_data['date']}-{generate_slug(article_data['title'])}.md"
+
+
+def write_post(posts_dir, article_data):
+    """将文章写入 _posts 目录，返回文件路径"""
+    filepath = os.path.join(posts_dir, post_filename(article_data))
+    with open(filepath, 'w', encoding='utf-8') as f:
+        f.write(render_post(article_data))
+    return filepath
+
+
+def read_front_matter(path):
+    """只读取文章的YAML头信息，返回 (头信息, 正文起始偏移)"""
+    with open(path, 'rb') as f:
+        first = f.readline()
+        if first.strip() != b'---':
+            return {}, 0
+
+        lines = []
+        for line in f:
+            if line.strip() == b'---':
+                break
+            lines.append(line)
+        else:
+            # 没有结束分隔符，不视为头信息
+            return {}, 0
+        offset = f.tell()
+
+    meta = yamlio.safe_load(b''.join(lines).decode('utf-8')) or {}
+    if not isinstance(meta, dict):
+        meta = {}
+    return meta, offset
+
+
+def read_body(path, offset=0):
+    """从偏移处读取文章正文"""
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        return f.read().decode('utf-8')
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Service Worker 预缓存清单 - 在 jekyll build 之后运行
+读取 sw.js 中的 PRECACHE_LIST，在构建结果中找到对应文件并行计算内容哈希，
+把带版本号的清单写入 _site/sw.js；浏览器只重新下载哈希变化的文件。
+找不到或体积过大的条目会列出来，找不到的条目不写入清单
+
+用法:
+    python precache.py                  # 处理 <博客根目录>/_site
+    python precache.py --site _site --max-kb 300 --strict
+"""
+
+import os
+import re
+import sys
+import json
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from core import DEFAULT_PROJECT_ROOT
+
+PRECACHE_LIST_RE = re.compile(r'^const PRECACHE_LIST = \[(.*?)^\]', re.M | re.S)
+# 只取未被注释掉的条目
+PRECACHE_ENTRY_RE = re.compile(r'^\s*"([^"]+)"', re.M)
+MANIFEST_LINE_RE = re.compile(r'^const PRECACHE_MANIFEST = .*$', re.M)
+IMAGES_MANIFEST = os.path.join('_data', 'images.json')
+
+MAX_ENTRY_KB = 500
+
+
+def read_precache_list(sw_source):
+    """解析 sw.js 中的 PRECACHE_LIST"""
+    match = PRECACHE_LIST_RE.search(sw_source)
+    if match is None:
+        raise ValueError('sw.js 中没有找到 PRECACHE_LIST')
+    return PRECACHE_ENTRY_RE.findall(match.group(1))
+
+
+def load_image_variants(project_root):
+    """images.py 生成的清单：源图 -> 页面实际加载的大图版本"""
+    try:
+        with open(os.path.join(project_root, IMAGES_MANIFEST), 'r', encoding='utf-8') as f:
+            images = json.load(f)
+    except FileNotFoundError:
+        return {}
+    return {src: sorted(set(entry['large'].values())) for src, entry in images.items()}
+
+
+def expand_images(urls, image_variants):
+    """页面已改用优化图片时，预缓存优化后的版本而不是原图"""
+    expanded = []
+    for url in urls:
+        variants = image_variants.get(url[2:] if url.startswith('./') else url)
+        if variants:
+            expanded.extend(f"./{variant}" for variant in variants)
+        else:
+            expanded.append(url)
+    return list(dict.fromkeys(expanded))
+
+
+def resolve(site_dir, url):
+    """把站内相对URL对应到构建目录中的文件；站外URL返回 None"""
+    if url.startswith(('//', 'http:', 'https:')):
+        return None
+    path = url[2:] if url.startswith('./') else url.lstrip('/')
+    path = path.split('?', 1)[0].split('#', 1)[0]
+    if path == '' or path.endswith('/'):
+        path += 'index.html'
+    return os.path.join(site_dir, *path.split('/'))
+
+
+def hash_file(path):
+    """返回 (内容哈希前16位, 字节数)；文件不存在时返回 None"""
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+                size += len(chunk)
+    except (FileNotFoundError, IsADirectoryError):
+        return None
+    return digest.hexdigest()[:16], size
+
+
+def build_manifest(site_dir, urls, max_bytes=MAX_ENTRY_KB * 1024, workers=None):
+    """并行计算各条目的哈希，返回 (清单, [(URL, 问题说明)])"""
+    paths = [resolve(site_dir, url) for url in urls]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(lambda path: path and hash_file(path), paths))
+
+    entries = []
+    problems = []
+    total = 0
+    for url, path, result in zip(urls, paths, results):
+        if path is None:
+            problems.append((url, '站外地址，无法计算哈希，未加入清单'))
+        elif result is None:
+            problems.append((url, '构建结果中不存在，未加入清单'))
+        else:
+            revision, size = result
+            if size > max_bytes:
+                problems.append((url, f'体积过大（{size / 1024:.0f} KB）'))
+            entries.append([url, revision])
+            total += size
+
+    version = hashlib.sha256(json.dumps(entries).encode('utf-8')).hexdigest()[:12]
+    return {'version': version, 'bytes': total, 'entries': entries}, problems
+
+
+def write_service_worker(sw_path, manifest):
+    """把清单写入构建结果中的 sw.js"""
+    with open(sw_path, 'r', encoding='utf-8') as f:
+        source = f.read()
+    line = 'const PRECACHE_MANIFEST = ' + json.dumps(manifest, ensure_ascii=False)
+    source, count = MANIFEST_LINE_RE.subn(lambda _: line, source)
+    if count != 1:
+        raise ValueError(f'{sw_path} 中没有找到 PRECACHE_MANIFEST')
+    with open(sw_path, 'w', encoding='utf-8') as f:
+        f.write(source)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='为 sw.js 生成带内容哈希的预缓存清单')
+    parser.add_argument('--root', default=DEFAULT_PROJECT_ROOT,
+                        help='博客根目录（默认为BlogManage的上级目录）')
+    parser.add_argument('--site', default=None, help='jekyll build 的输出目录（默认为 <root>/_site）')
+    parser.add_argument('--max-kb', type=int, default=MAX_ENTRY_KB, help='单个条目的体积上限（KB）')
+    parser.add_argument('--strict', action='store_true', help='有问题条目时返回非零退出码')
+    args = parser.parse_args(argv)
+
+    site_dir = args.site or os.path.join(args.root, '_site')
+    sw_path = os.path.join(site_dir, 'sw.js')
+    try:
+        with open(sw_path, 'r', encoding='utf-8') as f:
+            urls = read_precache_list(f.read())
+    except (OSError, ValueError) as e:
+        print(f"读取 sw.js 失败：{e}（请先运行 jekyll build）", file=sys.stderr)
+        return 1
+
+    urls = expand_images(urls, load_image_variants(args.root))
+    manifest, problems = build_manifest(site_dir, urls, args.max_kb * 1024)
+    write_service_worker(sw_path, manifest)
+
+    for url, reason in problems:
+        print(f"警告 {url}: {reason}")
+    print(f"预缓存 {len(manifest['entries'])} 个文件，共 {manifest['bytes'] / 1024:.0f} KB，"
+          f"版本 {manifest['version']}")
+    return 1 if problems and args.strict else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Markdown 预览 - 按块增量渲染
+正文按空行切分为块（围栏代码块整体算一块），每块的HTML按原文缓存，
+编辑时只有改动过的块重新渲染，代码块的语法高亮也随块缓存。
+安装了 python-markdown 时用它转换普通块，否则使用内置的简化转换；
+代码高亮使用 Pygments（未安装时按纯文本显示）
+"""
+
+import re
+import html
+
+FENCE_RE = re.compile(r'^ {0,3}(`{3,}|~{3,})\s*([\w+#.-]*)')
+HEADING_RE = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+HR_RE = re.compile(r'^ {0,3}([-*_])( *\1){2,} *$')
+LIST_RE = re.compile(r'^( *)([-*+]|\d+[.)])\s+(.*)$')
+SETEXT_RE = re.compile(r'^ {0,3}(=+|-+)\s*$')
+TABLE_SEP_RE = re.compile(r'^\s*\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?\s*$')
+
+# 行内语法，按顺序替换；代码片段先取出，避免其中的符号被当成强调
+CODE_SPAN_RE = re.compile(r'(`+)(.+?)\1')
+INLINE_RULES = [
+    (re.compile(r'!\[([^\]]*)\]\(([^)\s]+)(?:\s+&quot;[^)]*&quot;)?\)'), r'<img src="\2" alt="\1">'),
+    (re.compile(r'\[([^\]]+)\]\(([^)\s]+)(?:\s+&quot;[^)]*&quot;)?\)'), r'<a href="\2">\1</a>'),
+    (re.compile(r'&lt;(https?://[^\s&]+)&gt;'), r'<a href="\1">\1</a>'),
+    (re.compile(r'(\*\*|__)(?=\S)(.+?)(?<=\S)\1'), r'<strong>\2</strong>'),
+    (re.compile(r'(?<![\w*])\*(?=\S)(.+?)(?<=\S)\*(?!\*)'), r'<em>\1</em>'),
+    (re.compile(r'(?<![\w_])_(?=\S)(.+?)(?<=\S)_(?![\w_])'), r'<em>\1</em>'),
+    (re.compile(r'~~(?=\S)(.+?)(?<=\S)~~'), r'<del>\1</del>'),
+]
+
+
+def split_blocks(text):
+    """把正文切分为块：围栏代码块整体为一块，其余按空行切分"""
+    blocks = []
+    current = []
+    fence = None
+    for line in text.split('\n'):
+        if fence is not None:
+            current.append(line)
+            if line.strip().startswith(fence) and not line.strip().strip(fence[0]):
+                blocks.append('\n'.join(current))
+                current = []
+                fence = None
+            continue
+        match = FENCE_RE.match(line)
+        if match:
+            if current:
+                blocks.append('\n'.join(current))
+            current = [line]
+            fence = match.group(1)
+        elif line.strip():
+            current.append(line)
+        elif current:
+            blocks.append('\n'.join(current))
+            current = []
+    if current:
+        blocks.append('\n'.join(current))
+    return blocks
+
+
+def render_inline(text):
+    """行内元素：转义HTML后处理代码、链接、图片和强调"""
+    spans = []
+
+    def stash(match):
+        spans.append(f"<code>{html.escape(match.group(2).strip(), quote=False)}</code>")
+        return f"\x00{len(spans) - 1}\x00"
+
+    text = CODE_SPAN_RE.sub(stash, text)
+    text = html.escape(text)
+    for pattern, replacement in INLINE_RULES:
+        text = pattern.sub(replacement, text)
+    # 行尾两个空格或反斜杠为强制换行
+    text = re.sub(r'(?: {2,}|\\)\n', '<br>\n', text)
+    return re.sub(r'\x00(\d+)\x00', lambda m: spans[int(m.group(1))], text)
+
+
+def highlight_code(code, lang):
+    """代码块语法高亮，使用内联样式以便 QTextEdit 直接显示"""
+    try:
+        from pygments import highlight
+        from pygments.formatters import HtmlFormatter
+        from pygments.lexers import get_lexer_by_name
+        from pygments.util import ClassNotFound
+    except ImportError:
+        return f"<pre><code>{html.escape(code)}</code></pre>"
+    try:
+        lexer = get_lexer_by_name(lang) if lang else None
+    except ClassNotFound:
+        lexer = None
+    if lexer is None:
+        return f"<pre><code>{html.escape(code)}</code></pre>"
+    return highlight(code, lexer, HtmlFormatter(noclasses=True, nobackground=True))
+
+
+def render_table(lines):
+    """管道表格：第一行表头，第二行分隔线"""
+    def cells(line):
+        line = line.strip()
+        if line.startswith('|'):
+            line = line[1:]
+        if line.endswith('|'):
+            line = line[:-1]
+        return [cell.strip() for cell in line.split('|')]
+
+    rows = ['<tr>' + ''.join(f"<th>{render_inline(c)}</th>" for c in cells(lines[0])) + '</tr>']
+    for line in lines[2:]:
+        rows.append('<tr>' + ''.join(f"<td>{render_inline(c)}</td>" for c in cells(line)) + '</tr>')
+    return '<table border="1" cellspacing="0" cellpadding="4">' + ''.join(rows) + '</table>'
+
+
+def render_list(lines):
+    """列表（按缩进嵌套），续行并入上一项"""
+    out = []
+    stack = []  # (缩进, 标签)
+    for line in lines:
+        match = LIST_RE.match(line)
+        if not match:
+            if out:
+                out[-1] += ' ' + render_inline(line.strip())
+            continue
+        indent, marker, item = len(match.group(1)), match.group(2), match.group(3)
+        tag = 'ol' if marker[0].isdigit() else 'ul'
+        while stack and indent < stack[-1][0]:
+            out.append(f"</li></{stack.pop()[1]}>")
+        if not stack or indent > stack[-1][0]:
+            stack.append((indent, tag))
+            out.append(f"<{tag}><li>{render_inline(item)}")
+        else:
+            out.append(f"</li><li>{render_inline(item)}")
+    while stack:
+        out.append(f"</li></{stack.pop()[1]}>")
+    return ''.join(out)
+
+
+def render_simple(block):
+    """内置的简化 Markdown 转换，覆盖标题、段落、列表、引用、表格、缩进代码和分隔线"""
+    lines = block.split('\n')
+    out = []
+    paragraph = []
+
+    def flush():
+        if paragraph:
+            out.append(f"<p>{render_inline(chr(10).join(paragraph))}</p>")
+            paragraph.clear()
+
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        heading = HEADING_RE.match(line)
+        setext = paragraph and SETEXT_RE.match(line)
+        if heading:
+            flush()
+            level = len(heading.group(1))
+            out.append(f"<h{level}>{render_inline(heading.group(2))}</h{level}>")
+        elif setext:
+            # 上一行文字加 === 或 --- 下划线的标题
+            level = 1 if setext.group(1)[0] == '=' else 2
+            out.append(f"<h{level}>{render_inline(chr(10).join(paragraph))}</h{level}>")
+            paragraph.clear()
+        elif not paragraph and line.startswith(('    ', '\t')):
+            # 缩进4格的代码块
+            code = []
+            while i < len(lines) and (lines[i].startswith(('    ', '\t')) or not lines[i].strip()):
+                code.append(lines[i][4:] if lines[i].startswith('    ') else lines[i][1:])
+                i += 1
+            out.append(f"<pre><code>{html.escape(chr(10).join(code))}</code></pre>")
+            continue
+        elif HR_RE.match(line):
+            flush()
+            out.append('<hr>')
+        elif line.lstrip().startswith('>'):
+            flush()
+            quoted = []
+            while i < len(lines) and lines[i].lstrip().startswith('>'):
+                quoted.append(re.sub(r'^\s*> ?', '', lines[i]))
+                i += 1
+            out.append(f"<blockquote>{render_simple(chr(10).join(quoted))}</blockquote>")
+            continue
+        elif '|' in line and i + 1 < len(lines) and TABLE_SEP_RE.match(lines[i + 1]):
+            flush()
+            rows = []
+            while i < len(lines) and '|' in lines[i]:
+                rows.append(lines[i])
+                i += 1
+            out.append(render_table(rows))
+            continue
+        elif LIST_RE.match(line) and not HR_RE.match(line):
+            flush()
+            items = []
+            while i < len(lines) and (LIST_RE.match(lines[i]) or (items and lines[i].startswith(' '))):
+                items.append(lines[i])
+                i += 1
+            out.append(render_list(items))
+            continue
+        elif line.lstrip().startswith('<'):
+            # HTML 原样输出
+            flush()
+            out.append(line)
+        else:
+            paragraph.append(line)
+        i += 1
+    flush()
+    return '\n'.join(out)
+
+
+def markdown_converter():
+    """返回普通块的转换函数：优先使用 python-markdown"""
+    try:
+        import markdown
+    except ImportError:
+        return render_simple
+    md = markdown.Markdown(extensions=['tables', 'sane_lists'])
+
+    def convert(block):
+        md.reset()
+        return md.convert(block)
+    return convert
+
+
+class MarkdownPreview:
+    """增量 Markdown 渲染器：相同原文的块直接复用上次的HTML"""
+
+    def __init__(self, convert=None):
+        self.convert = convert or markdown_converter()
+        self._cache = {}
+        self.blocks = []
+        self.rendered = 0
+
+    def render_block(self, block):
+        """渲染单个块"""
+        fence = FENCE_RE.match(block)
+        if fence:
+            lines = block.split('\n')
+            end = -1 if len(lines) > 1 and lines[-1].strip().startswith(fence.group(1)) else len(lines)
+            return highlight_code('\n'.join(lines[1:end]), fence.group(2))
+        return self.convert(block)
+
+    def update(self, text):
+        """重新切分正文，返回 [(块原文, HTML)]；self.rendered 为本次实际渲染的块数"""
+        cache = {}
+        blocks = []
+        self.rendered = 0
+        for block in split_blocks(text):
+            block_html = cache.get(block) or self._cache.get(block)
+            if block_html is None:
+                block_html = self.render_block(block)
+                self.rendered += 1
+            cache[block] = block_html
+            blocks.append((block, block_html))
+        # 只保留当前正文中的块，缓存不会随编辑无限增长
+        self._cache = cache
+        self.blocks = blocks
+        return blocks
+
+    def html(self, text):
+        """渲染完整的HTML"""
+        return '\n'.join(block_html for _, block_html in self.update(text))
+
+
+def diff_blocks(old, new):
+    """比较前后两次的块列表，返回 (相同前缀块数, 相同后缀块数)"""
+    prefix = 0
+    limit = min(len(old), len(new))
+    while prefix < limit and old[prefix] == new[prefix]:
+        prefix += 1
+    suffix = 0
+    while (suffix < limit - prefix
+           and old[len(old) - 1 - suffix] == new[len(new) - 1 - suffix]):
+        suffix += 1
+    return prefix, suffix
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文章渲染 - 头信息与正文模板
+头信息统一经YAML序列化输出，标题中的引号、冒号等不会破坏格式；
+templates/*.md 首次使用时编译并缓存，文件修改后自动重新编译。
+界面预览、界面保存和批量导入都调用 render_post
+"""
+
+import os
+import re
+from datetime import datetime
+from functools import lru_cache
+
+from yamlio import UNESCAPED_RE
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+
+LAYOUT = 'book'
+AUTHOR = 'Heureka'
+POST_TIME = '10:00:00'
+DEFAULT_TAG = 'General'
+
+# 头信息字段顺序；这些文本字段总是加双引号输出
+FRONT_MATTER_KEYS = ('layout', 'title', 'subtitle', 'date', 'author', 'book', 'chapter',
+                     'section', 'description', 'tags')
+QUOTED_KEYS = frozenset(('title', 'subtitle', 'book', 'chapter', 'section', 'description'))
+
+# 模板中可用的占位符，如 {{ title }}；其他 {{ ... }}（例如 Liquid 标签）原样保留
+TEMPLATE_FIELDS = ('title', 'subtitle', 'book', 'chapter', 'section', 'date', 'description', 'tags')
+PLACEHOLDER_RE = re.compile(r'\{\{\s*(' + '|'.join(TEMPLATE_FIELDS) + r')\s*\}\}')
+
+
+def split_tags(tags):
+    """逗号分隔的标签字符串转换为列表，没有标签时使用默认标签"""
+    tag_list = [tag.strip() for tag in (tags or '').split(',') if tag.strip()]
+    return tag_list or [DEFAULT_TAG]
+
+
+def front_matter(article_data):
+    """文章头信息字典，按 FRONT_MATTER_KEYS 排序，省略空的可选字段"""
+    fields = {
+        'layout': LAYOUT,
+        'title': article_data['title'],
+        'subtitle': article_data.get('subtitle') or None,
+        'date': datetime.strptime(f"{article_data['date']} {POST_TIME}", '%Y-%m-%d %H:%M:%S'),
+        'author': AUTHOR,
+        'book': article_data['book'],
+        'chapter': article_data['chapter'],
+        'section': article_data['section'],
+        'description': article_data.get('description') or None,
+        'tags': split_tags(article_data.get('tags')),
+    }
+    return {key: fields[key] for key in FRONT_MATTER_KEYS if fields[key] is not None}
+
+
+@lru_cache(maxsize=None)
+def _dumper():
+    """头信息使用的 Dumper：文本字段加双引号，列表缩进4格，不折行"""
+    # PyYAML 只在真正渲染时导入，保持本模块导入开销最小
+    import yaml
+
+    class QuotedStr(str):
+        pass
+
+    # 列表缩进通过覆盖 Emitter 方法实现，C序列化器不支持，这里保留纯Python实现；
+    # 大部分字段经 _quote 和 _emit 缓存，很少真正调用序列化器
+    class FrontMatterDumper(yaml.SafeDumper):
+        def increase_indent(self, flow=False, indentless=False):
+            return super().increase_indent(flow, False)
+
+    FrontMatterDumper.add_representer(
+        QuotedStr, lambda dumper, value: dumper.represent_scalar('tag:yaml.org,2002:str', value, style='"'))
+
+    def dump(key, value):
+        if key in QUOTED_KEYS:
+            value = QuotedStr(value)
+        return yaml.dump({key: value}, Dumper=FrontMatterDumper, allow_unicode=True,
+                         default_flow_style=False, sort_keys=False, indent=4, width=1 << 20)
+    return dump
+
+
+@lru_cache(maxsize=4096)
+def _emit(key, value):
+    """序列化单个字段；书籍、章节、作者等重复出现的字段直接命中缓存"""
+    return _dumper()(key, list(value) if isinstance(value, tuple) else value)
+
+
+def _quote(key, value):
+    """双引号文本字段的快速路径，含控制字符等需要转义的文本交给序列化器
+
+    不需要转义的文本放进双引号只需转义反斜杠和双引号，结果与序列化器逐字节一致
+    """
+    if UNESCAPED_RE.fullmatch(value):
+        return f'{key}: "' + value.replace('\\', '\\\\').replace('"', '\\"') + '"\n'
+    return _emit(key, value)
+
+
+def render_front_matter(article_data):
+    """渲染 --- 包围的YAML头信息"""
+    lines = ['---\n']
+    for key, value in front_matter(article_data).items():
+        if key in QUOTED_KEYS:
+            lines.append(_quote(key, value))
+        else:
+            lines.append(_emit(key, tuple(value) if isinstance(value, list) else value))
+    lines.append('---\n')
+    return ''.join(lines)
+
+
+class Template:
+    """编译后的正文模板：文本片段与占位符交替排列，渲染时只做拼接"""
+
+    def __init__(self, text):
+        self.parts = []
+        pos = 0
+        for match in PLACEHOLDER_RE.finditer(text):
+            self.parts.append(text[pos:match.start()])
+            self.parts.append(match.group(1))
+            pos = match.end()
+        self.parts.append(text[pos:])
+
+    def render(self, article_data):
+        """用文章数据填充占位符"""
+        parts = self.parts[:]
+        for i in range(1, len(parts), 2):
+            parts[i] = str(article_data.get(parts[i]) or '')
+        return ''.join(parts)
+
+
+_templates = {}
+
+
+def template_names():
+    """templates 目录中的模板名称（不含 .md）"""
+    try:
+        names = os.listdir(TEMPLATES_DIR)
+    except FileNotFoundError:
+        return []
+    return sorted(os.path.splitext(name)[0] for name in names if name.endswith('.md'))
+
+
+def load_template(name):
+    """返回编译好的模板；同一文件只在修改后重新编译"""
+    path = os.path.join(TEMPLATES_DIR, f"{name}.md")
+    mtime_ns = os.stat(path).st_mtime_ns
+    cached = _templates.get(name)
+    if cached is None or cached[0] != mtime_ns:
+        with open(path, 'r', encoding='utf-8') as f:
+            cached = (mtime_ns, Template(f.read()))
+        _templates[name] = cached
+    return cached[1]
+
+
+def render_body(article_data):
+    """文章正文；没有填写内容但选择了模板时使用模板"""
+    content = article_data.get('content', '')
+    if not content and article_data.get('template'):
+        content = load_template(article_data['template']).render(article_data)
+    return content
+
+
+def render_post(article_data):
+    """渲染完整的文章文件内容，使用book布局格式"""
+    return render_front_matter(article_data) + '\n' + render_body(article_data)
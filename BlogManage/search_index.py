@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+站内搜索索引 - 离线生成全文倒排索引
+分词规则：英文和数字按单词切分，中日韩文字按相邻两字切分（二元组），
+倒排表按词项首字符分片，浏览器只需下载查询涉及的分片；
+只有新增、修改或删除的文章会重新分词，也只重写受影响的分片
+
+输出目录（默认 search/）:
+    manifest.json      索引版本、分片列表、文档分块大小
+    docs-<n>.json      文档元数据 [标题, 副标题, URL, 日期, 标签]，按编号分块
+    <分片>.json         {词项: [编号差值, 权重, 编号差值, 权重, ...]}
+
+用法:
+    python search_index.py            # 增量更新
+    python search_index.py --full     # 全量重建
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import pickle
+import argparse
+
+from permalinks import post_url
+from post_index import scan_posts
+from posts import read_body, read_front_matter
+
+# 与 js/search-index.js 中的规则保持一致
+TOKEN_RE = re.compile(r'[0-9a-z_]+|[\u3040-\u30ff\u3400-\u9fff\uac00-\ud7af\uf900-\ufaff]+')
+TITLE_WEIGHT = 5
+META_WEIGHT = 3
+DOCS_PER_CHUNK = 500
+STATE_VERSION = 1
+
+
+def tokenize(text):
+    """切分词项：英文单词整体保留，中日韩文字输出二元组"""
+    tokens = []
+    for run in TOKEN_RE.findall(text.lower()):
+        if run[0] < '\u3040':
+            tokens.append(run)
+        elif len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def shard_key(term):
+    """词项所属分片：英文数字按首字符，其它按首字符码位取模"""
+    first = term[0]
+    if first.isascii() and first.isalnum():
+        return first
+    return 'u%02x' % (ord(first) % 64)
+
+
+def weigh_terms(meta, body):
+    """统计文章词项权重，标题和副标题、标签加权"""
+    weights = {}
+    for token in tokenize(body):
+        weights[token] = weights.get(token, 0) + 1
+    for token in tokenize(str(meta.get('title') or '')):
+        weights[token] = weights.get(token, 0) + TITLE_WEIGHT
+    tags = meta.get('tags') or []
+    if isinstance(tags, str):
+        tags = [tags]
+    extra = ' '.join([str(meta.get('subtitle') or '')] + [str(tag) for tag in tags])
+    for token in tokenize(extra):
+        weights[token] = weights.get(token, 0) + META_WEIGHT
+    return weights
+
+
+def encode_postings(postings):
+    """{编号: 权重} 编码为按编号排序的 [差值, 权重, ...]"""
+    encoded = []
+    previous = 0
+    for doc_id in sorted(postings):
+        encoded.append(doc_id - previous)
+        encoded.append(postings[doc_id])
+        previous = doc_id
+    return encoded
+
+
+class SearchIndexBuilder:
+    """增量维护倒排索引，状态缓存在 pickle 文件中"""
+
+    def __init__(self, posts_dir, output_dir, cache_file):
+        self.posts_dir = posts_dir
+        self.output_dir = output_dir
+        self.cache_file = cache_file
+        self.state = None
+
+    def _empty_state(self):
+        return {
+            'version': STATE_VERSION,
+            'revision': 0,
+            'stamps': {},
+            'doc_ids': {},
+            'docs': [],
+            'doc_terms': {},
+            'postings': {},
+            'shards': {},
+        }
+
+    def _load_state(self, full):
+        """读取上次的索引状态；输出目录被清空时同样全量重建"""
+        state = None
+        if not full and os.path.exists(os.path.join(self.output_dir, 'manifest.json')):
+            try:
+                with open(self.cache_file, 'rb') as f:
+                    state = pickle.load(f)
+            except (OSError, pickle.PickleError, EOFError):
+                state = None
+        if not state or state.get('version') != STATE_VERSION:
+            state = self._empty_state()
+        return state
+
+    def _save_state(self):
+        os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+        tmp_path = self.cache_file + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(self.state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.cache_file)
+
+    def _remove_doc(self, doc_id, dirty_shards):
+        """从倒排表中移除文档"""
+        state = self.state
+        for term in state['doc_terms'].pop(doc_id, ()):
+            postings = state['postings'][term]
+            del postings[doc_id]
+            shard = shard_key(term)
+            dirty_shards.add(shard)
+            if not postings:
+                del state['postings'][term]
+                state['shards'][shard].discard(term)
+
+    def _add_doc(self, doc_id, weights, dirty_shards):
+        """将文档词项加入倒排表"""
+        state = self.state
+        state['doc_terms'][doc_id] = list(weights)
+        for term, weight in weights.items():
+            shard = shard_key(term)
+            state['postings'].setdefault(term, {})[doc_id] = weight
+            state['shards'].setdefault(shard, set()).add(term)
+            dirty_shards.add(shard)
+
+    def build(self, full=False):
+        """更新索引并写出受影响的文件，返回统计信息"""
+        self.state = state = self._load_state(full)
+        current = scan_posts(self.posts_dir)
+        changed = [path for path, stat in current.items() if state['stamps'].get(path) != stat]
+        removed = [path for path in state['stamps'] if path not in current]
+
+        dirty_shards = set()
+        dirty_chunks = set()
+
+        for path in removed:
+            doc_id = state['doc_ids'].pop(path)
+            self._remove_doc(doc_id, dirty_shards)
+            state['docs'][doc_id] = None
+            del state['stamps'][path]
+            dirty_chunks.add(doc_id // DOCS_PER_CHUNK)
+
+        for path in changed:
+            filepath = os.path.join(self.posts_dir, path)
+            try:
+                meta, offset = read_front_matter(filepath)
+            except Exception:
+                meta, offset = {}, 0
+            state['stamps'][path] = current[path]
+
+            doc_id = state['doc_ids'].get(path)
+            if doc_id is not None:
+                self._remove_doc(doc_id, dirty_shards)
+            if meta.get('published') is False:
+                if doc_id is not None:
+                    state['docs'][doc_id] = None
+                    dirty_chunks.add(doc_id // DOCS_PER_CHUNK)
+                continue
+            if doc_id is None:
+                doc_id = len(state['docs'])
+                state['docs'].append(None)
+                state['doc_ids'][path] = doc_id
+
+            tags = meta.get('tags') or []
+            if isinstance(tags, str):
+                tags = [tags]
+            state['docs'][doc_id] = [
+                str(meta.get('title') or ''),
+                str(meta.get('subtitle') or ''),
+                post_url(path, meta) or '',
+                str(meta.get('date') or path[:10]),
+                ', '.join(str(tag) for tag in tags),
+            ]
+            self._add_doc(doc_id, weigh_terms(meta, read_body(filepath, offset)), dirty_shards)
+            dirty_chunks.add(doc_id // DOCS_PER_CHUNK)
+
+        if full or dirty_shards or dirty_chunks:
+            state['revision'] += 1
+            self._write_output(dirty_shards, dirty_chunks, full)
+        self._save_state()
+        return {
+            'docs': len(state['doc_ids']),
+            'changed': len(changed),
+            'removed': len(removed),
+            'shards': len(dirty_shards),
+            'chunks': len(dirty_chunks),
+        }
+
+    def _write_json(self, name, data):
+        path = os.path.join(self.output_dir, name)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    def _write_output(self, dirty_shards, dirty_chunks, full):
+        """只重写受影响的分片和文档分块，最后更新清单"""
+        state = self.state
+        os.makedirs(self.output_dir, exist_ok=True)
+        if full:
+            # 全量重建时清掉旧文件，避免残留已不存在的分片
+            for name in os.listdir(self.output_dir):
+                if name.endswith('.json'):
+                    os.remove(os.path.join(self.output_dir, name))
+            dirty_shards = set(state['shards'])
+            dirty_chunks = set(range((len(state['docs']) + DOCS_PER_CHUNK - 1) // DOCS_PER_CHUNK))
+
+        for shard in dirty_shards:
+            terms = state['shards'].get(shard)
+            if not terms:
+                state['shards'].pop(shard, None)
+                shard_path = os.path.join(self.output_dir, f'{shard}.json')
+                if os.path.exists(shard_path):
+                    os.remove(shard_path)
+                continue
+            self._write_json(f'{shard}.json', {
+                term: encode_postings(state['postings'][term]) for term in sorted(terms)
+            })
+
+        for chunk in dirty_chunks:
+            start = chunk * DOCS_PER_CHUNK
+            self._write_json(f'docs-{chunk}.json', state['docs'][start:start + DOCS_PER_CHUNK])
+
+        self._write_json('manifest.json', {
+            'revision': state['revision'],
+            'shards': sorted(state['shards']),
+            'docsPerChunk': DOCS_PER_CHUNK,
+        })
+
+
+def main(argv=None):
+    from core import BlogProject
+
+    parser = argparse.ArgumentParser(description='生成站内搜索索引')
+    parser.add_argument('--root', default=None, help='博客根目录（默认为BlogManage的上级目录）')
+    parser.add_argument('--output', default=None, help='输出目录（默认为博客根目录下的 search/）')
+    parser.add_argument('--full', action='store_true', help='忽略缓存全量重建')
+    args = parser.parse_args(argv)
+
+    project = BlogProject(args.root)
+    builder = SearchIndexBuilder(project.posts_dir,
+                                 args.output or os.path.join(project.project_root, 'search'),
+                                 os.path.join(project.cache_dir, 'search_index.pickle'))
+    start = time.perf_counter()
+    stats = builder.build(full=args.full)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"索引 {stats['docs']} 篇文章：重新分词 {stats['changed']} 篇，移除 {stats['removed']} 篇，"
+          f"写出 {stats['shards']} 个分片、{stats['chunks']} 个文档分块，用时 {elapsed:.1f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,623 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+增量构建 - 记录每个页面用到的布局、include、数据文件和站点级变量，
+改动后只让受影响的页面重新渲染
+
+依赖项从模板中静态分析得到：layout 链、{% include %}（含 book_nav/{{ 变量 }} 这类按页面头信息
+取值的动态 include）、site.data.X、按 page.字段 取其中一项的 site.data.X[page.Y] 和
+“for 项 in site.data.X... / if 项.字段 == page.Y” 循环，以及 site.posts、site.tags、
+site.pages、paginator、page.previous/next。每个依赖项记录内容摘要，与上次构建比较后
+得到受影响的页面；books.yml 按书籍片段比较，改动一本书只影响这本书的页面。
+
+jekyll build --incremental 只按 mtime 判断页面自身和它用到的布局、include，
+不跟踪数据文件和 site.posts 等汇总变量；这里把内容未变的文件 mtime 恢复为上次构建时的值
+（CI 检出后全部文件的 mtime 都是新的），再把受影响的页面 mtime 设为当前时间，
+Jekyll 只重新渲染这些页面。_config.yml 变化或没有上次的构建结果时全量构建
+
+用法:
+    python site_build.py --dry-run -v       # 只列出受影响的页面及原因
+    python site_build.py                    # 增量构建到 <博客根目录>/_site
+    python site_build.py --jekyll "bundle exec jekyll" -- --baseurl /blog
+    python blog_manager.py build --full
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import shlex
+import pickle
+import hashlib
+import argparse
+import subprocess
+from collections import Counter
+
+from permalinks import DATE_RE, post_slug, post_url
+from posts import read_front_matter
+
+# 依赖记录结构版本，变化时全量构建
+STATE_VERSION = 1
+STATE_FILE = os.path.join('.cache', 'site_build.pickle')
+METADATA_FILE = '.jekyll-metadata'
+PAGE_EXTENSIONS = ('.html', '.md', '.markdown', '.xml')
+DATA_EXTENSIONS = ('.yml', '.yaml', '.json', '.csv')
+# 变化时无法判断影响范围，全量构建
+CONFIG_FILES = ('_config.yml', 'Gemfile.lock')
+
+RAW_RE = re.compile(r'{%-?\s*raw\s*-?%}.*?{%-?\s*endraw\s*-?%}', re.S)
+INCLUDE_RE = re.compile(r'{%-?\s*include\s+((?:{{.*?}}|[^\s%{])+)')
+INCLUDE_VAR_RE = re.compile(r'{{\s*(\w+)\s*}}')
+ASSIGN_RE = re.compile(r'{%-?\s*assign\s+(\w+)\s*=\s*site\.data\.(\w+)\[page\.([\w-]+)\]')
+LOOKUP_RE = re.compile(r'site\.data\.(\w+)\[page\.([\w-]+)\]')
+LOOP_RE = re.compile(r'{%-?\s*for\s+(\w+)\s+in\s+site\.data\.(\w+)((?:\.\w+)*)\s*-?%}\s*'
+                     r'{%-?\s*if\s+\1\.(\w+)\s*==\s*page\.([\w-]+)\s*-?%}')
+DATA_RE = re.compile(r'site\.data\.(\w+)')
+SITE_VAR_RE = re.compile(r'\b(?:site\.(posts|tags|categories|pages)|(paginator)|page\.(previous|next))\b')
+CONTENT_RE = re.compile(r'\w\.content\b')
+
+
+class BuildError(RuntimeError):
+    """jekyll build 失败"""
+
+
+def digest_bytes(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def digest_of(value):
+    """任意可JSON序列化的值的摘要"""
+    return digest_bytes(json.dumps(value, ensure_ascii=False, sort_keys=True, default=str).encode('utf-8'))
+
+
+def split_front_matter(text):
+    """返回 (头信息文本, 正文)，没有头信息时头信息文本为空"""
+    if not text.startswith('---'):
+        return '', text
+    end = re.search(r'^---[ \t]*$', text[3:], re.M)
+    if end is None:
+        return '', text
+    return text[3:3 + end.start()], text[3 + end.end():]
+
+
+def analyze(text):
+    """模板中用到的依赖：{'layout', 'includes', 'data', 'keyed', 'assigns', 'vars'}，没有依赖的项省略"""
+    import yamlio
+
+    front_matter, body = split_front_matter(text)
+    deps = {}
+    if front_matter:
+        try:
+            meta = yamlio.safe_load(front_matter) or {}
+        except Exception:
+            meta = {}
+        if isinstance(meta, dict) and meta.get('layout'):
+            deps['layout'] = str(meta['layout'])
+
+    body = RAW_RE.sub('', body)
+    keyed = set()
+    for _, name, path, item_field, field in LOOP_RE.findall(body):
+        keyed.add((name, path, item_field, field))
+    rest = LOOP_RE.sub('', body)
+    assigns = {var: (name, '', '', field) for var, name, field in ASSIGN_RE.findall(rest)}
+    for name, field in LOOKUP_RE.findall(rest):
+        keyed.add((name, '', '', field))
+    data = set(DATA_RE.findall(LOOKUP_RE.sub('', rest)))
+
+    site_vars = set()
+    for posts, paginator, neighbour in SITE_VAR_RE.findall(body):
+        site_vars.add(posts or paginator or 'neighbours')
+    if 'posts' in site_vars and CONTENT_RE.search(body):
+        site_vars.add('content')
+
+    for key, value in (('includes', sorted(set(INCLUDE_RE.findall(body)))), ('data', sorted(data)),
+                       ('keyed', sorted(keyed)), ('assigns', assigns), ('vars', sorted(site_vars))):
+        if value:
+            deps[key] = value
+    return deps
+
+
+def keyed_token(spec, key):
+    """site.data 中按页面字段取值的一项，如 data:books.books[name=STM32] 或 data:book_nav[STM32]"""
+    name, path, item_field, _ = spec
+    if item_field:
+        return f"data:{name}{path}[{item_field}={key}]"
+    return f"data:{name}[{key}]"
+
+
+def page_url(rel_path, meta):
+    """permalink: pretty 下页面的URL"""
+    if meta.get('permalink'):
+        return str(meta['permalink'])
+    stem, ext = os.path.splitext(rel_path)
+    if ext == '.xml':
+        return '/' + rel_path
+    if stem == 'index' or stem.endswith('/index'):
+        stem = stem[:-len('index')]
+        return '/' + stem
+    return '/' + stem + '/'
+
+
+class BuildPlan:
+    """一次构建的计划：受影响的页面及原因，以及构建成功后要写回的依赖记录"""
+
+    def __init__(self, state):
+        self.state = state
+        # 全量构建的原因，增量构建时为 None
+        self.full = None
+        # 源文件相对路径 -> 原因
+        self.affected = {}
+        # 源文件相对路径 -> URL
+        self.urls = {}
+        self.removed = []
+
+    def summary(self):
+        """一行统计"""
+        if self.full:
+            return f"全量构建 {len(self.urls)} 个页面：{self.full}"
+        reasons = Counter(reason.split(':', 1)[0] for reason in self.affected.values())
+        detail = '，'.join(f"{reason} {count}" for reason, count in reasons.most_common())
+        return (f"受影响 {len(self.affected)}/{len(self.urls)} 个页面，移除 {len(self.removed)} 个"
+                + (f"（{detail}）" if detail else ''))
+
+    def lines(self):
+        """逐个受影响页面：URL、源文件和原因"""
+        for rel_path in sorted(self.affected):
+            yield f"{self.urls[rel_path]}  {rel_path}  <- {self.affected[rel_path]}"
+        for rel_path in self.removed:
+            yield f"[移除] {rel_path}"
+
+
+class SiteBuild:
+    """站点依赖记录：页面源文件 -> 依赖项，依赖项 -> 内容摘要，保存在 .cache 中"""
+
+    def __init__(self, project, destination=None):
+        self.project = project
+        self.root = project.project_root
+        self.destination = destination or os.path.join(self.root, '_site')
+        self.state_file = os.path.join(self.root, STATE_FILE)
+        self.state = self._load_state()
+
+    def _load_state(self):
+        try:
+            with open(self.state_file, 'rb') as f:
+                state = pickle.load(f)
+        except (OSError, pickle.PickleError, EOFError):
+            return None
+        return state if state.get('version') == STATE_VERSION else None
+
+    def commit(self, plan):
+        """页面按计划构建成功后写回依赖记录；自行驱动构建时在构建完成后调用"""
+        state = plan.state
+        os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+        tmp_path = self.state_file + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.state_file)
+        self.state = state
+
+    # ---- 扫描源文件 ----
+
+    def _walk(self, rel_dir, extensions=None, skip=()):
+        """递归列出目录下的文件，返回 {相对路径: (mtime_ns, 大小)}；skip 为跳过的顶层目录"""
+        found = {}
+        pending = [rel_dir]
+        while pending:
+            current = pending.pop()
+            try:
+                entries = os.scandir(os.path.join(self.root, current))
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            with entries:
+                for entry in entries:
+                    rel_path = f"{current}/{entry.name}" if current else entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        if current or not (entry.name.startswith(('_', '.')) or entry.name in skip):
+                            pending.append(rel_path)
+                    elif extensions is None or entry.name.endswith(extensions):
+                        st = entry.stat()
+                        found[rel_path] = (st.st_mtime_ns, st.st_size)
+        return found
+
+    def _fingerprint(self, rel_path, stat, template=True):
+        """返回文件内容摘要；(mtime_ns, 大小) 未变时沿用上次的摘要和模板分析结果，否则重新读取
+
+        template 为真时分析其中的 Liquid 依赖，结果只记录非空的
+        """
+        previous = self._old.get('files', {}).get(rel_path)
+        old_analyses = self._old.get('analyses', {})
+        if previous is not None and previous[:2] == stat:
+            digest = previous[2]
+        else:
+            with open(os.path.join(self.root, rel_path), 'rb') as f:
+                data = f.read()
+            digest = digest_bytes(data)
+            if template and not (previous is not None and previous[2] == digest):
+                deps = analyze(data.decode('utf-8', errors='replace'))
+                if deps:
+                    self._analyses[rel_path] = deps
+                self._files[rel_path] = stat + (digest,)
+                return digest
+        if template and rel_path in old_analyses:
+            self._analyses[rel_path] = old_analyses[rel_path]
+        self._files[rel_path] = stat + (digest,)
+        return digest
+
+    def _config_exclude(self):
+        """_config.yml 中的 exclude 列表"""
+        import yamlio
+
+        try:
+            with open(os.path.join(self.root, '_config.yml'), 'r', encoding='utf-8') as f:
+                config = yamlio.safe_load(f)
+        except Exception:
+            return set()
+        exclude = config.get('exclude') if isinstance(config, dict) else None
+        return {str(name).strip('/') for name in exclude or []}
+
+    def _scan(self):
+        """扫描配置、模板、数据文件、文章和页面，返回配置摘要"""
+        config = {}
+        for name in CONFIG_FILES:
+            path = os.path.join(self.root, name)
+            if os.path.exists(path):
+                st = os.stat(path)
+                config[name] = self._fingerprint(name, (st.st_mtime_ns, st.st_size), template=False)
+        for rel_path, stat in self._walk('_plugins').items():
+            config[rel_path] = self._fingerprint(rel_path, stat, template=False)
+
+        self._templates = {}
+        for rel_dir in ('_layouts', '_includes'):
+            for rel_path, stat in self._walk(rel_dir).items():
+                self._fingerprint(rel_path, stat)
+                self._templates[rel_path] = self._analyses.get(rel_path, {})
+        self._layouts = {}
+        for rel_path in sorted(self._templates, reverse=True):
+            if rel_path.startswith('_layouts/'):
+                self._layouts[os.path.splitext(rel_path[len('_layouts/'):])[0]] = rel_path
+
+        # site.data.X -> 数据文件；子目录按目录名整体作为一个数据项
+        self._data_files = {}
+        for rel_path, stat in sorted(self._walk('_data', DATA_EXTENSIONS).items()):
+            self._fingerprint(rel_path, stat, template=False)
+            name = os.path.splitext(rel_path[len('_data/'):].split('/', 1)[0])[0]
+            self._data_files.setdefault(name, []).append(rel_path)
+
+        post_index = self.project.post_index
+        post_index.refresh()
+        self._posts = {}
+        for rel_path, stat in post_index.stats().items():
+            source = '_posts/' + rel_path
+            self._fingerprint(source, stat)
+            self._posts[source] = post_index.get(rel_path) or {}
+
+        self._pages = {}
+        excluded = self._config_exclude()
+        for rel_path, stat in self._walk('', PAGE_EXTENSIONS, excluded | {'node_modules'}).items():
+            if rel_path in excluded:
+                continue
+            path = os.path.join(self.root, rel_path)
+            # 没有头信息的文件是静态文件，按原样复制，不经过模板
+            with open(path, 'rb') as f:
+                if f.read(3) != b'---':
+                    continue
+            try:
+                meta = read_front_matter(path)[0]
+            except Exception:
+                meta = {}
+            self._fingerprint(rel_path, stat)
+            self._pages[rel_path] = meta
+        return digest_of(config)
+
+    # ---- 计算计划 ----
+
+    def plan(self, full=False):
+        """扫描站点并与上次构建比较，返回 BuildPlan"""
+        self._old = old = self.state or {}
+        self._files = {}
+        self._analyses = {}
+        self._closures = {}
+        self._keyed = {}
+        self._data_cache = {}
+        self._digests = {}
+        config = self._scan()
+        self._order = self._post_order()
+
+        plan = BuildPlan({'version': STATE_VERSION, 'config': config, 'files': self._files,
+                          'analyses': self._analyses})
+        sources = {}
+        for source, meta in self._posts.items():
+            sources[source] = self._tokens(source, meta, default_layout='post')
+            plan.urls[source] = post_url(source[len('_posts/'):], meta) or '/' + source
+        for source, meta in self._pages.items():
+            sources[source] = self._tokens(source, meta)
+            plan.urls[source] = page_url(source, meta)
+        digests = {}
+        for tokens in sources.values():
+            for token in tokens:
+                if token not in digests:
+                    digests[token] = self._digest(token)
+        plan.state['sources'] = sources
+        plan.state['digests'] = digests
+
+        if full:
+            plan.full = '指定了 --full'
+        elif not old:
+            plan.full = '没有上次的依赖记录'
+        elif old.get('config') != config:
+            plan.full = '_config.yml、Gemfile.lock 或 _plugins 已改动'
+        elif not os.path.isdir(self.destination):
+            plan.full = '构建目录不存在'
+        elif not os.path.exists(os.path.join(self.root, METADATA_FILE)):
+            plan.full = f'没有 {METADATA_FILE}'
+        if plan.full:
+            plan.affected = {source: '全量' for source in sources}
+            return plan
+
+        old_files = old['files']
+        old_sources = old['sources']
+        old_digests = old['digests']
+        for source, tokens in sources.items():
+            if source not in old_sources:
+                plan.affected[source] = '新增'
+            elif old_files[source][2] != self._files[source][2]:
+                plan.affected[source] = '内容变化'
+            elif tokens != old_sources[source]:
+                plan.affected[source] = '依赖变化'
+            else:
+                changed = [token for token in tokens if old_digests.get(token) != digests[token]]
+                if changed:
+                    plan.affected[source] = min(changed)
+        plan.removed = sorted(source for source in old_sources if source not in sources)
+        return plan
+
+    def _post_order(self):
+        """按 Jekyll 的排序（日期、路径）排列文章，返回 {文章: (上一篇, 下一篇)}"""
+        def sort_key(source):
+            date = str(self._posts[source].get('date') or '')
+            if not DATE_RE.match(date):
+                date = post_slug(source)[:10]
+            return date, source
+
+        ordered = sorted(self._posts, key=sort_key)
+        return {source: (ordered[i - 1] if i else None, ordered[i + 1] if i + 1 < len(ordered) else None)
+                for i, source in enumerate(ordered)}
+
+    def _closure(self, rel_path):
+        """模板及其静态 include 的全部依赖（不含需要页面头信息才能确定的部分）"""
+        closure = self._closures.get(rel_path)
+        if closure is None:
+            closure = new_closure()
+            # 先占位，include 互相引用时不会无限递归
+            self._closures[rel_path] = closure
+            closure['files'].add(rel_path)
+            self._extend(closure, self._templates.get(rel_path, {}))
+        return closure
+
+    def _extend(self, closure, deps):
+        """把一个模板自身的依赖及其静态 include 并入 closure"""
+        closure['data'].update(deps.get('data', ()))
+        closure['keyed'].update(tuple(spec) for spec in deps.get('keyed', ()))
+        closure['vars'].update(deps.get('vars', ()))
+        closure['assigns'].update(deps.get('assigns', {}))
+        for name in deps.get('includes', ()):
+            if '{{' in name:
+                closure['dynamic'].add(name)
+                continue
+            merge(closure, self._closure('_includes/' + name))
+
+    def _tokens(self, source, meta, default_layout=None):
+        """页面源文件的全部依赖项"""
+        closure = new_closure()
+        closure['files'].add(source)
+        self._extend(closure, self._analyses.get(source, {}))
+        layout = meta.get('layout', default_layout)
+        seen = set()
+        while layout and str(layout) not in seen:
+            seen.add(str(layout))
+            rel_path = self._layouts.get(str(layout), f"_layouts/{layout}.html")
+            merge(closure, self._closure(rel_path))
+            layout = self._templates.get(rel_path, {}).get('layout')
+
+        tokens = {'file:' + rel_path for rel_path in closure['files']}
+        for name in closure['data']:
+            tokens.update('file:' + rel_path for rel_path in self._data_files.get(name, [f'_data/{name}']))
+        for spec in closure['keyed']:
+            tokens.add(self._keyed_token(spec, meta.get(spec[3])))
+        for name in closure['dynamic']:
+            tokens.update(self._dynamic_include(name, closure['assigns'], meta))
+
+        site_vars = closure['vars']
+        if site_vars & {'posts', 'paginator'}:
+            tokens.add('site.posts')
+        if site_vars & {'content', 'paginator'}:
+            tokens.add('posts.content')
+        if site_vars & {'tags', 'categories'}:
+            tokens.add('site.tags')
+        if 'pages' in site_vars:
+            tokens.add('site.pages')
+        if 'neighbours' in site_vars and source in self._order:
+            tokens.update('link:' + neighbour for neighbour in self._order[source] if neighbour)
+        return frozenset(tokens)
+
+    def _keyed_token(self, spec, key):
+        token = keyed_token(spec, key)
+        self._keyed[token] = (spec, key)
+        return token
+
+    def _dynamic_include(self, name, assigns, meta):
+        """{% include 目录/{{ 变量 }}.html %}：变量来自 site.data.X[page.Y] 时解析出具体文件，否则依赖整个目录"""
+        values = {}
+        for var in INCLUDE_VAR_RE.findall(name):
+            spec = assigns.get(var)
+            value = self._keyed_value(spec, meta.get(spec[3])) if spec else None
+            if value is None:
+                directory = '_includes/' + name.split('{{', 1)[0]
+                return {'file:' + rel_path for rel_path in self._templates if rel_path.startswith(directory)}
+            values[var] = str(value)
+        rel_path = '_includes/' + INCLUDE_VAR_RE.sub(lambda match: values[match.group(1)], name)
+        return {'file:' + path for path in self._closure(rel_path)['files']}
+
+    # ---- 依赖项摘要 ----
+
+    def _data(self, name):
+        """site.data.X 的内容，多次使用时只解析一次；子目录和多个同名文件不展开，返回 None"""
+        if name not in self._data_cache:
+            import yamlio
+
+            value = None
+            rel_paths = self._data_files.get(name, [])
+            if len(rel_paths) == 1 and '/' not in rel_paths[0][len('_data/'):]:
+                try:
+                    with open(os.path.join(self.root, rel_paths[0]), 'r', encoding='utf-8') as f:
+                        value = json.load(f) if rel_paths[0].endswith('.json') else yamlio.safe_load(f)
+                except Exception:
+                    value = None
+            self._data_cache[name] = value
+        return self._data_cache[name]
+
+    def _keyed_value(self, spec, key):
+        """site.data 中按页面字段取出的一项，不存在时返回 None"""
+        name, path, item_field, _ = spec
+        value = self._data(name)
+        for part in filter(None, path.split('.')):
+            value = value.get(part) if isinstance(value, dict) else None
+        if item_field:
+            if not isinstance(value, list):
+                return None
+            return next((item for item in value if isinstance(item, dict) and item.get(item_field) == key), None)
+        return value.get(key) if isinstance(value, dict) else None
+
+    def _keyed_digest(self, token):
+        """books.yml 中的书籍直接用书籍目录记录的片段摘要，不必解析整个文件；其他数据取出对应项后计算"""
+        spec, key = self._keyed[token]
+        if spec[0] == 'books' and spec[2] == 'name' and self._data_files.get('books') == ['_data/books.yml']:
+            catalog = self.project.catalog
+            digest = catalog.book_digest(key)
+            if digest is not None:
+                return digest
+        return digest_of(self._keyed_value(spec, key))
+
+    def _digest(self, token):
+        """依赖项的内容摘要"""
+        kind, _, arg = token.partition(':')
+        if kind == 'file':
+            entry = self._files.get(arg)
+            return entry[2] if entry else None
+        if kind == 'data':
+            return self._keyed_digest(token)
+        if kind == 'link':
+            meta = self._posts.get(arg, {})
+            return digest_of([post_url(arg[len('_posts/'):], meta), meta.get('title')])
+        if token == 'site.posts':
+            return digest_of(sorted(self._posts.items()))
+        if token == 'posts.content':
+            return digest_of(sorted((source, self._files[source][2]) for source in self._posts))
+        if token == 'site.tags':
+            counts = Counter()
+            for meta in self._posts.values():
+                for key in ('tags', 'categories'):
+                    values = meta.get(key) or []
+                    counts.update(f"{key}:{value}" for value in ([values] if isinstance(values, str) else values))
+            return digest_of([len(self._posts), sorted(counts.items())])
+        if token == 'site.pages':
+            return digest_of(sorted((source, page_url(source, meta), meta.get('title'), meta.get('hide-in-nav'))
+                                    for source, meta in self._pages.items()))
+        return None
+
+    # ---- 构建 ----
+
+    def _align_mtimes(self, plan):
+        """内容未变的文件恢复上次构建时的 mtime，受影响的页面 mtime 设为当前时间"""
+        old_files = self._old['files']
+        now = time.time_ns()
+        restored = touched = 0
+        for rel_path, (mtime_ns, size, digest) in list(self._files.items()):
+            path = os.path.join(self.root, rel_path)
+            if rel_path in plan.affected:
+                # 与上次记录的 mtime 不同即可，Jekyll 按是否相等判断
+                mtime_ns = max(now, old_files.get(rel_path, (0,))[0] + 1_000_000_000)
+                touched += 1
+            else:
+                previous = old_files.get(rel_path)
+                if previous is None or previous[2] != digest or previous[0] == mtime_ns:
+                    continue
+                mtime_ns = previous[0]
+                restored += 1
+            os.utime(path, ns=(os.stat(path).st_atime_ns, mtime_ns))
+            self._files[rel_path] = (mtime_ns, size, digest)
+        return restored, touched
+
+    def build(self, plan, jekyll='jekyll', jekyll_args=()):
+        """按计划运行 jekyll build --incremental，成功后写回依赖记录，返回 (恢复 mtime 数, 标记重建数)"""
+        metadata = os.path.join(self.root, METADATA_FILE)
+        if plan.full:
+            # 没有旧的 .jekyll-metadata，Jekyll 会渲染全部页面并重新记录
+            if os.path.exists(metadata):
+                os.remove(metadata)
+            counts = (0, len(plan.affected))
+        else:
+            counts = self._align_mtimes(plan)
+
+        args = shlex.split(jekyll) + ['build', '--incremental', '--source', self.root,
+                                      '--destination', self.destination] + list(jekyll_args)
+        try:
+            result = subprocess.run(args, cwd=self.root)
+        except FileNotFoundError:
+            raise BuildError(f"找不到 {shlex.split(jekyll)[0]}，请安装 Jekyll 或用 --jekyll 指定命令")
+        if result.returncode != 0:
+            raise BuildError(f"jekyll build 失败，退出码 {result.returncode}")
+        self.commit(plan)
+        return counts
+
+
+def new_closure():
+    """模板依赖的并集：文件、整体数据、按页面取值的数据、动态 include、变量赋值、站点级变量"""
+    return {'files': set(), 'data': set(), 'keyed': set(), 'dynamic': set(), 'assigns': {}, 'vars': set()}
+
+
+def merge(closure, other):
+    for key in ('files', 'data', 'keyed', 'dynamic', 'vars'):
+        closure[key] |= other[key]
+    closure['assigns'].update(other['assigns'])
+
+
+def main(argv=None):
+    from core import BlogProject
+
+    parser = argparse.ArgumentParser(description='只重新渲染受改动影响的页面')
+    parser.add_argument('--root', default=None, help='博客根目录（默认为BlogManage的上级目录）')
+    parser.add_argument('--destination', default=None, help='构建输出目录（默认为 <博客根目录>/_site）')
+    parser.add_argument('--jekyll', default='jekyll', help='Jekyll 命令，例如 "bundle exec jekyll"')
+    parser.add_argument('--full', action='store_true', help='忽略依赖记录，全量构建')
+    parser.add_argument('--dry-run', action='store_true', help='只计算受影响的页面，不构建')
+    parser.add_argument('-v', '--verbose', action='store_true', help='逐个列出受影响的页面及原因')
+    parser.add_argument('jekyll_args', nargs=argparse.REMAINDER, help='-- 之后的参数原样传给 jekyll build')
+    args = parser.parse_args(argv)
+    jekyll_args = args.jekyll_args[1:] if args.jekyll_args[:1] == ['--'] else args.jekyll_args
+
+    project = BlogProject(args.root).load()
+    site = SiteBuild(project, args.destination)
+    start = time.perf_counter()
+    plan = site.plan(full=args.full)
+    print(f"{plan.summary()}，分析用时 {(time.perf_counter() - start) * 1000:.0f} ms")
+    if args.verbose and not plan.full:
+        for line in plan.lines():
+            print(line)
+    if args.dry_run:
+        return 0
+
+    start = time.perf_counter()
+    try:
+        restored, touched = site.build(plan, args.jekyll, jekyll_args)
+    except BuildError as e:
+        print(e, file=sys.stderr)
+        return 1
+    print(f"恢复 {restored} 个未变文件的 mtime，标记 {touched} 个页面重建，"
+          f"jekyll build 用时 {time.perf_counter() - start:.1f} s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
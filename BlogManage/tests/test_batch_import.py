@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""批量导入：格式错误的日期按草稿报错，而不是中断整个导入"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_import import DraftError, load_directory, main, prepare_jobs
+
+DRAFT = """---
+book: 测试书籍
+chapter: 第一章
+section: 第一节
+title: 日期格式错误
+date: {date}
+---
+正文
+"""
+
+
+def write_draft(directory, date):
+    path = os.path.join(directory, 'draft.md')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(DRAFT.format(date=date))
+    return path
+
+
+def test_malformed_date_raises_draft_error(tmp_path):
+    path = write_draft(str(tmp_path), '2025/01/01')
+    with pytest.raises(DraftError) as error:
+        prepare_jobs(load_directory(str(tmp_path)), str(tmp_path))
+    assert path in str(error.value)
+    assert '2025/01/01' in str(error.value)
+
+
+def test_malformed_manifest_date_raises_draft_error(tmp_path):
+    drafts = [{'book': '测试书籍', 'chapter': '第一章', 'section': '第一节',
+               'title': '日期格式错误', 'date': 'not-a-date'}]
+    with pytest.raises(DraftError, match='第1条.*not-a-date'):
+        prepare_jobs(drafts, str(tmp_path))
+
+
+def test_main_reports_malformed_date(tmp_path, capsys):
+    drafts = tmp_path / 'drafts'
+    drafts.mkdir()
+    write_draft(str(drafts), '2025/01/01')
+    assert main([str(drafts), '--root', str(tmp_path)]) == 1
+    assert '导入失败' in capsys.readouterr().err
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件监视 - 在其他编辑器修改或 git 拉取后自动同步目录和文章索引
+纯Python实现，按 mtime 轮询 books.yml 和 _posts；
+界面优先使用 QFileSystemWatcher（见 workers.FileWatcher），无法监视时退回这里的轮询
+
+用法:
+    python watcher.py               # 持续监视并同步，Ctrl+C 退出
+    python watcher.py --build       # 同步后增量构建站点，只重新渲染受影响的页面
+"""
+
+import os
+import sys
+import time
+import argparse
+import threading
+
+from catalog import file_stat
+from post_index import scan_posts
+
+
+def watch_paths(project):
+    """需要监视的路径：books.yml 及其目录、变更日志、_posts 下的目录和文章"""
+    paths = {project.books_file, os.path.dirname(project.books_file),
+             project.catalog.journal_file, project.posts_dir}
+    for rel_path in list(project.post_index.posts):
+        paths.add(os.path.join(project.posts_dir, rel_path))
+        if '/' in rel_path:
+            paths.add(os.path.join(project.posts_dir, rel_path.rsplit('/', 1)[0]))
+    return sorted(path for path in paths if os.path.exists(path))
+
+
+def snapshot(project):
+    """books.yml、变更日志和全部文章的 (mtime_ns, 大小)，用于判断是否有变化"""
+    return (file_stat(project.books_file), file_stat(project.catalog.journal_file),
+            scan_posts(project.posts_dir))
+
+
+class PollingWatcher(threading.Thread):
+    """轮询监视线程：发现变化后等待连续 debounce 秒没有新变化，再调用一次 callback
+
+    git checkout 等批量改动期间会不断推迟回调，整批只触发一次同步
+    """
+
+    def __init__(self, project, callback, interval=1.0, debounce=0.5):
+        super().__init__(daemon=True)
+        self.project = project
+        self.callback = callback
+        self.interval = interval
+        self.debounce = debounce
+        self._stopped = threading.Event()
+
+    def run(self):
+        last = snapshot(self.project)
+        while not self._stopped.wait(self.interval):
+            current = snapshot(self.project)
+            if current == last:
+                continue
+            # 变化期间缩短轮询间隔，直到状态稳定
+            while current != last:
+                last = current
+                if self._stopped.wait(self.debounce):
+                    return
+                current = snapshot(self.project)
+            self.callback()
+
+    def stop(self):
+        """停止监视，正在等待的回调不再执行"""
+        self._stopped.set()
+
+
+def main(argv=None):
+    from core import BlogProject
+
+    parser = argparse.ArgumentParser(description='监视 books.yml 和 _posts，变化时增量同步')
+    parser.add_argument('--root', default=None, help='博客根目录（默认为BlogManage的上级目录）')
+    parser.add_argument('--interval', type=float, default=1.0, help='轮询间隔（秒）')
+    parser.add_argument('--debounce', type=float, default=0.5, help='变化稳定多久后同步（秒）')
+    parser.add_argument('--build', action='store_true', help='同步后运行增量构建（见 site_build.py）')
+    parser.add_argument('--jekyll', default='jekyll', help='增量构建使用的 Jekyll 命令')
+    args = parser.parse_args(argv)
+
+    project = BlogProject(args.root).load()
+    project.post_index.refresh()
+
+    def on_change():
+        start = time.perf_counter()
+        reparsed, changed, removed = project.sync()
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"重新解析书籍 {len(reparsed)} 本，文章 {len(changed)} 篇，"
+              f"移除 {len(removed)} 篇，用时 {elapsed:.1f} ms", flush=True)
+        if args.build:
+            build_site()
+
+    def build_site():
+        from site_build import BuildError
+
+        plan = project.site_build.plan()
+        # 构建时改动的 mtime 会再触发一次同步，这时没有受影响的页面，不再构建
+        if not (plan.full or plan.affected):
+            return
+        print(plan.summary(), flush=True)
+        try:
+            project.site_build.build(plan, args.jekyll)
+        except BuildError as e:
+            print(e, file=sys.stderr, flush=True)
+
+    watcher = PollingWatcher(project, on_change, args.interval, args.debounce)
+    watcher.start()
+    print(f"正在监视 {project.project_root}（Ctrl+C 退出）", flush=True)
+    try:
+        while watcher.is_alive():
+            watcher.join(0.5)
+    except KeyboardInterrupt:
+        watcher.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
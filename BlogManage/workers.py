@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+后台任务 - 把文件读写和YAML解析移出Qt主线程
+任务在线程池中串行执行，结果通过信号回到主线程；
+同一个key的任务在排队期间只保留最新一次
+"""
+
+import time
+from collections import OrderedDict
+
+from PyQt5.QtCore import (QCoreApplication, QFileSystemWatcher, QObject, QRunnable, QThreadPool,
+                          QTimer, Qt, pyqtSignal, pyqtSlot)
+
+
+class TaskSignals(QObject):
+    """任务完成或失败时发出的信号"""
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+
+class Task(QRunnable):
+    """在线程池中执行的单个任务"""
+
+    def __init__(self, fn, args):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.signals = TaskSignals()
+
+    def run(self):
+        # 任务结束前窗口可能已关闭：持有信号对象直到发出为止
+        signals = self.signals
+        try:
+            result = self.fn(*self.args)
+        except Exception as e:
+            emit(signals, 'failed', str(e))
+        else:
+            emit(signals, 'finished', result)
+
+
+def emit(signals, name, value):
+    """在线程池中发出信号；信号对象已被销毁（窗口关闭、解释器退出）时结果无处可送，直接丢弃
+
+    线程池中未捕获的异常会让 PyQt 终止整个进程，取信号属性也要在保护范围内
+    """
+    try:
+        getattr(signals, name).emit(value)
+    except RuntimeError:
+        pass
+
+
+class TaskQueue(QObject):
+    """串行后台任务队列，排队中的同key任务合并为最新一次
+
+    background 为 False 时在主线程直接执行，用于对比卡顿
+    """
+
+    def __init__(self, parent=None, background=True):
+        super().__init__(parent)
+        self.background = background
+        self.pool = QThreadPool(self)
+        # 目录对象不是线程安全的，所有任务串行执行
+        self.pool.setMaxThreadCount(1)
+        self._queue = OrderedDict()
+        self._current = None
+        # 退出事件循环时等待正在执行的任务，不在解释器退出途中留下后台线程
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self._wait_for_current)
+
+    @pyqtSlot()
+    def _wait_for_current(self):
+        self.pool.waitForDone()
+
+    def submit(self, key, fn, args=(), on_done=None, on_error=None):
+        """提交任务；相同key尚未开始的任务会被新任务替换"""
+        self._queue[key] = (fn, args, on_done, on_error)
+        self._start_next()
+
+    def pending(self):
+        """排队中（尚未开始）的任务数"""
+        return len(self._queue)
+
+    def is_busy(self):
+        """是否有任务正在执行或排队"""
+        return self._current is not None or bool(self._queue)
+
+    def _start_next(self):
+        if self._current is not None or not self._queue:
+            return
+        _, (fn, args, on_done, on_error) = self._queue.popitem(last=False)
+
+        if not self.background:
+            self._current = (on_done, on_error)
+            try:
+                result = fn(*args)
+            except Exception as e:
+                self._on_failed(str(e))
+            else:
+                self._on_finished(result)
+            return
+
+        task = Task(fn, args)
+        task.signals.finished.connect(self._on_finished, Qt.QueuedConnection)
+        task.signals.failed.connect(self._on_failed, Qt.QueuedConnection)
+        # 保留任务引用，避免信号对象在回调前被回收
+        self._current = (on_done, on_error, task)
+        self.pool.start(task)
+
+    @pyqtSlot(object)
+    def _on_finished(self, result):
+        on_done = self._current[0]
+        self._current = None
+        if on_done:
+            on_done(result)
+        self._start_next()
+
+    @pyqtSlot(str)
+    def _on_failed(self, message):
+        on_error = self._current[1]
+        self._current = None
+        if on_error:
+            on_error(message)
+        self._start_next()
+
+    def drain(self):
+        """等待当前任务结束，并在调用线程中执行完剩余任务（关闭窗口时使用）"""
+        self.pool.waitForDone()
+        while self._queue:
+            _, (fn, args, _, _) = self._queue.popitem(last=False)
+            fn(*args)
+
+
+class FileWatcher(QObject):
+    """监视 books.yml 和 _posts，一阵连续变化结束后只发出一次 changed 信号
+
+    优先使用 QFileSystemWatcher；有路径无法监视（inotify 数量不足、网络文件系统等）时
+    改用 watcher.PollingWatcher 轮询
+    """
+    changed = pyqtSignal()
+    _polled = pyqtSignal()
+
+    def __init__(self, project, debounce_ms=300, parent=None):
+        super().__init__(parent)
+        self.project = project
+        self.fs_watcher = QFileSystemWatcher(self)
+        self.fs_watcher.fileChanged.connect(self._schedule)
+        self.fs_watcher.directoryChanged.connect(self._schedule)
+        self.poller = None
+        self._polled.connect(self._schedule)
+
+        # 每次变化都重新计时，批量改动只在最后一次变化后触发
+        self.debounce = QTimer(self)
+        self.debounce.setSingleShot(True)
+        self.debounce.setInterval(debounce_ms)
+        self.debounce.timeout.connect(self.changed)
+
+    def watch(self, paths):
+        """更新监视的路径列表（由 watcher.watch_paths 计算）"""
+        if self.poller is not None:
+            return
+        wanted = set(paths)
+        watched = set(self.fs_watcher.files()) | set(self.fs_watcher.directories())
+        stale = watched - wanted
+        if stale:
+            self.fs_watcher.removePaths(list(stale))
+        missing = list(wanted - watched)
+        if missing and self.fs_watcher.addPaths(missing):
+            self._fall_back_to_polling()
+
+    def _fall_back_to_polling(self):
+        from watcher import PollingWatcher
+        watched = self.fs_watcher.files() + self.fs_watcher.directories()
+        if watched:
+            self.fs_watcher.removePaths(watched)
+        # 回调在轮询线程中发出信号，由Qt排队到主线程
+        self.poller = PollingWatcher(self.project, self._polled.emit)
+        self.poller.start()
+
+    def _schedule(self, path=None):
+        self.debounce.start()
+
+    def stop(self):
+        """停止监视"""
+        self.debounce.stop()
+        if self.poller is not None:
+            self.poller.stop()
+
+
+class EventLoopMonitor(QObject):
+    """事件循环卡顿监测：定时器实际间隔超出设定值的部分即为主线程卡顿"""
+
+    def __init__(self, interval_ms=10, parent=None):
+        super().__init__(parent)
+        self.interval_ms = interval_ms
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self._tick)
+        self.reset()
+
+    def reset(self):
+        self.stalls = []
+        self._last = None
+
+    def start(self):
+        self.reset()
+        self._last = time.perf_counter()
+        self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+
+    def _tick(self):
+        now = time.perf_counter()
+        if self._last is not None:
+            stall = (now - self._last) * 1000 - self.interval_ms
+            if stall > 0:
+                self.stalls.append(stall)
+        self._last = now
+
+    def summary(self):
+        """返回 {'max': 最大卡顿, 'p95': 95分位, 'over_50ms': 超过50ms的次数}（毫秒）"""
+        if not self.stalls:
+            return {'max': 0.0, 'p95': 0.0, 'over_50ms': 0}
+        ordered = sorted(self.stalls)
+        return {
+            'max': ordered[-1],
+            'p95': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+            'over_50ms': sum(1 for stall in ordered if stall > 50),
+        }
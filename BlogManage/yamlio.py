@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+YAML 读写 - 安装了 libyaml 时使用C实现的加载器和序列化器，否则退回纯Python实现
+C序列化器只在输出与纯Python实现逐字节一致时使用：两者只在需要转义的
+双引号长文本上折行位置不同，含这类文本的数据改用纯Python实现输出
+"""
+
+import re
+from functools import lru_cache
+
+# 放进双引号后无需转义的字符（PyYAML 在 allow_unicode 下原样输出的范围）；
+# 只含这些字符的文本，C序列化器与纯Python实现的输出完全相同
+UNESCAPED_RE = re.compile('[\x20-\x7e\xa0-\u2027\u202a-\ud7ff\ue000-\ufefe\uff00-\ufffd]*')
+
+DUMP_OPTIONS = {'allow_unicode': True, 'default_flow_style': False, 'sort_keys': False}
+
+
+@lru_cache(maxsize=None)
+def _classes():
+    """返回 (加载器, C序列化器或 None, 纯Python序列化器)"""
+    # PyYAML 只在真正读写时导入，保持本模块导入开销最小
+    import yaml
+    return (getattr(yaml, 'CSafeLoader', yaml.SafeLoader),
+            getattr(yaml, 'CSafeDumper', None), yaml.SafeDumper)
+
+
+def has_libyaml():
+    """是否可以使用C实现"""
+    return _classes()[1] is not None
+
+
+def safe_load(stream):
+    """与 yaml.safe_load 相同，有 libyaml 时使用 CSafeLoader"""
+    import yaml
+    return yaml.load(stream, Loader=_classes()[0])
+
+
+def needs_escape(data):
+    """数据中是否有需要转义输出的文本"""
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, str):
+            if not UNESCAPED_RE.fullmatch(value):
+                return True
+        elif isinstance(value, dict):
+            stack.extend(value.keys())
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return False
+
+
+def dump(data, stream=None):
+    """按 books.yml 的格式序列化，stream 为 None 时返回字符串"""
+    import yaml
+    _, c_dumper, py_dumper = _classes()
+    dumper = py_dumper if c_dumper is None or needs_escape(data) else c_dumper
+    return yaml.dump(data, stream, Dumper=dumper, **DUMP_OPTIONS)
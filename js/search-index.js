@@ -0,0 +1,173 @@
+/* ===========================================================
+ * search-index.js
+ * ===========================================================
+ * Client for the sharded inverted index built by
+ * BlogManage/search_index.py. Only the shards and doc chunks
+ * touched by a query are downloaded.
+ * ========================================================== */
+
+(function (window, document) {
+  'use strict';
+
+  // Keep in sync with TOKEN_RE / tokenize() / shard_key() in search_index.py
+  var TOKEN_RE = /[0-9a-z_]+|[\u3040-\u30ff\u3400-\u9fff\uac00-\ud7af\uf900-\ufaff]+/g;
+
+  function tokenize(text) {
+    var tokens = [];
+    var runs = text.toLowerCase().match(TOKEN_RE) || [];
+    runs.forEach(function (run) {
+      if (run.charCodeAt(0) < 0x3040 || run.length === 1) {
+        tokens.push(run);
+        return;
+      }
+      for (var i = 0; i < run.length - 1; i++) {
+        tokens.push(run.substr(i, 2));
+      }
+    });
+    return tokens;
+  }
+
+  function shardKey(term) {
+    var first = term.charAt(0);
+    if (/[0-9a-z]/.test(first)) return first;
+    var code = (term.charCodeAt(0) % 64).toString(16);
+    return 'u' + (code.length < 2 ? '0' + code : code);
+  }
+
+  function escapeHtml(value) {
+    return String(value).replace(/[&<>"']/g, function (c) {
+      return { '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;' }[c];
+    });
+  }
+
+  function ShardedSearch(options) {
+    this.baseUrl = options.baseUrl || '';
+    this.indexUrl = this.baseUrl + (options.indexPath || '/search/');
+    this.input = options.searchInput;
+    this.results = options.resultsContainer;
+    this.template = options.searchResultTemplate;
+    this.noResultsText = options.noResultsText || 'No results';
+    this.limit = options.limit || 50;
+    this.cache = {};
+    this.manifest = null;
+    this.pending = 0;
+    this.timer = null;
+
+    var self = this;
+    if (this.input) {
+      this.input.addEventListener('input', function () {
+        clearTimeout(self.timer);
+        self.timer = setTimeout(function () { self.search(self.input.value); }, 150);
+      });
+    }
+  }
+
+  ShardedSearch.prototype.fetchJSON = function (name) {
+    var self = this;
+    if (!this.cache[name]) {
+      var revision = this.manifest ? '?v=' + this.manifest.revision : '';
+      this.cache[name] = fetch(this.indexUrl + name + revision).then(function (res) {
+        if (!res.ok) throw new Error(res.status);
+        return res.json();
+      })['catch'](function (err) {
+        delete self.cache[name];
+        throw err;
+      });
+    }
+    return this.cache[name];
+  };
+
+  ShardedSearch.prototype.loadManifest = function () {
+    var self = this;
+    if (!this.manifestPromise) {
+      // the manifest is tiny and always revalidated; shards are keyed by its revision
+      this.manifestPromise = fetch(this.indexUrl + 'manifest.json', { cache: 'no-cache' })
+        .then(function (res) { return res.json(); })
+        .then(function (manifest) { self.manifest = manifest; return manifest; });
+    }
+    return this.manifestPromise;
+  };
+
+  ShardedSearch.prototype.query = function (text) {
+    var self = this;
+    var terms = tokenize(text).filter(function (term, i, all) { return all.indexOf(term) === i; });
+    if (!terms.length) return Promise.resolve([]);
+
+    return this.loadManifest().then(function (manifest) {
+      var shards = {};
+      terms.forEach(function (term) { shards[shardKey(term)] = true; });
+      var names = Object.keys(shards);
+      if (names.some(function (name) { return manifest.shards.indexOf(name) < 0; })) return [];
+
+      return Promise.all(names.map(function (name) { return self.fetchJSON(name + '.json'); }))
+        .then(function (loaded) {
+          var byShard = {};
+          names.forEach(function (name, i) { byShard[name] = loaded[i]; });
+
+          // every term must match; score is the summed weight
+          var scores = null;
+          terms.forEach(function (term) {
+            var postings = byShard[shardKey(term)][term] || [];
+            var next = {};
+            var docId = 0;
+            for (var i = 0; i < postings.length; i += 2) {
+              docId += postings[i];
+              if (scores === null || scores[docId] !== undefined) {
+                next[docId] = (scores === null ? 0 : scores[docId]) + postings[i + 1];
+              }
+            }
+            scores = next;
+          });
+
+          return Object.keys(scores)
+            .map(Number)
+            .sort(function (a, b) { return scores[b] - scores[a] || b - a; })
+            .slice(0, self.limit);
+        })
+        .then(function (ids) { return self.loadDocs(ids); });
+    });
+  };
+
+  ShardedSearch.prototype.loadDocs = function (ids) {
+    var self = this;
+    var perChunk = this.manifest.docsPerChunk;
+    var chunks = {};
+    ids.forEach(function (id) { chunks[Math.floor(id / perChunk)] = true; });
+    var names = Object.keys(chunks);
+
+    return Promise.all(names.map(function (chunk) { return self.fetchJSON('docs-' + chunk + '.json'); }))
+      .then(function (loaded) {
+        var byChunk = {};
+        names.forEach(function (chunk, i) { byChunk[chunk] = loaded[i]; });
+        return ids.map(function (id) {
+          var doc = byChunk[Math.floor(id / perChunk)][id % perChunk];
+          return doc && { title: doc[0], subtitle: doc[1], url: self.baseUrl + doc[2], date: doc[3], tags: doc[4] };
+        }).filter(Boolean);
+      });
+  };
+
+  ShardedSearch.prototype.search = function (text) {
+    var self = this;
+    var ticket = ++this.pending;
+    if (!text.trim()) {
+      this.results.innerHTML = '';
+      return;
+    }
+    this.query(text).then(function (docs) {
+      if (ticket !== self.pending) return;
+      if (!docs.length) {
+        self.results.innerHTML = '<p>' + escapeHtml(self.noResultsText) + '</p>';
+        return;
+      }
+      self.results.innerHTML = docs.map(function (doc) {
+        return self.template.replace(/\{(\w+)\}/g, function (match, key) {
+          return doc[key] === undefined ? match : escapeHtml(doc[key]);
+        });
+      }).join('');
+    })['catch'](function () {
+      if (ticket === self.pending) self.results.innerHTML = '';
+    });
+  };
+
+  window.ShardedSearch = ShardedSearch;
+})(window, document);
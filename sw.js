@@ -20,7 +20,6 @@ const PRECACHE_LIST = [
   "./js/hux-blog.min.js",
   "./js/snackbar.js",
   "./img/icon_wechat.png",
-  "./img/avatar-hux.jpg",
   "./img/home-bg.jpg",
   "./img/404-bg.jpg",
   "./css/hux-blog.min.css",
@@ -29,6 +28,20 @@ const PRECACHE_LIST = [
   // "//cdnjs.cloudflare.com/ajax/libs/font-awesome/4.6.3/fonts/fontawesome-webfont.woff2?v=4.6.3",
   // "//cdnjs.cloudflare.com/ajax/libs/fastclick/1.0.6/fastclick.min.js"
 ]
+
+// PRECACHE_MANIFEST
+// Filled in after `jekyll build` by BlogManage/precache.py:
+//   { version, bytes, entries: [[url, revision], ...] }
+// where revision is a content hash of the built file. Install only downloads
+// entries whose revision changed. Left null in the source tree (e.g. `jekyll serve`),
+// in which case PRECACHE_LIST is fetched as-is.
+const PRECACHE_MANIFEST = null
+// Cache key of the { url: revision } record of what is already precached
+const PRECACHE_REVISIONS = './__precache-revisions'
+const PRECACHED_URLS = new Set(PRECACHE_MANIFEST
+  ? PRECACHE_MANIFEST.entries.map(([url]) => new URL(url, self.location).href)
+  : [])
+
 const HOSTNAME_WHITELIST = [
   self.location.hostname,
   "huangxuan.me",
@@ -39,22 +52,18 @@ const DEPRECATED_CACHES = ['precache-v1', 'runtime', 'main-precache-v1', 'main-r
 
 
 // The Util Function to hack URLs of intercepted requests
-const getCacheBustingUrl = (req) => {
-  var now = Date.now();
+const getFetchUrl = (req) => {
   url = new URL(req.url)
 
-  // 1. fixed http URL
+  // fixed http URL
   // Just keep syncing with location.protocol
   // fetch(httpURL) belongs to active mixed content.
   // And fetch(httpRequest) is not supported yet.
   url.protocol = self.location.protocol
 
-  // 2. add query for caching-busting.
-  // Github Pages served with Cache-Control: max-age=600
-  // max-age on mutable content is error-prone, with SW life of bugs can even extend.
-  // Until cache mode of Fetch API landed, we have to workaround cache-busting with query string.
-  // Cache-Control-Bug: https://bugs.chromium.org/p/chromium/issues/detail?id=453190
-  url.search += (url.search ? '&' : '?') + 'cache-bust=' + now;
+  // No cache-busting query any more: Github Pages serves Cache-Control: max-age=600,
+  // and requests are made with { cache: "no-cache" }, which revalidates with the
+  // server (ETag / Last-Modified) instead of bypassing the HTTP cache entirely.
   return url.href
 }
 
@@ -102,13 +111,43 @@ const getRedirectUrl = (req) => {
 self.addEventListener('install', e => {
   e.waitUntil(
     caches.open(CACHE).then(cache => {
-      return cache.addAll(PRECACHE_LIST)
-        .then(self.skipWaiting())
+      return precache(cache)
+        .then(() => self.skipWaiting())
         .catch(err => console.log(err))
     })
   )
 });
 
+/**
+ * Download only the manifest entries whose revision differs from the one
+ * recorded at the last install, and drop entries no longer listed.
+ */
+function precache(cache) {
+  if (!PRECACHE_MANIFEST) return cache.addAll(PRECACHE_LIST)
+
+  return cache.match(PRECACHE_REVISIONS)
+    .then(resp => resp ? resp.json() : {})
+    .then(revisions => {
+      const listed = new Set(PRECACHE_MANIFEST.entries.map(([url]) => url))
+      const removed = Object.keys(revisions).filter(url => !listed.has(url))
+      const stale = PRECACHE_MANIFEST.entries.filter(([url, revision]) => revisions[url] !== revision)
+
+      return Promise.all([
+        ...removed.map(url => cache.delete(url).then(() => { delete revisions[url] })),
+        ...stale.map(([url, revision]) =>
+          fetch(url, { cache: "no-cache" })
+            .then(resp => {
+              if (!resp.ok) throw new Error(`precache ${url}: ${resp.status}`)
+              return cache.put(url, resp)
+            })
+            .then(() => { revisions[url] = revision })
+            .catch(err => console.log(err)))
+      ]).then(() => cache.put(PRECACHE_REVISIONS, new Response(JSON.stringify(revisions), {
+        headers: { 'Content-Type': 'application/json' }
+      })))
+    })
+}
+
 
 /**
  *  @Lifecycle Activate
@@ -176,6 +215,13 @@ self.addEventListener('fetch', event => {
       return;
     }
 
+    // Precached assets are versioned by PRECACHE_MANIFEST and refreshed on install,
+    // so they are served straight from the cache
+    if (!isNavigationReq(event.request) && PRECACHED_URLS.has(event.request.url)) {
+      event.respondWith(fetchHelper.cacheFirst(event.request.url))
+      return;
+    }
+
     // Cache-only Startgies for ys.static resources
     if (event.request.url.indexOf('ys.static') > -1){
       event.respondWith(fetchHelper.cacheFirst(event.request.url))
@@ -186,7 +232,7 @@ self.addEventListener('fetch', event => {
     // similar to HTTP's stale-while-revalidate: https://www.mnot.net/blog/2007/12/12/stale
     // Upgrade from Jake's to Surma's: https://gist.github.com/surma/eb441223daaedf880801ad80006389f1
     const cached = caches.match(event.request);
-    const fetched = fetch(getCacheBustingUrl(event.request), { cache: "no-store" });
+    const fetched = fetch(getFetchUrl(event.request), { cache: "no-cache" });
     const fetchedCopy = fetched.then(resp => resp.clone());
     
     // Call respondWith() with whatever we get first.